@@ -15,6 +15,8 @@ import sys
 import requests
 import polars as pl
 
+from reco.profiling import RunProfiler
+
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -68,7 +70,7 @@ def step_a_download() -> dict[str, Path]:
     return paths
 
 
-def step_b_combine(paths: dict[str, Path]) -> Path:
+def step_b_combine(paths: dict[str, Path], prof: RunProfiler) -> Path:
     print("\n=== STEP B: Combine datasets ===")
 
     lf_train = pl.scan_parquet(str(paths["train"])).with_columns(pl.lit("train").alias("source"))
@@ -76,13 +78,14 @@ def step_b_combine(paths: dict[str, Path]) -> Path:
     lf_test = pl.scan_parquet(str(paths["test"])).with_columns(pl.lit("test").alias("source"))
 
     lf_full = pl.concat([lf_train, lf_val, lf_test], how="vertical_relaxed")
+    prof.explain(lf_full, label="combine")
     lf_full.sink_parquet(str(OUT_FULL))
 
     print(f"✅ Written: {OUT_FULL}")
     return OUT_FULL
 
 
-def step_c_preview(full_path: Path) -> None:
+def step_c_preview(full_path: Path, prof: RunProfiler) -> None:
     print("\n=== STEP C: Preview ===")
 
     df_head = pl.read_parquet(str(full_path), n_rows=25)
@@ -91,6 +94,7 @@ def step_c_preview(full_path: Path) -> None:
 
     lf = pl.scan_parquet(str(full_path))
     n_rows = lf.select(pl.len()).collect().item()
+    prof.rows(out=n_rows)
     n_cols = len(lf.schema)
 
     print("\n--- Shape ---")
@@ -100,9 +104,14 @@ def step_c_preview(full_path: Path) -> None:
 
 
 def main() -> None:
+    prof = RunProfiler("01_data_combine")
+    prof.stage("download")
     paths = step_a_download()
-    full_path = step_b_combine(paths)
-    step_c_preview(full_path)
+    prof.stage("combine")
+    full_path = step_b_combine(paths, prof)
+    prof.stage("preview")
+    step_c_preview(full_path, prof)
+    prof.finish()
 
 
 if __name__ == "__main__":
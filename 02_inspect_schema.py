@@ -1,9 +1,14 @@
 import polars as pl
 
+from reco.profiling import RunProfiler
+
 DATA_PATH = "data/full_data.parquet"
 
+prof = RunProfiler("02_inspect_schema")
+
 print(f"\n🔍 Inspecting schema of {DATA_PATH}\n")
 
+prof.stage("distinct counts")
 lf = pl.scan_parquet(DATA_PATH)
 
 schema = lf.collect_schema()
@@ -11,20 +16,20 @@ schema = lf.collect_schema()
 print("Column → DataType | Distinct values")
 print("-" * 55)
 
-distinct_counts = (
+distinct_counts = prof.collect(
     lf.select([
         pl.col(c).n_unique().alias(c)
         for c in schema.keys()
-    ])
-    .collect()
-    .to_dict(as_series=False)
-)
+    ]),
+    label="n_unique",
+).to_dict(as_series=False)
 
 for col, dtype in schema.items():
     n_unique = distinct_counts[col][0]
     print(f"{col:<20} → {str(dtype):<25} | {n_unique}")
 
 print("\n🔎 Top 5 values per column (by frequency)\n")
+prof.stage("top values")
 
 for col in schema.keys():
     print(f"▶ Column: {col}")
@@ -42,3 +47,5 @@ for col in schema.keys():
         print(f"  {row[0]} → {row[1]}")
 
     print()
+
+prof.finish()
@@ -1,8 +1,12 @@
 import polars as pl
 
+from reco.profiling import RunProfiler
+
 INPUT_PATH = "data/full_data.parquet"
 OUTPUT_PATH = "data/full_data.parquet"  # overwrite intentionally
 
+prof = RunProfiler("03_fix_schema")
+
 print("🧹 Fixing schema for full_data.parquet\n")
 
 # Lazy load
@@ -32,7 +36,13 @@ lf_fixed = lf.with_columns([
 ])
 
 # Write back (streaming-safe)
-lf_fixed.collect(streaming=True).write_parquet(OUTPUT_PATH)
+prof.stage("fix schema")
+fixed = prof.collect(lf_fixed, label="fix_schema", streaming=True)
+prof.rows(out=fixed)
+
+prof.stage("write")
+fixed.write_parquet(OUTPUT_PATH)
+del fixed
 
 print("\n✅ Schema fix complete.\n")
 
@@ -41,3 +51,5 @@ lf_check = pl.scan_parquet(OUTPUT_PATH)
 print("🔎 Fixed schema:")
 for k, v in lf_check.collect_schema().items():
     print(f"{k:20s} → {v}")
+
+prof.finish()
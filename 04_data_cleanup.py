@@ -1,6 +1,8 @@
 import polars as pl
 from pathlib import Path
 
+from reco.profiling import RunProfiler
+
 # --------------------------------------------------
 # Config
 # --------------------------------------------------
@@ -11,6 +13,8 @@ if not DATA_PATH.exists():
         "❌ data/full_data.parquet not found. Run 01_data_combine.py first."
     )
 
+prof = RunProfiler("04_data_cleanup")
+
 print("🧹 Loading full_data.parquet (lazy scan)...")
 lf = pl.scan_parquet(DATA_PATH)
 
@@ -115,7 +119,14 @@ if "purchase_cat_0" in schema:
 # 6. Final write
 # --------------------------------------------------
 print("💾 Writing cleaned full_data.parquet...")
-lf.collect(engine="streaming").write_parquet(DATA_PATH)
+prof.stage("clean")
+cleaned = prof.collect(lf, label="cleanup", engine="streaming")
+prof.rows(out=cleaned)
+
+prof.stage("write")
+cleaned.write_parquet(DATA_PATH)
 
 print("✅ Data cleanup complete.")
-print("📌 Cold-start logic preserved | LR-safe | XGB-safe")
\ No newline at end of file
+print("📌 Cold-start logic preserved | LR-safe | XGB-safe")
+
+prof.finish()
@@ -1,12 +1,16 @@
 import polars as pl
 from pathlib import Path
 
+from reco.profiling import RunProfiler
+
 INPUT = "data/full_data.parquet"
 OUT_DIR = Path("data/processed")
 OUT_PATH = OUT_DIR / "all_features.parquet"
 
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+prof = RunProfiler("05_data_prepare")
+
 print("📥 Loading full_data.parquet (lazy)...")
 df = pl.scan_parquet(INPUT)
 
@@ -54,14 +58,11 @@ carts = (
 # --------------------------------------------------
 # cat_0 universe
 # --------------------------------------------------
-cat_0_values = (
-    df.select("cat_0")
-      .drop_nulls()
-      .unique()
-      .collect()
-      .to_series()
-      .to_list()
-)
+prof.stage("cat_0 universe")
+cat_0_values = prof.collect(
+    df.select("cat_0").drop_nulls().unique(), label="cat_0_values"
+).to_series().to_list()
+prof.rows(out=len(cat_0_values))
 
 print(f"✅ Detected {len(cat_0_values)} cat_0 values")
 
@@ -233,8 +234,19 @@ final_cols = [
     "purchase_pid"
 ]
 
+# Everything above is one lazy query: the purchase windows, the
+# purchase×cart join and the per-category aggregates all run here
+prof.stage("features")
+prof.explain(p, label="purchase_windows")
+prof.explain(pc, label="purchase_cart_join")
+features = prof.collect(final.select(final_cols), label="all_features")
+prof.rows(out=features)
+
 print("💾 Writing all_features.parquet...")
-final.select(final_cols).collect().write_parquet(OUT_PATH)
+prof.stage("write")
+features.write_parquet(OUT_PATH)
 
 print("✅ 05_data_prepare.py completed successfully")
-print("📌 Cold-start encoded | NULL-safe | LR + XGB ready")
\ No newline at end of file
+print("📌 Cold-start encoded | NULL-safe | LR + XGB ready")
+
+prof.finish()
@@ -1,13 +1,18 @@
 import polars as pl
 
+from reco.profiling import RunProfiler
+
 PATH = "data/processed/all_features.parquet"
 
+prof = RunProfiler("06_feature_sanity")
+
 print("\n📦 Loading dataset (lazy)...")
 df = pl.scan_parquet(PATH)
 
 # -----------------------------
 # 1. Table overview
 # -----------------------------
+prof.stage("overview")
 schema = df.collect_schema()
 cols = schema.names()
 
@@ -15,6 +20,7 @@ row_count = df.select(pl.len()).collect().item()
 
 print("\n📊 Table overview")
 print(f"Rows: {row_count:,}")
+prof.rows(rows_in=row_count)
 print(f"Columns: {len(cols)}")
 
 # -----------------------------
@@ -35,6 +41,7 @@ print("✅ Critical columns present")
 # 3. Purchase-level uniqueness diagnostics
 # -----------------------------
 print("\n🔍 Purchase-level uniqueness check")
+prof.stage("uniqueness", rows_in=row_count)
 
 unique_purchases = (
     df.select(["purchase_user_id", "purchase_time"])
@@ -56,13 +63,13 @@ print(f"Duplication x:    {dup_factor:.2f}")
 # -----------------------------
 print("\n🧪 Sample duplicated purchase keys")
 
-dupes = (
+dupes = prof.collect(
     df.group_by(["purchase_user_id", "purchase_time"])
       .len()
       .filter(pl.col("len") > 1)
       .sort("len", descending=True)
-      .limit(10)
-      .collect()
+      .limit(10),
+    label="duplicated_purchases",
 )
 
 if dupes.height == 0:
@@ -74,6 +81,7 @@ else:
 # 5. Column diagnostics
 # -----------------------------
 print("\n🧾 Column diagnostics")
+prof.stage("column diagnostics", rows_in=row_count)
 print("-" * 90)
 print(f"{'Column':30} {'Type':25} {'Distinct':>10}")
 print("-" * 90)
@@ -91,6 +99,7 @@ for col in cols:
 # 6. Top 5 values per column
 # -----------------------------
 print("\n🔎 Top 5 values per column (by frequency)\n")
+prof.stage("top values", rows_in=row_count)
 
 for col in cols:
     print(f"▶ {col}")
@@ -110,3 +119,5 @@ for col in cols:
     print()
 
 print("✅ Feature sanity diagnostics completed")
+
+prof.finish()
@@ -1,6 +1,8 @@
 import polars as pl
 from pathlib import Path
 
+from reco.profiling import RunProfiler
+
 INPUT_PATH = "data/processed/all_features.parquet"
 OUT_DIR = Path("data/processed")
 
@@ -8,6 +10,8 @@ TRAIN_PATH = OUT_DIR / "all_features_train.parquet"
 VAL_PATH   = OUT_DIR / "all_features_val.parquet"
 TEST_PATH  = OUT_DIR / "all_features_test.parquet"
 
+prof = RunProfiler("07_data_split")
+
 print("📥 Loading all_features.parquet (lazy)...")
 df = pl.scan_parquet(INPUT_PATH)
 
@@ -15,17 +19,12 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 print("✂️ Splitting dataset by purchase_source...")
 
-df.filter(pl.col("purchase_source") == "train") \
-  .collect() \
-  .write_parquet(TRAIN_PATH)
-
-df.filter(pl.col("purchase_source") == "val") \
-  .collect() \
-  .write_parquet(VAL_PATH)
-
-df.filter(pl.col("purchase_source") == "test") \
-  .collect() \
-  .write_parquet(TEST_PATH)
+for split, path in (("train", TRAIN_PATH), ("val", VAL_PATH), ("test", TEST_PATH)):
+    prof.stage(f"split {split}")
+    part = prof.collect(df.filter(pl.col("purchase_source") == split), label=split)
+    prof.rows(out=part)
+    part.write_parquet(path)
+    del part
 
 print("✅ Split completed")
 
@@ -38,3 +37,5 @@ print("\n📦 Output files:")
 print(f"- {TRAIN_PATH}")
 print(f"- {VAL_PATH}")
 print(f"- {TEST_PATH}")
+
+prof.finish()
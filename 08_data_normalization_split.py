@@ -1,15 +1,22 @@
 import polars as pl
 import pandas as pd
+import numpy as np
 from pathlib import Path
 from sklearn.preprocessing import StandardScaler
 import joblib
 
+from reco.profiling import RunProfiler
+
 INPUT = "data/processed/all_features.parquet"
 OUT_DIR = Path("data/processed")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+prof = RunProfiler("08_data_normalization_split")
+
 print("📥 Loading all_features.parquet...")
+prof.stage("load")
 df = pl.read_parquet(INPUT)
+prof.rows(out=df)
 
 # --------------------------------------------------
 # Identify numeric columns (exclude identifiers & target)
@@ -35,6 +42,7 @@ print(f"✅ Normalising {len(NUM_COLS)} numeric features")
 # --------------------------------------------------
 # Convert to pandas for sklearn scaler
 # --------------------------------------------------
+prof.stage("scale", rows_in=df)
 pdf = df.select(NUM_COLS).to_pandas()
 pdf = pdf.fillna(0)
 
@@ -63,6 +71,9 @@ final = pl.concat(
 # --------------------------------------------------
 # Write normalized dataset
 # --------------------------------------------------
+prof.rows(out=final)
+
+prof.stage("write normalized", rows_in=final)
 OUT_N = OUT_DIR / "all_features_n.parquet"
 final.write_parquet(OUT_N)
 
@@ -72,6 +83,7 @@ print(f"💾 Normalized file written: {OUT_N}")
 # Split normalized data
 # --------------------------------------------------
 print("✂️ Splitting normalized dataset...")
+prof.stage("split", rows_in=final)
 
 final.filter(pl.col("purchase_source") == "train") \
      .write_parquet(OUT_DIR / "all_features_train_n.parquet")
@@ -85,8 +97,17 @@ final.filter(pl.col("purchase_source") == "test") \
 # --------------------------------------------------
 # Save scaler for inference
 # --------------------------------------------------
+prof.stage("save scaler")
 joblib.dump(scaler, OUT_DIR / "feature_scaler.pkl")
 
+# Pickle-free copy of the scaler stats for the model bundle (10_reco_engine.py)
+np.savez(
+    OUT_DIR / "feature_scaler.npz",
+    feature_names=np.array(NUM_COLS),
+    mean=scaler.mean_,
+    scale=scaler.scale_,
+)
+
 print("✅ Normalization + split completed successfully")
 print("📦 Outputs:")
 print("- all_features_n.parquet")
@@ -94,3 +115,6 @@ print("- all_features_train_n.parquet")
 print("- all_features_val_n.parquet")
 print("- all_features_test_n.parquet")
 print("- feature_scaler.pkl")
+print("- feature_scaler.npz")
+
+prof.finish()
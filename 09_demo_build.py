@@ -2,6 +2,8 @@ import polars as pl
 from pathlib import Path
 from datetime import datetime, timezone
 
+from reco.profiling import RunProfiler
+
 # -----------------------------
 # Config
 # -----------------------------
@@ -14,6 +16,8 @@ PREDICTION_TIME = datetime(2020, 5, 5, 0, 0, 0, tzinfo=timezone.utc)
 
 Path("data/demo").mkdir(parents=True, exist_ok=True)
 
+prof = RunProfiler("09_demo_build")
+
 # -----------------------------
 # Load full dataset
 # -----------------------------
@@ -24,16 +28,18 @@ df = pl.scan_parquet(FULL_DATA)
 # Step 1: users with ≥1 TEST purchase
 # -----------------------------
 print("🔍 Selecting users with ≥1 TEST purchase...")
+prof.stage("eligible users")
 
-eligible_users = (
+eligible_users = prof.collect(
     df.filter(
         (pl.col("source") == "test") &
         (pl.col("event_type") == "purchase")
     )
     .select("user_id")
-    .unique()
-    .collect()
+    .unique(),
+    label="eligible_users",
 )
+prof.rows(out=eligible_users)
 
 print(f"✅ Eligible users found: {eligible_users.height}")
 
@@ -50,11 +56,12 @@ sampled_users_lf = pl.LazyFrame(sampled_users)
 # Step 2–3: extract all events
 # -----------------------------
 print("📦 Extracting all events for sampled users...")
+prof.stage("extract events", rows_in=sampled_users)
 
-demo_events = (
-    df.join(sampled_users_lf, on="user_id", how="inner")
-    .collect()
+demo_events = prof.collect(
+    df.join(sampled_users_lf, on="user_id", how="inner"), label="demo_events"
 )
+prof.rows(out=demo_events)
 
 demo_events.write_parquet(OUT_EVENTS)
 
@@ -65,6 +72,7 @@ print(f"   Rows: {demo_events.height}")
 # Step 4: build one-row-per-user features
 # -----------------------------
 print("📊 Building one-row-per-user feature table...")
+prof.stage("user features", rows_in=demo_events)
 
 cat_0_values = (
     demo_events
@@ -93,7 +101,8 @@ purchase_aggs = [
         pl.lit(PREDICTION_TIME.strftime("%Y%m%d%H%M%S"))
     ).alias("purchase_id"),
 
-    pl.lit(0).cast(pl.Int32).alias("is_new_customer"),
+    # Same cold-start rule as 05_data_prepare.py
+    (pl.count() <= 1).cast(pl.Int32).alias("is_new_customer"),
 
     # Recency
     (pl.lit(PREDICTION_TIME) - pl.col("timestamp").max())
@@ -189,8 +198,12 @@ final_features = (
     )
 )
 
+prof.rows(out=final_features)
+
 final_features.write_parquet(OUT_FEATURES)
 
 print("✅ demo_user_features.parquet written")
 print(f"   Rows: {final_features.height}")
 print("✅ Demo build completed successfully")
+
+prof.finish()
@@ -7,6 +7,8 @@
 # -------------------------------------------------------
 
 import json
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
 import numpy as np
@@ -19,6 +21,9 @@ from sklearn.linear_model import LogisticRegression
 import xgboost as xgb
 import joblib
 
+from reco.bundle import load_bundle, publish_bundle, scaler_stats_for
+from reco.profiling import RunProfiler
+
 
 # -------------------------------------------------------
 # Paths
@@ -33,12 +38,15 @@ TEST_PATH  = DATA_DIR / "all_features_test_n.parquet"
 
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
+prof = RunProfiler("10_reco_engine")
+
 
 # -------------------------------------------------------
 # Load data
 # -------------------------------------------------------
 
 print("📥 Loading datasets...")
+prof.stage("load")
 
 train_df = pd.read_parquet(TRAIN_PATH)
 val_df   = pd.read_parquet(VAL_PATH)
@@ -47,6 +55,7 @@ test_df  = pd.read_parquet(TEST_PATH)
 print(f"Train rows: {len(train_df):,}")
 print(f"Val rows:   {len(val_df):,}")
 print(f"Test rows:  {len(test_df):,}")
+prof.rows(out=len(train_df) + len(val_df) + len(test_df))
 
 
 # -------------------------------------------------------
@@ -142,6 +151,7 @@ def evaluate(model_name, model, X, y_true):
 # -------------------------------------------------------
 
 print("\n🧠 Training Logistic Regression model...")
+prof.stage("logistic regression", rows_in=X_train)
 
 lr_model = LogisticRegression(
     max_iter=1000,
@@ -165,6 +175,7 @@ evaluate("Logistic Regression (Test)", lr_model, X_test, y_test)
 # -------------------------------------------------------
 
 print("\n🧠 Training XGBoost model...")
+prof.stage("xgboost", rows_in=X_train)
 
 xgb_model = xgb.XGBClassifier(
     objective="multi:softmax",
@@ -209,10 +220,56 @@ meta = {
     "target": TARGET_COL,
     "classes": list(label_encoder.classes_),
     "unknown_class_label": UNKNOWN_LABEL,
+    # Refreshes (11_reco_refresh.py) chain their versions off this one
+    "xgboost_version": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
 }
 
 with open(MODEL_DIR / "meta.json", "w") as f:
     json.dump(meta, f, indent=2)
 
+
+# -------------------------------------------------------
+# Native model bundle (used by the app instead of pickles)
+# -------------------------------------------------------
+
+print("\n📦 Writing model bundle...")
+prof.stage("bundle")
+
+scaler_mean, scaler_scale = scaler_stats_for(
+    FEATURE_COLS, DATA_DIR / "feature_scaler.npz"
+)
+
+# bundles/<version>/ + atomic CURRENT pointer: a running app swaps to it
+BUNDLE_DIR = publish_bundle(
+    MODEL_DIR,
+    booster=xgb_model.get_booster(),
+    lr_coef=lr_model.coef_,
+    lr_intercept=lr_model.intercept_,
+    classes=list(label_encoder.classes_),
+    feature_columns=FEATURE_COLS,
+    target=TARGET_COL,
+    unknown_class_label=UNKNOWN_LABEL,
+    scaler_mean=scaler_mean,
+    scaler_scale=scaler_scale,
+    version=meta["xgboost_version"],
+)
+
+# Cold-load comparison: pickles as the app used to load them vs the bundle
+t0 = time.perf_counter()
+joblib.load(MODEL_DIR / "xgboost.pkl")
+joblib.load(MODEL_DIR / "label_encoder.pkl")
+with open(MODEL_DIR / "feature_columns.json") as f:
+    json.load(f)
+pickle_seconds = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+load_bundle(BUNDLE_DIR, expected_features=FEATURE_COLS)
+bundle_seconds = time.perf_counter() - t0
+
+print(f"✅ Bundle written: {BUNDLE_DIR}")
+print(f"⏱  Load time – pickles: {pickle_seconds * 1000:.1f} ms | bundle: {bundle_seconds * 1000:.1f} ms")
+
 print("\n✅ Recommendation model training completed")
-print(f"📦 Model artefacts saved in: {MODEL_DIR}")
\ No newline at end of file
+print(f"📦 Model artefacts saved in: {MODEL_DIR}")
+
+prof.finish()
@@ -0,0 +1,224 @@
+# 11_reco_refresh.py
+# -------------------------------------------------------
+# Warm-start refresh of the XGBoost recommendation model
+#
+# Instead of rebuilding 300 trees from scratch, the booster
+# trained by 10_reco_engine.py is loaded and boosted for a
+# bounded number of extra rounds on the latest snapshot.
+# The refreshed model is written as a new versioned artefact,
+# evaluated against the previous one and only promoted to
+# models/reco/xgboost.pkl when it is at least as good.
+# -------------------------------------------------------
+
+import json
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sklearn.metrics import accuracy_score, log_loss
+
+import xgboost as xgb
+import joblib
+
+from reco.bundle import MANIFEST_FILE, current_bundle_dir, publish_booster
+
+
+# -------------------------------------------------------
+# Paths & config
+# -------------------------------------------------------
+
+DATA_DIR = Path("data/processed")
+MODEL_DIR = Path("models/reco")
+VERSIONS_DIR = MODEL_DIR / "versions"
+
+TRAIN_PATH = DATA_DIR / "all_features_train_n.parquet"
+VAL_PATH   = DATA_DIR / "all_features_val_n.parquet"
+TEST_PATH  = DATA_DIR / "all_features_test_n.parquet"
+
+CURRENT_MODEL_PATH = MODEL_DIR / "xgboost.pkl"
+
+EXTRA_ROUNDS = 50          # upper bound on trees added per refresh
+PROMOTE_IF_NOT_WORSE = True
+
+TARGET_COL = "purchase_cat_0"
+
+VERSIONS_DIR.mkdir(parents=True, exist_ok=True)
+
+if not CURRENT_MODEL_PATH.exists():
+    raise FileNotFoundError(
+        "❌ models/reco/xgboost.pkl not found. Run 10_reco_engine.py first."
+    )
+
+
+# -------------------------------------------------------
+# Load previous artefacts
+# -------------------------------------------------------
+
+print("📥 Loading previous model artefacts...")
+
+prev_model = joblib.load(CURRENT_MODEL_PATH)
+label_encoder = joblib.load(MODEL_DIR / "label_encoder.pkl")
+
+with open(MODEL_DIR / "feature_columns.json") as f:
+    FEATURE_COLS = json.load(f)
+
+with open(MODEL_DIR / "meta.json") as f:
+    meta = json.load(f)
+
+UNKNOWN_LABEL = meta.get("unknown_class_label", "__UNKNOWN__")
+prev_version = meta.get("xgboost_version", "initial")
+prev_rounds = prev_model.get_booster().num_boosted_rounds()
+
+print(f"✅ Previous model: {prev_version} ({prev_rounds} rounds)")
+
+
+# -------------------------------------------------------
+# Load new snapshot
+# -------------------------------------------------------
+
+print("📥 Loading snapshot...")
+
+train_df = pd.read_parquet(TRAIN_PATH)
+val_df   = pd.read_parquet(VAL_PATH)
+test_df  = pd.read_parquet(TEST_PATH)
+
+print(f"Train rows: {len(train_df):,}")
+print(f"Val rows:   {len(val_df):,}")
+print(f"Test rows:  {len(test_df):,}")
+
+# The class set is frozen by the previous model: categories that did not
+# exist at training time fall back to the unknown label.
+known = set(label_encoder.classes_)
+
+def encode_target(df):
+    y = df[TARGET_COL].fillna(UNKNOWN_LABEL).astype(str)
+    y = y.where(y.isin(known), UNKNOWN_LABEL)
+    return label_encoder.transform(y)
+
+
+y_train = encode_target(train_df)
+y_val   = encode_target(val_df)
+y_test  = encode_target(test_df)
+
+missing_cols = [c for c in FEATURE_COLS if c not in train_df.columns]
+if missing_cols:
+    raise ValueError(f"❌ Snapshot is missing model features: {missing_cols}")
+
+X_train = train_df[FEATURE_COLS].fillna(0)
+X_val   = val_df[FEATURE_COLS].fillna(0)
+X_test  = test_df[FEATURE_COLS].fillna(0)
+
+
+# -------------------------------------------------------
+# Continue boosting
+# -------------------------------------------------------
+
+print(f"\n🔁 Continuing boosting for up to {EXTRA_ROUNDS} rounds...")
+
+params = prev_model.get_params()
+params["n_estimators"] = EXTRA_ROUNDS
+
+refresh_model = xgb.XGBClassifier(**params)
+
+t0 = time.perf_counter()
+refresh_model.fit(
+    X_train,
+    y_train,
+    eval_set=[(X_val, y_val)],
+    verbose=False,
+    xgb_model=prev_model.get_booster()
+)
+refresh_seconds = time.perf_counter() - t0
+
+new_rounds = refresh_model.get_booster().num_boosted_rounds()
+print(f"✅ Refresh finished in {refresh_seconds:.1f}s ({new_rounds} rounds total)")
+
+
+# -------------------------------------------------------
+# Evaluate old vs new
+# -------------------------------------------------------
+
+labels = np.arange(len(label_encoder.classes_))
+
+def score(model, X, y_true):
+    probs = model.predict_proba(X)
+    preds = probs.argmax(axis=1)
+    return {
+        "accuracy": float(accuracy_score(y_true, preds)),
+        "mlogloss": float(log_loss(y_true, probs, labels=labels)),
+    }
+
+
+evaluation = {}
+for split, X, y in (("val", X_val, y_val), ("test", X_test, y_test)):
+    evaluation[split] = {
+        "previous": score(prev_model, X, y),
+        "refreshed": score(refresh_model, X, y),
+    }
+
+print("\n📊 Previous vs refreshed")
+for split, res in evaluation.items():
+    old, new = res["previous"], res["refreshed"]
+    print(
+        f"{split:<5} accuracy {old['accuracy']:.4f} → {new['accuracy']:.4f} | "
+        f"mlogloss {old['mlogloss']:.4f} → {new['mlogloss']:.4f}"
+    )
+
+
+# -------------------------------------------------------
+# Versioned artefact
+# -------------------------------------------------------
+
+version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+version_path = VERSIONS_DIR / f"xgboost_{version}.pkl"
+
+joblib.dump(refresh_model, version_path)
+
+# Keep the model being replaced addressable by its own version
+prev_archive = VERSIONS_DIR / f"xgboost_{prev_version}.pkl"
+if not prev_archive.exists():
+    shutil.copy2(CURRENT_MODEL_PATH, prev_archive)
+
+promote = (
+    PROMOTE_IF_NOT_WORSE
+    and evaluation["val"]["refreshed"]["mlogloss"]
+    <= evaluation["val"]["previous"]["mlogloss"]
+)
+
+report = {
+    "version": version,
+    "parent_version": prev_version,
+    "extra_rounds": EXTRA_ROUNDS,
+    "rounds_before": prev_rounds,
+    "rounds_after": new_rounds,
+    "refresh_seconds": refresh_seconds,
+    "train_rows": len(train_df),
+    "evaluation": evaluation,
+    "promoted": promote,
+}
+
+with open(VERSIONS_DIR / f"xgboost_{version}.json", "w") as f:
+    json.dump(report, f, indent=2)
+
+print(f"\n💾 Versioned model written: {version_path}")
+
+if promote:
+    joblib.dump(refresh_model, CURRENT_MODEL_PATH)
+
+    meta["xgboost_version"] = version
+    meta["xgboost_parent_version"] = prev_version
+    with open(MODEL_DIR / "meta.json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ Promoted {version} → {CURRENT_MODEL_PATH}")
+
+    if (current_bundle_dir(MODEL_DIR) / MANIFEST_FILE).exists():
+        # New versioned bundle; running apps hot-swap to it via CURRENT
+        bundle_dir = publish_booster(MODEL_DIR, refresh_model.get_booster(), version=version)
+        print(f"📦 Bundle published: {bundle_dir}")
+else:
+    print("⚠️ Refreshed model is worse on validation – previous model kept")
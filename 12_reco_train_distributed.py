@@ -0,0 +1,326 @@
+# 12_reco_train_distributed.py
+"""
+Data-parallel XGBoost training on a single host.
+
+The training parquet is split into N contiguous row shards; each shard is
+loaded by its own worker process and the workers train ONE booster together
+through XGBoost's collective communication (local RabitTracker). Histogram
+sketches and gradients are all-reduced, so no process ever holds the full
+training matrix.
+
+The artefacts match 10_reco_engine.py (xgboost.pkl, label_encoder.pkl,
+feature_columns.json, meta.json), so the app picks the model up unchanged.
+Only the booster is retrained: if the training data has different classes
+or features than the LR model / bundle already in models/reco, the run
+aborts before training (rerun 10_reco_engine.py instead).
+
+Run:
+  python 12_reco_train_distributed.py
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from sklearn.preprocessing import LabelEncoder
+from sklearn.metrics import classification_report, accuracy_score
+
+import xgboost as xgb
+from xgboost import collective
+from xgboost.tracker import RabitTracker
+import joblib
+
+from reco.bundle import MANIFEST_FILE, current_bundle_dir, publish_booster, read_manifest
+
+
+DATA_DIR = Path("data/processed")
+MODEL_DIR = Path("models/reco")
+
+TRAIN_PATH = DATA_DIR / "all_features_train_n.parquet"
+VAL_PATH   = DATA_DIR / "all_features_val_n.parquet"
+TEST_PATH  = DATA_DIR / "all_features_test_n.parquet"
+
+BOOSTER_PATH = MODEL_DIR / "xgboost_distributed.ubj"
+
+N_WORKERS = max(1, min(4, os.cpu_count() or 1))
+TRAIN_TIMEOUT_S = 6 * 60 * 60
+WORKER_POLL_S = 1.0
+
+TARGET_COL = "purchase_cat_0"
+UNKNOWN_LABEL = "__UNKNOWN__"
+
+# Same model as 10_reco_engine.py, expressed as native parameters
+NUM_BOOST_ROUND = 300
+BASE_PARAMS = {
+    "objective": "multi:softmax",
+    "max_depth": 6,
+    "eta": 0.1,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "tree_method": "hist",
+    "eval_metric": "mlogloss",
+    "seed": 42,
+}
+
+BASE_FEATURES = [
+    "is_new_customer",
+    "p_purchase_recency",
+    "p_purchase_frequency",
+    "p_purchase_value",
+    "p_purchase_count",
+    "p_purchase_products",
+    "p_purchase_cat_0",
+    "p_purchase_brands",
+    "cart_recency",
+    "cart_value",
+    "cart_frequency",
+    "cart_count",
+    "cart_products",
+    "cart_cat_0",
+    "cart_brands",
+]
+
+
+def feature_columns(train_path: Path) -> list[str]:
+    cols = pl.scan_parquet(train_path).collect_schema().names()
+    p_purchase_cat = sorted(c for c in cols if c.startswith("p_purchase_count_"))
+    cart_cat = sorted(c for c in cols if c.startswith("cart_count_"))
+    return BASE_FEATURES + p_purchase_cat + cart_cat
+
+
+def fit_label_encoder(train_path: Path) -> LabelEncoder:
+    # Only the target column is read here; features stay in the workers.
+    y = (
+        pl.scan_parquet(train_path)
+          .select(pl.col(TARGET_COL).fill_null(UNKNOWN_LABEL).cast(pl.Utf8))
+          .collect()
+          .to_series()
+          .to_numpy()
+    )
+    encoder = LabelEncoder()
+    encoder.fit(y)
+    return encoder
+
+
+def check_existing_artefacts(feature_cols: list[str], label_encoder: LabelEncoder) -> None:
+    """
+    Only the booster is retrained here; the LR model, scaler and label
+    encoder already in MODEL_DIR must describe the same classes and features.
+    """
+    classes = [str(c) for c in label_encoder.classes_]
+    bundle_dir = current_bundle_dir(MODEL_DIR)
+
+    if (bundle_dir / MANIFEST_FILE).exists():
+        manifest = read_manifest(bundle_dir)
+        expected = ("bundle " + manifest["version"], manifest["classes"], manifest["feature_columns"])
+    elif (MODEL_DIR / "logistic_regression.pkl").exists():
+        old_encoder = joblib.load(MODEL_DIR / "label_encoder.pkl")
+        with open(MODEL_DIR / "feature_columns.json") as f:
+            expected = ("logistic_regression.pkl", [str(c) for c in old_encoder.classes_], json.load(f))
+    else:
+        return
+
+    source, expected_classes, expected_features = expected
+    if classes != expected_classes or feature_cols != expected_features:
+        raise RuntimeError(
+            f"❌ Training data classes/features differ from {source}; "
+            "rerun 10_reco_engine.py to retrain every model together"
+        )
+
+
+def shard_bounds(n_rows: int, rank: int, n_workers: int) -> tuple[int, int]:
+    """Contiguous [offset, offset + length) row range owned by `rank`."""
+    base, extra = divmod(n_rows, n_workers)
+    offset = rank * base + min(rank, extra)
+    length = base + (1 if rank < extra else 0)
+    return offset, length
+
+
+def load_shard(
+    train_path: Path,
+    feature_cols: list[str],
+    label_encoder: LabelEncoder,
+    offset: int,
+    length: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    shard = (
+        pl.scan_parquet(train_path)
+          .select(feature_cols + [TARGET_COL])
+          .slice(offset, length)
+          .collect()
+    )
+    X = shard.select(feature_cols).fill_null(0).to_numpy().astype(np.float32)
+    y_raw = shard[TARGET_COL].fill_null(UNKNOWN_LABEL).cast(pl.Utf8).to_numpy()
+    return X, label_encoder.transform(y_raw)
+
+
+def train_worker(
+    rank: int,
+    n_workers: int,
+    n_rows: int,
+    tracker_args: dict,
+    params: dict,
+    feature_cols: list[str],
+    label_encoder: LabelEncoder,
+) -> None:
+    offset, length = shard_bounds(n_rows, rank, n_workers)
+    X, y = load_shard(TRAIN_PATH, feature_cols, label_encoder, offset, length)
+
+    print(f"   [worker {rank}] rows {offset:,}–{offset + length:,}")
+
+    with collective.CommunicatorContext(**tracker_args):
+        dtrain = xgb.DMatrix(X, label=y, feature_names=feature_cols)
+        booster = xgb.train(params, dtrain, num_boost_round=NUM_BOOST_ROUND)
+
+        if collective.get_rank() == 0:
+            booster.save_model(BOOSTER_PATH)
+
+
+def train_distributed(
+    feature_cols: list[str],
+    label_encoder: LabelEncoder,
+    n_workers: int = N_WORKERS,
+    timeout_s: float = TRAIN_TIMEOUT_S,
+) -> xgb.XGBClassifier:
+    n_rows = pl.scan_parquet(TRAIN_PATH).select(pl.len()).collect().item()
+
+    params = {
+        **BASE_PARAMS,
+        "num_class": len(label_encoder.classes_),
+        # Split the host's cores between workers instead of oversubscribing
+        "nthread": max(1, (os.cpu_count() or 1) // n_workers),
+    }
+
+    tracker = RabitTracker(n_workers=n_workers, host_ip="127.0.0.1")
+    tracker.start()
+    tracker_args = tracker.worker_args()
+
+    ctx = mp.get_context("spawn")
+    workers = [
+        ctx.Process(
+            target=train_worker,
+            args=(rank, n_workers, n_rows, tracker_args, params,
+                  feature_cols, label_encoder),
+        )
+        for rank in range(n_workers)
+    ]
+
+    for w in workers:
+        w.start()
+
+    # A dead worker leaves the others blocked in an all-reduce, so stop
+    # everyone as soon as one fails (or the whole run takes too long)
+    deadline = time.monotonic() + timeout_s
+    failed = []
+    while any(w.is_alive() for w in workers):
+        failed = [(rank, w.exitcode) for rank, w in enumerate(workers) if w.exitcode not in (None, 0)]
+        if failed or time.monotonic() > deadline:
+            break
+        time.sleep(WORKER_POLL_S)
+    else:
+        failed = [(rank, w.exitcode) for rank, w in enumerate(workers) if w.exitcode != 0]
+
+    if failed or any(w.is_alive() for w in workers):
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+        for w in workers:
+            w.join()
+        if failed:
+            raise RuntimeError(f"❌ {len(failed)} worker(s) failed: (rank, exit code) {failed}")
+        raise RuntimeError(f"❌ Training did not finish within {timeout_s:.0f}s")
+
+    tracker.wait_for()
+
+    # Wrap the native booster so the artefact matches 10_reco_engine.py
+    model = xgb.XGBClassifier()
+    model.load_model(BOOSTER_PATH)
+    BOOSTER_PATH.unlink()
+    return model
+
+
+def evaluate(model_name, model, X, y_true, label_encoder) -> None:
+    preds = model.predict(X)
+    acc = accuracy_score(y_true, preds)
+    print(f"\n📊 {model_name} Accuracy: {acc:.4f}")
+    print(
+        classification_report(
+            y_true,
+            preds,
+            labels=np.arange(len(label_encoder.classes_)),
+            target_names=label_encoder.classes_,
+            zero_division=0
+        )
+    )
+
+
+def main() -> None:
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("📥 Preparing label encoder and feature list...")
+    feature_cols = feature_columns(TRAIN_PATH)
+    label_encoder = fit_label_encoder(TRAIN_PATH)
+    print(f"✅ Using {len(feature_cols)} features, {len(label_encoder.classes_)} classes")
+    check_existing_artefacts(feature_cols, label_encoder)
+
+    print(f"\n🧠 Training XGBoost data-parallel on {N_WORKERS} local workers...")
+    t0 = time.perf_counter()
+    xgb_model = train_distributed(feature_cols, label_encoder)
+    print(f"✅ Training finished in {time.perf_counter() - t0:.1f}s")
+
+    joblib.dump(xgb_model, MODEL_DIR / "xgboost.pkl")
+    joblib.dump(label_encoder, MODEL_DIR / "label_encoder.pkl")
+    with open(MODEL_DIR / "feature_columns.json", "w") as f:
+        json.dump(feature_cols, f, indent=2)
+
+    for name, path in (("Validation", VAL_PATH), ("Test", TEST_PATH)):
+        df = pd.read_parquet(path, columns=feature_cols + [TARGET_COL])
+        y = label_encoder.transform(df[TARGET_COL].fillna(UNKNOWN_LABEL).astype(str))
+        print(f"\n🔎 XGBoost – {name}")
+        evaluate(f"XGBoost ({name})", xgb_model, df[feature_cols].fillna(0), y, label_encoder)
+
+    models = ["XGBoostClassifier"]
+    if (MODEL_DIR / "logistic_regression.pkl").exists():
+        models.insert(0, "LogisticRegression")
+
+    meta = {
+        "models": models,
+        "n_features": len(feature_cols),
+        "target": TARGET_COL,
+        "classes": list(label_encoder.classes_),
+        "unknown_class_label": UNKNOWN_LABEL,
+        "xgboost_version": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "xgboost_workers": N_WORKERS,
+    }
+
+    with open(MODEL_DIR / "meta.json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if (current_bundle_dir(MODEL_DIR) / MANIFEST_FILE).exists():
+        # New versioned bundle; running apps hot-swap to it via CURRENT
+        bundle_dir = publish_booster(
+            MODEL_DIR,
+            xgb_model.get_booster(),
+            version=meta["xgboost_version"],
+            classes=meta["classes"],
+            feature_columns=feature_cols,
+        )
+        print(f"📦 Bundle published: {bundle_dir}")
+    else:
+        print("⚠️ No model bundle yet – run 10_reco_engine.py to create one")
+
+    print("\n✅ Distributed recommendation model training completed")
+    print(f"📦 Model artefacts saved in: {MODEL_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from reco.bundle import current_bundle_dir, load_bundle
+from reco.features import prepare_X
+from reco.reco_table import TOP_K, score_in_chunks, top_k, write_table
+
+# -----------------------------
+# Config
+# -----------------------------
+DEMO_FEATURES = "data/demo/demo_user_features.parquet"
+BUNDLE_DIR = current_bundle_dir(Path("models/reco"))
+OUT_TABLE = Path("data/demo/reco_topk.npz")
+
+# -----------------------------
+# Load model + demo users
+# -----------------------------
+print("📥 Loading model bundle and demo features...")
+bundle = load_bundle(BUNDLE_DIR)
+features = pd.read_parquet(DEMO_FEATURES)
+
+print(f"✅ Model version: {bundle.version}")
+print(f"👥 Demo users: {len(features):,}")
+
+X = prepare_X(features, bundle.feature_columns)
+
+# -----------------------------
+# Batch scoring
+# -----------------------------
+print("🧮 Scoring all demo users...")
+
+t0 = time.perf_counter()
+probs = score_in_chunks(bundle, X.to_numpy())
+class_idx, top_probs = top_k(probs, TOP_K)
+elapsed = time.perf_counter() - t0
+
+print(f"✅ Scored {len(X):,} users in {elapsed:.2f}s ({len(X) / elapsed:,.0f} users/s)")
+
+# -----------------------------
+# Persist top-k table
+# -----------------------------
+write_table(
+    OUT_TABLE,
+    user_ids=features["user_id"].to_numpy(),
+    class_idx=class_idx,
+    probs=top_probs,
+    classes=bundle.classes,
+    model_version=bundle.version,
+)
+
+print(f"💾 Top-{TOP_K} table written: {OUT_TABLE} ({OUT_TABLE.stat().st_size / 1024:.0f} KiB)")
+print("✅ Demo recommendation table completed")
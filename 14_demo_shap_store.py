@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from reco.bundle import current_bundle_dir, load_bundle
+from reco.features import prepare_X
+from reco.shap_store import TOP_N, build_records, write_store
+
+
+# -----------------------------
+# Config
+# -----------------------------
+DEMO_FEATURES = "data/demo/demo_user_features.parquet"
+BUNDLE_DIR = current_bundle_dir(Path("models/reco"))
+OUT_DIR = Path("data/demo/shap_store")
+
+
+def main() -> None:
+    # -----------------------------
+    # Load model + demo users
+    # -----------------------------
+    print("📥 Loading model bundle and demo features...")
+    bundle = load_bundle(BUNDLE_DIR)
+    features = pd.read_parquet(DEMO_FEATURES)
+
+    print(f"✅ Model version: {bundle.version}")
+    print(f"👥 Demo users: {len(features):,}")
+
+    X = prepare_X(features, bundle.feature_columns).to_numpy()
+
+    # -----------------------------
+    # SHAP in a process pool
+    # -----------------------------
+    print(f"🧠 Computing SHAP (top-2 classes, top-{TOP_N} features per user)...")
+
+    t0 = time.perf_counter()
+    records = build_records(BUNDLE_DIR, X)
+    elapsed = time.perf_counter() - t0
+
+    print(f"✅ Explained {len(X):,} users in {elapsed:.1f}s")
+
+    # -----------------------------
+    # Persist store
+    # -----------------------------
+    batch_dir = write_store(OUT_DIR, features["user_id"].to_numpy(), records, bundle)
+
+    size_kib = sum(p.stat().st_size for p in batch_dir.iterdir()) / 1024
+    print(f"💾 SHAP store written: {batch_dir} ({size_kib:.0f} KiB)")
+    print("✅ Demo SHAP store completed")
+
+
+# Process pool workers re-import this module
+if __name__ == "__main__":
+    main()
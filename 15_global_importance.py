@@ -0,0 +1,63 @@
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from reco.bundle import current_bundle_dir, load_bundle
+from reco.features import prepare_X
+from reco.global_importance import GlobalImportance, importance_path
+
+# -----------------------------
+# Config
+# -----------------------------
+DEMO_FEATURES = "data/demo/demo_user_features.parquet"
+BUNDLE_DIR = current_bundle_dir(Path("models/reco"))
+OUT_DIR = Path("data/demo")
+
+# -----------------------------
+# Load model + demo users
+# -----------------------------
+print("📥 Loading model bundle and demo features...")
+bundle = load_bundle(BUNDLE_DIR)
+features = pd.read_parquet(DEMO_FEATURES)
+
+print(f"✅ Model version: {bundle.version}")
+print(f"👥 Demo users: {len(features):,}")
+
+OUT_PATH = importance_path(OUT_DIR, bundle.version)
+
+# -----------------------------
+# Incremental update
+# -----------------------------
+importance = GlobalImportance.load(OUT_PATH, expected_version=bundle.version)
+
+if importance is None:
+    print("🆕 No importance file for this model version – computing from scratch")
+    importance = GlobalImportance.empty(bundle)
+else:
+    print(f"♻️ Existing importance covers {importance.n_users:,} users")
+
+X = prepare_X(features, bundle.feature_columns).to_numpy()
+
+t0 = time.perf_counter()
+added = importance.update(bundle, features["user_id"].to_numpy(), X)
+elapsed = time.perf_counter() - t0
+
+print(f"✅ Added {added:,} users in {elapsed:.1f}s (total {importance.n_users:,})")
+
+importance.save(OUT_PATH)
+
+# -----------------------------
+# Summary
+# -----------------------------
+top = (
+    pd.Series(importance.mean_abs(), index=importance.feature_columns)
+      .sort_values(ascending=False)
+      .head(10)
+)
+
+print("\n🔝 Top features by mean |SHAP| (all classes)")
+for feature, value in top.items():
+    print(f"  {feature:<35} {value:.4f}")
+
+print(f"\n💾 Global importance written: {OUT_PATH}")
@@ -0,0 +1,57 @@
+import polars as pl
+from pathlib import Path
+
+from reco.user_store import EVENTS_FILE, FEATURES_FILE, build_index, write_index
+
+# -----------------------------
+# Config
+# -----------------------------
+DEMO_EVENTS = "data/demo/demo_user_events.parquet"
+DEMO_FEATURES = "data/demo/demo_user_features.parquet"
+OUT_DIR = Path("data/demo/user_store")
+
+OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# -----------------------------
+# Cluster events by user
+# -----------------------------
+print("📥 Sorting demo events by user (latest first)...")
+
+events = (
+    pl.scan_parquet(DEMO_EVENTS)
+    .with_columns(pl.col("user_id").cast(pl.Utf8))
+    .sort(["user_id", "timestamp"], descending=[False, True])
+    .collect()
+)
+
+print(f"✅ Events: {events.height:,}")
+
+# -----------------------------
+# One feature row per user, same order
+# -----------------------------
+features = (
+    pl.scan_parquet(DEMO_FEATURES)
+    .with_columns(pl.col("user_id").cast(pl.Utf8))
+    .unique(subset="user_id", keep="first")
+    .sort("user_id")
+    .collect()
+)
+
+print(f"✅ Users: {features.height:,}")
+
+# -----------------------------
+# Persist tables + offsets index
+# -----------------------------
+events.write_parquet(OUT_DIR / EVENTS_FILE)
+features.write_parquet(OUT_DIR / FEATURES_FILE)
+
+# Index last: the store only becomes visible once it is complete
+index = build_index(events["user_id"].to_numpy(), features["user_id"].to_numpy())
+write_index(OUT_DIR, index)
+
+users_without_events = int((index["event_start"] == index["event_end"]).sum())
+if users_without_events:
+    print(f"⚠️ {users_without_events:,} users have no events")
+
+print(f"💾 User store written: {OUT_DIR}")
+print("✅ Demo user store completed")
@@ -0,0 +1,55 @@
+import pyarrow.parquet as pq
+from pathlib import Path
+
+from reco.bundle import current_bundle_dir, load_bundle
+from reco.data_plane import export_data_plane
+from reco.tree_predictor import FlatTreeEnsemble
+from reco.user_store import FEATURES_FILE, UserStore
+
+# -----------------------------
+# Config
+# -----------------------------
+BUNDLE_DIR = current_bundle_dir(Path("models/reco"))
+USER_STORE_DIR = Path("data/demo/user_store")
+OUT_DIR = Path("data/demo/plane")
+
+# -----------------------------
+# Load model + user store
+# -----------------------------
+print("📥 Loading model bundle and user store...")
+bundle = load_bundle(BUNDLE_DIR)
+
+store = UserStore.open(USER_STORE_DIR)
+if store is None:
+    raise FileNotFoundError(
+        f"{USER_STORE_DIR} not found – run 16_demo_user_store.py first"
+    )
+
+events = store.events_table
+features = pq.read_table(USER_STORE_DIR / FEATURES_FILE)
+
+print(f"✅ Model version: {bundle.version}")
+print(f"👥 Users: {store.n_users:,} | Events: {events.num_rows:,}")
+
+# -----------------------------
+# Flatten trees
+# -----------------------------
+print("🌲 Flattening tree ensemble...")
+ensemble = FlatTreeEnsemble.from_booster(bundle.booster)
+print(f"✅ Trees: {ensemble.n_trees:,} | Nodes: {len(ensemble.feature):,}")
+
+# -----------------------------
+# Export (uncompressed Arrow IPC + .npy, memory-mappable)
+# -----------------------------
+export_dir = export_data_plane(
+    OUT_DIR,
+    model_version=bundle.version,
+    ensemble=ensemble,
+    events=events.combine_chunks(),
+    features=features.combine_chunks(),
+    index=store.index,
+)
+
+size_mb = sum(p.stat().st_size for p in export_dir.rglob("*") if p.is_file()) / 1e6
+print(f"💾 Data plane written: {export_dir} ({size_mb:.1f} MB)")
+print("✅ Data plane export completed")
@@ -1,6 +1,12 @@
 import streamlit as st
 from pathlib import Path
 
+import reco_runtime
+
+# Time-to-first-render; the model warm-up starts with the first page served
+RENDER_START = reco_runtime.render_started()
+reco_runtime.start_warmup()
+
 # ---------- Page Config ----------
 st.set_page_config(
     page_title="Overview & Welcome",
@@ -97,3 +103,5 @@ st.markdown("---")
 st.info(
     "When you are ready, click **Continue** (top-right) to learn how the experience works."
 )
+
+reco_runtime.render_finished("app", RENDER_START)
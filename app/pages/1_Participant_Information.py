@@ -1,6 +1,12 @@
 import streamlit as st
 from pathlib import Path
 
+import reco_runtime
+
+# Time-to-first-render; the model warm-up starts with the first page served
+RENDER_START = reco_runtime.render_started()
+reco_runtime.start_warmup()
+
 # ---------- Page Config ----------
 st.set_page_config(
     page_title="Participant Information Sheet",
@@ -101,3 +107,5 @@ st.markdown("""
 **Researcher:** Devam Saxena – MS in Data Science and Artificial Intelligence, University of Liverpool – D.Saxena2@liverpool.ac.uk  
 **Supervisor:** Dr Haitham Hussien – University of Liverpool – H.Hussien@liverpool.ac.uk
 """)
+
+reco_runtime.render_finished("1_Participant_Information", RENDER_START)
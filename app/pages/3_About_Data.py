@@ -1,6 +1,12 @@
 import streamlit as st
 from pathlib import Path
 
+import reco_runtime
+
+# Time-to-first-render; the model warm-up starts with the first page served
+RENDER_START = reco_runtime.render_started()
+reco_runtime.start_warmup()
+
 # ---------- Page Config ----------
 st.set_page_config(
     page_title="About the Data",
@@ -150,3 +156,5 @@ st.markdown("---")
 st.info(
     "When you are ready, please continue to the next page to learn about the models and overall results used in this study."
 )
+
+reco_runtime.render_finished("3_About_Data", RENDER_START)
@@ -1,6 +1,12 @@
 import streamlit as st
 from pathlib import Path
 
+import reco_runtime
+
+# Time-to-first-render; the model warm-up starts with the first page served
+RENDER_START = reco_runtime.render_started()
+reco_runtime.start_warmup()
+
 # ---------- Page Config ----------
 st.set_page_config(
     page_title="About Models & Results",
@@ -143,3 +149,5 @@ You will then be asked to reflect on differences in:
 st.info(
     "There are no right or wrong answers. The study focuses on your professional judgement and perception."
 )
+
+reco_runtime.render_finished("4_About_Models_Results", RENDER_START)
@@ -1,9 +1,11 @@
 import streamlit as st
-from pathlib import Path
-import json
 import numpy as np
-import pandas as pd
-import joblib
+
+import reco_runtime
+
+# Time-to-first-render; starts the model warm-up if no page has yet
+RENDER_START = reco_runtime.render_started()
+reco_runtime.start_warmup()
 
 # ---------- Page Config ----------
 st.set_page_config(
@@ -11,57 +13,30 @@ st.set_page_config(
     layout="wide"
 )
 
-# ---------- Paths ----------
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-DATA_DIR = BASE_DIR / "data" / "demo"
-MODEL_DIR = BASE_DIR / "models" / "reco"
-
-# ---------- Load Models ----------
-@st.cache_resource
-def load_models():
-    with open(MODEL_DIR / "feature_columns.json") as f:
-        feature_cols = json.load(f)
-
-    label_encoder = joblib.load(MODEL_DIR / "label_encoder.pkl")
-    xgb_model = joblib.load(MODEL_DIR / "xgboost.pkl")
-
-    return feature_cols, label_encoder, xgb_model
+from reco.features import prepare_X
+from reco.user_store import EVENT_PAGE_SIZE
 
+# ---------- Load Models + Demo Data ----------
+# Owned by the shared runtime (one copy per process, warmed in the
+# background); mapped read-only from the data plane when exported
+with reco_runtime.span("load"):
+    assets = reco_runtime.assets()
 
-feature_cols, label_encoder, xgb_model = load_models()
+feature_cols = assets.feature_cols
+user_store = assets.user_store
 
-# ---------- Load Demo Data ----------
-@st.cache_data
-def load_demo_data():
-    events = pd.read_parquet(DATA_DIR / "demo_user_events.parquet")
-    features = pd.read_parquet(DATA_DIR / "demo_user_features.parquet")
-    return events, features
-
-
-events_df, features_df = load_demo_data()
+# Per-request latency budget for scoring (ms)
+LATENCY_BUDGET_MS = 100
 
 # ---------- Helpers ----------
-def prepare_X_for_model(df: pd.DataFrame, feature_cols: list) -> pd.DataFrame:
-    """
-    Align demo features with model-required features.
-    Missing features (e.g. is_new_customer) are injected as 0.
-    """
-    X = df.copy()
-
-    for col in feature_cols:
-        if col not in X.columns:
-            X[col] = 0
-
-    X = X[feature_cols]
-    X = X.replace([np.inf, -np.inf], np.nan).fillna(0.0)
-
-    return X
-
-
-def predict_top_k(model, X, k=3):
-    probs = model.predict_proba(X)[0]
-    top_idx = np.argsort(probs)[::-1][:k]
-    return [(label_encoder.classes_[i], float(probs[i])) for i in top_idx]
+def predict_top_k(user_id, X, k=3):
+    # Table → shared cache → inference service → tiered scorer
+    top, tier = reco_runtime.recommend(
+        user_id, X.to_numpy(dtype=np.float32), k=k, budget_ms=LATENCY_BUDGET_MS
+    )
+    # Record which tier answered this rerun
+    st.session_state["reco_tier"] = tier
+    return top
 
 
 # ---------- UI ----------
@@ -77,17 +52,19 @@ This mirrors how many real-world AI systems are presented to business users.
 st.markdown("---")
 
 # ---------- User Selection ----------
-user_ids = sorted(features_df["user_id"].unique())
-selected_user = st.selectbox("Select a demo user", user_ids)
+# Prefix search over the sorted ids; lookups are a binary search
+selected_user = reco_runtime.select_user(user_store)
 
-user_features = features_df[features_df["user_id"] == selected_user]
-user_events = events_df[events_df["user_id"] == selected_user]
+with reco_runtime.span("load"):
+    user_features = user_store.features(selected_user)
 
 # ---------- Feature Alignment ----------
-X = prepare_X_for_model(user_features, feature_cols)
+with reco_runtime.span("align"):
+    X = prepare_X(user_features, feature_cols)
 
-# ---------- Predictions (XGBoost only) ----------
-xgb_top = predict_top_k(xgb_model, X, k=3)
+# ---------- Predictions (XGBoost, LR fallback under load) ----------
+with reco_runtime.span("predict"):
+    xgb_top = predict_top_k(selected_user, X, k=3)
 
 # ---------- Display Predictions ----------
 st.header("Recommended Categories")
@@ -104,10 +81,20 @@ st.markdown("---")
 
 # ---------- Event Log ----------
 st.header("User Event Log")
-st.dataframe(
-    user_events.sort_values("timestamp", ascending=False),
-    use_container_width=True
+n_events = user_store.n_events(selected_user)
+n_pages = max(1, -(-n_events // EVENT_PAGE_SIZE))
+page = st.number_input(
+    "Page", min_value=1, max_value=n_pages, value=1,
+    key=f"events_page_{selected_user}",
+)
+first = (page - 1) * EVENT_PAGE_SIZE
+st.caption(
+    f"Events {min(first + 1, n_events):,}–{min(first + EVENT_PAGE_SIZE, n_events):,} "
+    f"of {n_events:,} (latest first)"
 )
+with reco_runtime.span("load"):
+    events_page = user_store.events(selected_user, page=page - 1)
+st.dataframe(events_page, use_container_width=True)
 
 # ---------- Feature Values ----------
 st.header("Model Input Features")
@@ -120,3 +107,5 @@ st.caption(
     "Missing features (e.g. cold-start flags) are injected as zero at inference time. "
     "This is standard practice in production recommendation systems."
 )
+
+reco_runtime.render_finished("5_Black_Box_Reco", RENDER_START)
@@ -1,11 +1,12 @@
 import streamlit as st
-from pathlib import Path
-import json
 import numpy as np
 import pandas as pd
-import joblib
-import shap
-import matplotlib.pyplot as plt
+
+import reco_runtime
+
+# Time-to-first-render; starts the model warm-up if no page has yet
+RENDER_START = reco_runtime.render_started()
+reco_runtime.start_warmup()
 
 # --------------------------------------------------
 # Page Config
@@ -18,59 +19,85 @@ st.set_page_config(
 # --------------------------------------------------
 # Paths
 # --------------------------------------------------
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-DATA_DIR = BASE_DIR / "data" / "demo"
-MODEL_DIR = BASE_DIR / "models" / "reco"
+DATA_DIR = reco_runtime.BASE_DIR / "data" / "demo"
+
+from reco.cohort import ALL, CUSTOMER_TYPES, RECENCY_BUCKETS, Segment, segment_mask
+from reco.explain import APPROXIMATE, EXACT, LinearExplainer
+from reco.features import prepare_X
+from reco.global_importance import GlobalImportance, importance_path
+from reco.service_client import ServiceError
+from reco.shap_store import ShapStore
+from reco.tree_predictor import WhatIfSession
+from reco.user_store import EVENT_PAGE_SIZE
 
 # --------------------------------------------------
-# Load model + metadata
+# Load model + demo data
 # --------------------------------------------------
-@st.cache_resource
-def load_model_assets():
-    with open(MODEL_DIR / "feature_columns.json") as f:
-        feature_cols = json.load(f)
+# Owned by the shared runtime (one copy per process, warmed in the
+# background); mapped read-only from the data plane when exported
+with reco_runtime.span("load"):
+    assets = reco_runtime.assets()
 
-    label_encoder = joblib.load(MODEL_DIR / "label_encoder.pkl")
-    xgb_model = joblib.load(MODEL_DIR / "xgboost.pkl")
+feature_cols = assets.feature_cols
+bundle = assets.bundle
+scorer = assets.scorer
+user_store = assets.user_store
+features_df = user_store.features_df
 
-    return feature_cols, label_encoder, xgb_model
 
+# Keyed by model version: a hot-swapped model gets its own explainers
+@st.cache_resource(max_entries=2)
+def load_explainers(model_version, _bundle):
+    # Logistic regression: exact closed-form contributions
+    lr_explainer = LinearExplainer(_bundle)
 
-feature_cols, label_encoder, xgb_model = load_model_assets()
+    # Offline explanations (14_demo_shap_store.py), filled lazily
+    shap_store = ShapStore.open(DATA_DIR / "shap_store", model_version)
 
-# --------------------------------------------------
-# Load demo data
-# --------------------------------------------------
-@st.cache_data
-def load_demo_data():
-    events = pd.read_parquet(DATA_DIR / "demo_user_events.parquet")
-    features = pd.read_parquet(DATA_DIR / "demo_user_features.parquet")
-    return events, features
+    # Population mean |SHAP| (15_global_importance.py) for this model version
+    global_importance = GlobalImportance.load(
+        importance_path(DATA_DIR, model_version), expected_version=model_version
+    )
 
+    return lr_explainer, shap_store, global_importance
 
-events_df, features_df = load_demo_data()
 
-# --------------------------------------------------
-# Helpers
-# --------------------------------------------------
-def prepare_X(X: pd.DataFrame) -> pd.DataFrame:
-    X = X.copy()
+# Native XGBoost contributions (pred_contribs), warmed with the model
+explainer = assets.explainer
+with reco_runtime.span("load"):
+    lr_explainer, shap_store, global_importance = load_explainers(bundle.version, bundle)
+
+# matplotlib is imported lazily (already loaded by the runtime warm-up)
+plt = reco_runtime.pyplot()
 
-    # Add missing model features safely (e.g. is_new_customer)
-    for col in feature_cols:
-        if col not in X.columns:
-            X[col] = 0
+# Per-request latency budget for scoring (ms)
+LATENCY_BUDGET_MS = 100
 
-    X = X[feature_cols]
-    X = X.replace([np.inf, -np.inf], np.nan)
-    X = X.fillna(0.0)
-    return X
+MODEL_XGB = "xgboost"
+MODEL_LR = "logistic_regression"
 
 
-def get_top_predictions(model, X, k=2):
-    probs = model.predict_proba(X)[0]
-    idx = np.argsort(probs)[::-1][:k]
-    return [(label_encoder.classes_[i], probs[i]) for i in idx]
+@st.cache_resource(max_entries=2)
+def load_cohort_assets(model_version):
+    # Whole demo population, aligned and scored once per process
+    X_all = prepare_X(features_df, feature_cols)
+    predicted = bundle.classes[bundle.xgb_predict_proba(X_all).argmax(axis=1)]
+
+    features_path = DATA_DIR / "demo_user_features.parquet"
+    fingerprint = f"{len(features_df)}:{features_path.stat().st_mtime_ns}"
+    return X_all, predicted, fingerprint
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def get_top_predictions(user_id, X, k=2):
+    # Table → shared cache → inference service → tiered scorer
+    top, tier = reco_runtime.recommend(
+        user_id, X.to_numpy(dtype=np.float32), k=k, budget_ms=LATENCY_BUDGET_MS
+    )
+    # Record which tier answered this rerun
+    st.session_state["reco_tier"] = tier
+    return top
 
 
 # --------------------------------------------------
@@ -89,74 +116,170 @@ Unlike the black-box view, this page shows:
 
 st.markdown("---")
 
-# --------------------------------------------------
-# User selection
-# --------------------------------------------------
-user_ids = sorted(features_df["user_id"].unique())
-selected_user = st.selectbox("Select a demo user", user_ids)
-
-user_features = features_df[features_df["user_id"] == selected_user]
-user_events = events_df[events_df["user_id"] == selected_user]
-
-X = prepare_X(user_features)
+view = st.radio("View", ["Single user", "Cohort"], horizontal=True)
 
 # --------------------------------------------------
-# Predictions
+# Cohort explorer (aggregated SHAP over a segment)
 # --------------------------------------------------
-top_preds = get_top_predictions(xgb_model, X, k=2)
+if view == "Cohort":
+    with reco_runtime.span("load"):
+        X_all, predicted_all, data_fingerprint = load_cohort_assets(bundle.version)
+        # Owned by the runtime: its worker pool is shut down on a model swap
+        cohort_explainer = reco_runtime.cohort_explainer(assets)
 
-(top1_label, top1_prob), (top2_label, top2_prob) = top_preds
+    col_type, col_recency, col_category = st.columns(3)
+    with col_type:
+        customer_type = st.selectbox("Customer type", CUSTOMER_TYPES, format_func=str.title)
+    with col_recency:
+        recency_bucket = st.selectbox("Purchase recency", [ALL, *RECENCY_BUCKETS])
+    with col_category:
+        predicted_category = st.selectbox("Predicted category", [ALL, *bundle.classes])
 
-st.subheader("Model Predictions")
+    segment = Segment(customer_type, recency_bucket, str(predicted_category))
+    # Raw features: a missing recency must not look like "0 days"
+    mask = segment_mask(segment, features_df, predicted_all)
 
-st.write(f"**Top Recommendation:** {top1_label} — {top1_prob:.2%}")
-st.write(f"**Next Best Alternative:** {top2_label} — {top2_prob:.2%}")
+    if not mask.any():
+        st.info("No demo users match this segment.")
+        reco_runtime.render_finished("6_Explainable_Reco", RENDER_START)
+        st.stop()
 
-st.markdown("---")
+    with reco_runtime.span("shap"):
+        cohort_values = cohort_explainer.explain(
+            segment, X_all.to_numpy(dtype=np.float32)[mask], data_fingerprint
+        )
 
-# --------------------------------------------------
-# SHAP Explainer (TreeExplainer – correct usage)
-# --------------------------------------------------
-explainer = shap.TreeExplainer(xgb_model)
-shap_values = explainer.shap_values(X)
+    st.subheader(f"What drives recommendations for {mask.sum():,} users")
+    st.markdown("""
+Each user is explained towards **their own recommended category**; the charts
+aggregate those SHAP values across the segment.
+""")
 
-top1_class_idx = label_encoder.transform([top1_label])[0]
+    COHORT_TOP_N = 12
+    order = np.argsort(np.abs(cohort_values).mean(axis=0))[::-1][:COHORT_TOP_N]
+    top_features = [feature_cols[i] for i in order]
+
+    with reco_runtime.span("plot"):
+        fig_m, ax_m = plt.subplots(figsize=(8, 5))
+        ax_m.barh(top_features[::-1], np.abs(cohort_values[:, order]).mean(axis=0)[::-1])
+        ax_m.set_title("Mean |SHAP| in segment")
+        ax_m.set_xlabel("Average impact on model output")
+        st.pyplot(fig_m)
+
+        fig_d, ax_d = plt.subplots(figsize=(8, 5))
+        ax_d.boxplot(
+            [cohort_values[:, i] for i in order[::-1]],
+            vert=False,
+            tick_labels=top_features[::-1],
+            showfliers=False,
+        )
+        ax_d.axvline(0, color="grey", linewidth=0.8)
+        ax_d.set_title("Distribution of SHAP values in segment")
+        ax_d.set_xlabel("Impact on model output")
+        st.pyplot(fig_d)
+
+    reco_runtime.render_finished("6_Explainable_Reco", RENDER_START)
+    st.stop()
 
 # --------------------------------------------------
-# Handle SHAP output formats (critical fix)
+# User selection
 # --------------------------------------------------
+# Prefix search over the sorted ids; lookups are a binary search
+selected_user = reco_runtime.select_user(user_store)
 
-if isinstance(shap_values, list):
-    # Legacy multiclass format: list[class] -> (n_samples, n_features)
-    shap_local = shap_values[top1_class_idx][0]
+with reco_runtime.span("load"):
+    user_features = user_store.features(selected_user)
 
-elif isinstance(shap_values, np.ndarray):
-    # New format: (n_samples, n_features, n_classes)
-    shap_local = shap_values[0, :, top1_class_idx]
+with reco_runtime.span("align"):
+    X = prepare_X(user_features, feature_cols)
+    X_values = X.to_numpy(dtype=np.float32)
 
-else:
-    raise RuntimeError("Unsupported SHAP output format")
+model_choice = st.radio(
+    "Model to explain",
+    [MODEL_XGB, MODEL_LR],
+    format_func=lambda m: (
+        "XGBoost (SHAP)" if m == MODEL_XGB else "Logistic Regression (closed form)"
+    ),
+    horizontal=True,
+)
 
 # --------------------------------------------------
-# SHAP feature alignment (robust for XGBoost)
+# Predictions
 # --------------------------------------------------
+with reco_runtime.span("predict"):
+    if model_choice == MODEL_LR:
+        lr_probs = scorer.score_lr(X_values)[0]
+        top_preds = [
+            (bundle.classes[i], float(lr_probs[i]))
+            for i in np.argsort(lr_probs)[::-1][:2]
+        ]
+    else:
+        top_preds = get_top_predictions(selected_user, X, k=2)
 
-n_shap_features = len(shap_local)
+(top1_label, top1_prob), (top2_label, top2_prob) = top_preds
 
-# SHAP may not expose feature names → fall back to X columns
-if explainer.feature_names is not None:
-    shap_feature_names = explainer.feature_names
-else:
-    shap_feature_names = X.columns[:n_shap_features].tolist()
+st.subheader("Model Predictions")
 
-# Final safety check
-assert len(shap_feature_names) == n_shap_features, (
-    f"SHAP feature mismatch: "
-    f"{len(shap_feature_names)} names vs {n_shap_features} values"
-)
+st.write(f"**Top Recommendation:** {top1_label} — {top1_prob:.2%}")
+st.write(f"**Next Best Alternative:** {top2_label} — {top2_prob:.2%}")
+
+st.markdown("---")
+
+# --------------------------------------------------
+# SHAP explanation (precomputed store, lazy fill)
+# --------------------------------------------------
+top1_class_idx = bundle.class_index(top1_label)
+top2_class_idx = bundle.class_index(top2_label)
+
+if model_choice == MODEL_XGB:
+    explain_mode = st.radio(
+        "Explanation mode",
+        [EXACT, APPROXIMATE],
+        format_func=lambda m: "Exact (TreeSHAP)" if m == EXACT else "Approximate (faster)",
+        horizontal=True,
+    )
+
+with reco_runtime.span("shap"):
+    stored_classes = []
+    if model_choice == MODEL_XGB and explain_mode == EXACT:
+        # Top-N contributions of the user's top-2 classes; users that were not
+        # precomputed are explained once and persisted for later reruns
+        record = reco_runtime.run_or_stop(
+            shap_store.get_or_compute, selected_user, bundle, explainer, X_values
+        )
+        stored_classes = record["classes"].tolist()
+
+    if model_choice == MODEL_LR:
+        # coefficient × standardized value: exact for a linear model
+        contribs, _ = lr_explainer.explain_class(X_values, top1_class_idx)
+        shap_local = contribs[0]
+        shap_idx = np.arange(len(shap_local))
+    elif top1_class_idx in stored_classes:
+        pos = stored_classes.index(top1_class_idx)
+        shap_idx = record["feature_idx"][pos].astype(int)
+        shap_local = record["shap"][pos].astype(np.float32)
+    else:
+        # Approximate mode, or a top-1 from a different scoring tier than the
+        # store: explain the requested class live (via the inference service
+        # when configured and serving this model, in-process otherwise)
+        contribs = None
+        client = reco_runtime.service_client()
+        if client is not None and explain_mode == EXACT:
+            try:
+                service_contribs, _, service_version = client.explain(selected_user, top1_label)
+                if service_version == bundle.version:
+                    contribs = service_contribs.reshape(1, -1)
+            except ServiceError:
+                pass
+        if contribs is None:
+            contribs, _ = reco_runtime.explain_class(X_values, top1_class_idx, explain_mode)
+        shap_local = contribs[0]
+        shap_idx = np.arange(len(shap_local))
+
+shap_feature_names = [feature_cols[i] for i in shap_idx]
 
 # Extract corresponding feature values
-X_row = X.iloc[0][shap_feature_names].values
+X_row = X_values[0, shap_idx]
 
 shap_df = (
     pd.DataFrame({
@@ -185,14 +308,18 @@ The chart below shows the **most influential features** that led the model to re
 TOP_N = 12
 local_top = shap_df.head(TOP_N)
 
-fig, ax = plt.subplots(figsize=(8, 5))
-ax.barh(
-    local_top["Feature"][::-1],
-    local_top["SHAP Value"][::-1]
-)
-ax.set_title("Local Feature Contributions (SHAP)")
-ax.set_xlabel("Impact on Model Output")
-st.pyplot(fig)
+with reco_runtime.span("plot"):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.barh(
+        local_top["Feature"][::-1],
+        local_top["SHAP Value"][::-1]
+    )
+    ax.set_title(
+        "Local Feature Contributions (SHAP)" if model_choice == MODEL_XGB
+        else "Local Feature Contributions (coefficient × standardized value)"
+    )
+    ax.set_xlabel("Impact on Model Output")
+    st.pyplot(fig)
 
 st.markdown("---")
 
@@ -209,34 +336,150 @@ confidence** to **{top1_label}**.
 - The features above contributed more strongly toward **{top1_label}**
 """)
 
+if model_choice == MODEL_LR:
+    # Difference of the two class coefficient vectors, applied to this user
+    contrast, _ = lr_explainer.contrast(X_values, top1_class_idx, top2_class_idx)
+    contrast_df = (
+        pd.DataFrame({"Feature": feature_cols, "Contribution": contrast[0]})
+        .assign(abs_val=lambda d: d["Contribution"].abs())
+        .sort_values("abs_val", ascending=False)
+        .head(TOP_N)
+    )
+
+    with reco_runtime.span("plot"):
+        fig_c, ax_c = plt.subplots(figsize=(8, 5))
+        ax_c.barh(
+            contrast_df["Feature"][::-1],
+            contrast_df["Contribution"][::-1]
+        )
+        ax_c.set_title(f"{top1_label} vs {top2_label} (Logistic Regression)")
+        ax_c.set_xlabel(f"Positive → favours {top1_label}, negative → favours {top2_label}")
+        st.pyplot(fig_c)
+
 # --------------------------------------------------
-# Global explanation (dataset-level)
+# What-if analysis (XGBoost, incremental rescoring)
 # --------------------------------------------------
-st.subheader("Global Feature Importance (Model-level)")
+st.subheader("What if this user behaved differently?")
 
 st.markdown("""
-This chart shows which features the model relies on **most often across all users**.
+Change a few feature values to see how the recommendation responds. Only the
+trees that split on an edited feature are re-evaluated, so updates are instant.
 """)
 
-# Use XGBoost gain importance
-importance = xgb_model.get_booster().get_score(importance_type="gain")
-global_df = (
+# One session per user and model version: caches the per-tree leaf outputs
+# of the edited row so each edit only re-traverses the affected trees
+session_key = (selected_user, bundle.version)
+if st.session_state.get("whatif_key") != session_key:
+    st.session_state["whatif_key"] = session_key
+    st.session_state["whatif"] = WhatIfSession(scorer.ensemble, X_values[0])
+whatif = st.session_state["whatif"]
+
+default_edit = [f for f in shap_df["Feature"].head(3) if f in feature_cols]
+edit_features = st.multiselect("Features to edit", feature_cols, default=default_edit)
+
+changes = {}
+edit_cols = st.columns(3)
+for n, feature in enumerate(edit_features):
+    j = feature_cols.index(feature)
+    changes[j] = edit_cols[n % 3].number_input(
+        feature,
+        value=float(X_values[0, j]),
+        key=f"whatif_{selected_user}_{feature}",
+    )
+
+# Features dropped from the editor go back to the user's real value
+for j in np.flatnonzero(whatif.x != X_values[0]):
+    changes.setdefault(int(j), float(X_values[0, j]))
+
+with reco_runtime.span("whatif"):
+    whatif_probs = whatif.set_values(changes)
+    base_probs = scorer.ensemble.predict_proba(X_values)[0]
+
+whatif_top = np.argsort(whatif_probs)[::-1][:3]
+st.dataframe(
     pd.DataFrame({
-        "Feature": importance.keys(),
-        "Importance": importance.values()
-    })
-    .sort_values("Importance", ascending=False)
-    .head(15)
+        "Category": bundle.classes[whatif_top],
+        "Original": [f"{base_probs[i]:.2%}" for i in whatif_top],
+        "What-if": [f"{whatif_probs[i]:.2%}" for i in whatif_top],
+    }),
+    use_container_width=True,
+    hide_index=True,
 )
-
-fig2, ax2 = plt.subplots(figsize=(8, 5))
-ax2.barh(
-    global_df["Feature"][::-1],
-    global_df["Importance"][::-1]
+st.caption(
+    f"Re-evaluated {whatif.last_retraversed:,} of "
+    f"{scorer.ensemble.n_trees:,} trees for the last edit."
 )
-ax2.set_title("Global Feature Importance (XGBoost)")
-ax2.set_xlabel("Average Gain")
-st.pyplot(fig2)
+
+if np.any(whatif.x != X_values[0]):
+    whatif_class = int(whatif_top[0])
+    with reco_runtime.span("shap"):
+        whatif_contribs, _ = reco_runtime.explain_class(
+            whatif.x.reshape(1, -1), whatif_class, EXACT
+        )
+    whatif_df = (
+        pd.DataFrame({"Feature": feature_cols, "SHAP Value": whatif_contribs[0]})
+        .assign(abs_val=lambda d: d["SHAP Value"].abs())
+        .sort_values("abs_val", ascending=False)
+        .head(TOP_N)
+    )
+
+    with reco_runtime.span("plot"):
+        fig_w, ax_w = plt.subplots(figsize=(8, 5))
+        ax_w.barh(
+            whatif_df["Feature"][::-1],
+            whatif_df["SHAP Value"][::-1]
+        )
+        ax_w.set_title(f"What-if Contributions (SHAP, {bundle.classes[whatif_class]})")
+        ax_w.set_xlabel("Impact on Model Output")
+        st.pyplot(fig_w)
+
+st.markdown("---")
+
+# --------------------------------------------------
+# Global explanation (dataset-level)
+# --------------------------------------------------
+st.subheader("Global Feature Importance (Model-level)")
+
+st.markdown("""
+This chart shows which features the model relies on **most often across all users**.
+""")
+
+if global_importance is not None:
+    # Precomputed mean |SHAP| over the demo population for the recommended
+    # category – the same SHAP values as the local chart above
+    global_df = (
+        pd.DataFrame({
+            "Feature": global_importance.feature_columns,
+            "Importance": global_importance.mean_abs(top1_class_idx)
+        })
+        .sort_values("Importance", ascending=False)
+        .head(15)
+    )
+    global_title = f"Global Feature Importance (XGBoost, {top1_label})"
+    global_xlabel = f"Mean |SHAP| over {global_importance.n_users:,} users"
+else:
+    # Fallback until 15_global_importance.py has run for this model
+    importance = bundle.booster.get_score(importance_type="gain")
+    global_df = (
+        pd.DataFrame({
+            "Feature": importance.keys(),
+            "Importance": importance.values()
+        })
+        .sort_values("Importance", ascending=False)
+        .head(15)
+    )
+    global_title = "Global Feature Importance (XGBoost)"
+    global_xlabel = "Average Gain"
+
+with reco_runtime.span("plot"):
+    fig2, ax2 = plt.subplots(figsize=(8, 5))
+    ax2.barh(
+        global_df["Feature"][::-1],
+        global_df["Importance"][::-1]
+    )
+    ax2.set_title(global_title)
+    ax2.set_xlabel(global_xlabel)
+    st.pyplot(fig2)
 
 st.markdown("---")
 
@@ -244,10 +487,20 @@ st.markdown("---")
 # Event log
 # --------------------------------------------------
 st.subheader("User Event Log")
-st.dataframe(
-    user_events.sort_values("timestamp", ascending=False),
-    use_container_width=True
+n_events = user_store.n_events(selected_user)
+n_pages = max(1, -(-n_events // EVENT_PAGE_SIZE))
+page = st.number_input(
+    "Page", min_value=1, max_value=n_pages, value=1,
+    key=f"events_page_{selected_user}",
 )
+first = (page - 1) * EVENT_PAGE_SIZE
+st.caption(
+    f"Events {min(first + 1, n_events):,}–{min(first + EVENT_PAGE_SIZE, n_events):,} "
+    f"of {n_events:,} (latest first)"
+)
+with reco_runtime.span("load"):
+    events_page = user_store.events(selected_user, page=page - 1)
+st.dataframe(events_page, use_container_width=True)
 
 # --------------------------------------------------
 # Feature values
@@ -261,4 +514,6 @@ st.dataframe(
 st.caption(
     "SHAP explanations are shown for the final decision made by the model. "
     "Alternative categories are compared using predicted probabilities."
-)
\ No newline at end of file
+)
+
+reco_runtime.render_finished("6_Explainable_Reco", RENDER_START)
@@ -0,0 +1,470 @@
+"""
+Process-wide recommendation runtime shared by the app and its pages.
+
+Owns the serving assets – model bundle and its classes, feature columns,
+tree predictor, tiered scorer, XGBoost explainer, top-k table and demo
+user store. Importing this module is cheap: numpy, xgboost,
+matplotlib and the `reco` package are imported on first use.
+
+`start_warmup()` is called from app.py and every page. The first call
+starts a background thread that loads the assets and runs one dummy
+prediction and explanation, so the first visitor to a model page does
+not pay for model load, JIT compilation or import time. `assets()`
+waits for that thread.
+
+Pages report their time-to-first-render through `render_started()` and
+`render_finished()`, which also open and close a trace of the rerun:
+`span()` times the steps in between (reco.tracing). Finished traces feed
+rolling histograms, are appended to logs/reco_trace.jsonl (RECO_TRACE_FILE
+overrides, empty disables) and are shown in a sidebar panel when the
+server runs with RECO_ADMIN=1. When RECO_SERVICE_URL is set,
+`service_client()` routes scoring to the standalone inference service
+(reco.service).
+
+Heavy calls go through `run()`, which applies the concurrency policy in
+reco.concurrency: a fixed thread budget per request and a bounded
+executor, so concurrent sessions do not oversubscribe the cores.
+
+`recommend()` and `explain_class()` serve both model pages from one
+process-wide LRU cache (reco.cache) keyed by model version and a hash of
+the user's aligned feature vector.
+
+A watcher thread polls models/reco/CURRENT (see reco.bundle). When it
+names a new version, the bundle is loaded and warmed in the background
+and the served assets are switched with one reference assignment, so a
+retrained model goes live without a restart or a cold first request.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from pathlib import Path
+
+import streamlit as st
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Shared `reco` package lives at the repository root
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+logger = logging.getLogger("reco.runtime")
+
+# How often the CURRENT model pointer is checked
+WATCH_INTERVAL_S = 5.0
+
+# How long `run_or_stop()` waits for a free executor slot
+QUEUE_WAIT_S = 5.0
+
+# A failed warm-up is retried by the next caller after this long
+WARMUP_RETRY_S = 30.0
+
+# First-render samples kept per page
+RENDER_TIMES_KEPT = 1_000
+
+TRACE_FILE_ENV = "RECO_TRACE_FILE"
+DEFAULT_TRACE_FILE = BASE_DIR / "logs" / "reco_trace.jsonl"
+COHORT_CACHE_DIR = BASE_DIR / "data" / "demo" / "cohort_cache"
+ADMIN_ENV = "RECO_ADMIN"
+USER_SEARCH_KEY = "_reco_user_search"
+
+_lock = threading.Lock()
+_warmup: threading.Thread | None = None
+_warmup_error: BaseException | None = None
+_warmup_failed_at = 0.0
+_served = None
+_policy = None
+_executor = None
+_service_client = None
+_service_checked = False
+_cache = None
+_tracer = None
+_cohort_explainers: dict = {}
+_render_times: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=RENDER_TIMES_KEPT))
+
+
+# -------------------------------------------------
+# Warm-up + hot model swap
+# -------------------------------------------------
+def _prepare(user_store=None):
+    """Build assets for the CURRENT bundle and warm them off the request path."""
+    import numpy as np
+
+    from reco.assets import build_serving_assets
+    from reco.concurrency import configure_booster
+    from reco.explain import EXACT
+
+    served = build_serving_assets(BASE_DIR, user_store=user_store)
+    configure_booster(served.bundle.booster, _policy)
+    probe = np.zeros((1, served.bundle.n_features), dtype=np.float32)
+    served.scorer.score(probe)
+    served.explainer.contributions(probe, EXACT)
+    return served
+
+
+def _swap(served) -> None:
+    # A single reference assignment: a rerun that already holds the old
+    # assets finishes with them, the next one sees the new model
+    global _served
+    previous = _served
+    _served = served
+    _cache.retain_version(served.bundle.version)
+
+    # Stop the previous model's cohort worker pool
+    with _lock:
+        stale = [v for v in _cohort_explainers if v != served.bundle.version]
+        for version in stale:
+            _cohort_explainers.pop(version).shutdown()
+    if previous is not None:
+        logger.info("Swapped model %s -> %s", previous.bundle.version, served.bundle.version)
+
+
+def _watch() -> None:
+    from reco.bundle import current_version
+
+    model_dir = BASE_DIR / "models" / "reco"
+    failed = None
+    while True:
+        time.sleep(WATCH_INTERVAL_S)
+        version = None
+        try:
+            version = current_version(model_dir)
+            if version is None or version in (_served.bundle.version, failed):
+                continue
+            start = time.perf_counter()
+            _swap(_prepare(user_store=_served.user_store))
+            logger.info("Model %s warm in %.2fs", version, time.perf_counter() - start)
+        except Exception:
+            # Keep serving the current model; a bad version is retried only
+            # once CURRENT names another one, an unreadable CURRENT next poll
+            failed = version
+            logger.exception("Could not load model %s", version)
+
+
+def _warm() -> None:
+    global _warmup_error, _warmup_failed_at
+    start = time.perf_counter()
+    try:
+        _swap(_prepare())
+        pyplot()
+    except BaseException as exc:
+        _warmup_failed_at = time.monotonic()
+        _warmup_error = exc
+        logger.exception("Reco runtime warm-up failed")
+        return
+
+    logger.info("Reco runtime warm in %.2fs", time.perf_counter() - start)
+    threading.Thread(target=_watch, name="reco-model-watcher", daemon=True).start()
+
+
+def start_warmup() -> threading.Thread:
+    """
+    Start the background warm-up once per process; later calls are no-ops,
+    except that a failed warm-up is started again after WARMUP_RETRY_S.
+    """
+    global _warmup, _warmup_error, _policy, _executor, _cache
+    with _lock:
+        if _cache is None:
+            from reco.cache import PredictionCache
+            from reco.concurrency import BoundedExecutor, ConcurrencyPolicy, apply_process_limits
+
+            _cache = PredictionCache()
+
+            # Before anything imports polars / starts BLAS or OpenMP pools
+            _policy = ConcurrencyPolicy.for_host()
+            apply_process_limits(_policy)
+            _executor = BoundedExecutor(_policy)
+
+        retry = (
+            _warmup is not None
+            and _warmup_error is not None
+            and time.monotonic() - _warmup_failed_at >= WARMUP_RETRY_S
+        )
+        if _warmup is None or retry:
+            _warmup_error = None
+            _warmup = threading.Thread(target=_warm, name="reco-runtime-warmup", daemon=True)
+            _warmup.start()
+        return _warmup
+
+
+def is_warm() -> bool:
+    return _warmup is not None and not _warmup.is_alive() and _warmup_error is None
+
+
+# -------------------------------------------------
+# Accessors (block until warm)
+# -------------------------------------------------
+def assets():
+    """
+    Currently served ServingAssets; waits for the warm-up on first use.
+    Pages take this once per rerun so a swap never mixes two models.
+    Raises while the last warm-up attempt has failed.
+    """
+    start_warmup().join()
+    if _warmup_error is not None:
+        raise RuntimeError("Recommendation runtime failed to load") from _warmup_error
+    return _served
+
+
+def run(fn, *args, **kwargs):
+    """
+    Run a heavy call on the bounded executor. Raises
+    reco.concurrency.Overloaded when too many calls are already queued.
+    """
+    start_warmup()
+    return _executor.run(fn, *args, **kwargs)
+
+
+def run_or_stop(fn, *args, **kwargs):
+    """
+    As `run()`, for calls without a cheaper fallback: waits up to
+    QUEUE_WAIT_S for a free slot, then ends the rerun with a busy notice
+    rather than running outside the executor's bound.
+    """
+    from reco.concurrency import Overloaded
+
+    start_warmup()
+    try:
+        return _executor.run_within(QUEUE_WAIT_S, fn, *args, **kwargs)
+    except Overloaded:
+        st.warning("⏳ The server is busy right now. Please try again in a moment.")
+        st.stop()
+
+
+# -------------------------------------------------
+# Cached scoring / explanations (shared by both pages)
+# -------------------------------------------------
+def recommend(user_id, X_values, k: int = 3, budget_ms: float | None = None) -> tuple[list[tuple[str, float]], str]:
+    """Top-k (label, prob) pairs for one user and the tier that answered."""
+    import numpy as np
+
+    from reco.cache import TIER_CACHE
+    from reco.concurrency import Overloaded
+    from reco.reco_table import TIER_TABLE
+    from reco.scoring import TIER_XGB
+    from reco.service_client import ServiceError, TIER_SERVICE
+
+    served = assets()
+    classes = served.bundle.classes
+
+    # Precomputed users are served from the table
+    if served.reco_table is not None:
+        top = served.reco_table.lookup(user_id, k=k)
+        if top is not None:
+            return top, TIER_TABLE
+
+    # Same model + same feature vector: reuse the XGBoost probabilities
+    key = _cache.key(served.bundle.version, "probs", X_values)
+    probs = _cache.get(key)
+    if probs is not None:
+        top = np.argsort(probs)[::-1][:k]
+        return [(classes[i], float(probs[i])) for i in top], TIER_CACHE
+
+    # Out-of-process scoring when the inference service is configured;
+    # falls through to in-process scoring if it is unreachable or still
+    # serves another model (it loads its bundle once, at start)
+    client = service_client()
+    if client is not None:
+        try:
+            top, version = client.recommend(user_id, k=k)
+            if version == served.bundle.version:
+                return top, TIER_SERVICE
+        except ServiceError:
+            pass
+
+    try:
+        # Bounded executor with a fixed thread budget per request
+        result = run(served.scorer.score, X_values, budget_ms)
+    except Overloaded:
+        # Executor saturated: zero budget answers from the LR tier inline
+        result = served.scorer.score(X_values, 0)
+
+    probs = result.probs[0]
+    if result.tier == TIER_XGB:
+        # Fallback-tier answers are not cached, so they are not reused
+        # once the XGBoost tier is available again
+        _cache.put(key, probs)
+
+    top = np.argsort(probs)[::-1][:k]
+    return [(classes[i], float(probs[i])) for i in top], result.tier
+
+
+def explain_class(X_values, class_idx: int, mode: str):
+    """Cached native (contributions, base values) for one class."""
+    served = assets()
+    key = _cache.key(served.bundle.version, f"contribs:{mode}", X_values, (class_idx,))
+    return _cache.get_or_compute(
+        key, lambda: run_or_stop(served.explainer.explain_class, X_values, class_idx, mode=mode)
+    )
+
+
+def cohort_explainer(served):
+    """
+    reco.cohort.CohortExplainer for `served`, one per model version. Only
+    the served version is kept, so its process pool is shut down on swap.
+    """
+    from reco.cohort import CohortExplainer
+
+    version = served.bundle.version
+    with _lock:
+        if version in _cohort_explainers:
+            return _cohort_explainers[version]
+        explainer = CohortExplainer(served.bundle, COHORT_CACHE_DIR)
+        # A rerun that still holds swapped-out assets gets a throwaway one
+        if version == _served.bundle.version:
+            _cohort_explainers[version] = explainer
+        return explainer
+
+
+# -------------------------------------------------
+# Demo-user picker (shared by both pages)
+# -------------------------------------------------
+def select_user(user_store) -> str:
+    """
+    Id-prefix search plus a selectbox of the first matches, so a rerun
+    sends a few dozen ids to the browser instead of the whole store.
+    """
+    from reco.user_store import SEARCH_LIMIT
+
+    query = st.text_input(
+        "Search demo users", key=USER_SEARCH_KEY, placeholder="Start typing a user id"
+    ).strip()
+    matches = user_store.search(query, limit=SEARCH_LIMIT)
+    if not len(matches):
+        st.warning(f"No demo user id starts with '{query}'.")
+        st.stop()
+    if len(matches) == SEARCH_LIMIT:
+        st.caption(f"Showing the first {len(matches)} matches – refine the search to narrow them down.")
+    return st.selectbox("Select a demo user", matches)
+
+
+def cache_stats() -> dict:
+    start_warmup()
+    return _cache.stats()
+
+
+def service_client():
+    """Inference service client if RECO_SERVICE_URL is set, else None."""
+    global _service_client, _service_checked
+    with _lock:
+        if not _service_checked:
+            from reco.service_client import ServiceClient
+            _service_client = ServiceClient.from_env()
+            _service_checked = True
+        return _service_client
+
+
+def pyplot():
+    """matplotlib.pyplot with the non-interactive backend, imported lazily."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# -------------------------------------------------
+# Time-to-first-render + rerun tracing
+# -------------------------------------------------
+def tracer():
+    """Process-wide reco.tracing.Tracer."""
+    global _tracer
+    with _lock:
+        if _tracer is None:
+            from reco.tracing import Tracer
+
+            path = os.environ.get(TRACE_FILE_ENV, str(DEFAULT_TRACE_FILE))
+            _tracer = Tracer(Path(path) if path else None)
+        return _tracer
+
+
+def _session_id() -> str:
+    if "_reco_session" not in st.session_state:
+        st.session_state["_reco_session"] = uuid.uuid4().hex[:8]
+    return st.session_state["_reco_session"]
+
+
+def render_started() -> float:
+    """Start timing this rerun (first render and trace)."""
+    tracer().begin(_session_id())
+    return time.perf_counter()
+
+
+def span(name: str):
+    """Context manager timing one step of the current rerun."""
+    return tracer().span(name)
+
+
+def render_finished(page: str, started: float) -> float | None:
+    """
+    Close the rerun's trace and record the page's first full render in
+    this session (ms); later reruns only produce a trace.
+    """
+    tracer().finish(page)
+    if _admin_enabled():
+        _admin_panel(page)
+
+    key = f"_reco_rendered_{page}"
+    if st.session_state.get(key):
+        return None
+    st.session_state[key] = True
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        _render_times[page].append(elapsed_ms)
+    logger.info("First render of %s: %.0f ms (runtime warm: %s)", page, elapsed_ms, is_warm())
+    return elapsed_ms
+
+
+def render_times() -> dict[str, list[float]]:
+    with _lock:
+        return {page: list(times) for page, times in _render_times.items()}
+
+
+# -------------------------------------------------
+# Admin panel
+# -------------------------------------------------
+def _admin_enabled() -> bool:
+    # Server-side switch only: the panel exposes other sessions' traces
+    return os.environ.get(ADMIN_ENV) == "1"
+
+
+def _admin_panel(page: str) -> None:
+    import pandas as pd
+
+    from reco.tracing import TOTAL
+
+    t = tracer()
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        summary = t.summary().get(page, {})
+        if summary:
+            st.caption(f"Per-rerun span totals, last {t.histogram_size:,} reruns of this page")
+            st.dataframe(
+                pd.DataFrame(summary).T.sort_values("p95_ms", ascending=False).round(1),
+                use_container_width=True,
+            )
+            names = sorted(summary)
+            name = st.selectbox("Span", names, index=names.index(TOTAL), key=f"_reco_admin_span_{page}")
+            st.bar_chart(
+                pd.Series(t.samples(page, name)).value_counts(bins=20, sort=False)
+                .rename(lambda b: f"{b.right:.0f}")
+            )
+
+        recent = [r for r in t.recent_traces(_session_id()) if r["page"] == page]
+        if recent:
+            st.caption(f"Last rerun: {recent[-1]['total_ms']:.0f} ms")
+            st.dataframe(pd.DataFrame(recent[-1]["spans"]), use_container_width=True, hide_index=True)
+
+        first = render_times().get(page)
+        if first:
+            st.caption(f"First render: median {sorted(first)[len(first) // 2]:.0f} ms over {len(first)} sessions")
+        if is_warm():
+            st.json(cache_stats(), expanded=False)
+        if t.trace_path is not None:
+            st.caption(f"Traces: {t.trace_path}")
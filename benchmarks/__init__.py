@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for the recommendation pipeline and serving paths.
+
+Run from the repository root, e.g.:
+  python -m benchmarks.tree_predictor_check
+"""
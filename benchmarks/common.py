@@ -0,0 +1,172 @@
+"""
+Shared helpers for the benchmark scripts: artefact paths, demo feature
+matrix, latency summaries, and the run record / baseline comparison of
+the benchmarks that gate on a stored baseline.
+
+Baselines are host-specific and are not committed: record one on the
+reference machine with `--save-baseline` and keep it there (or in CI
+cache). Without a baseline a run still fails on its own errors.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from reco.bundle import ModelBundle, current_bundle_dir, load_bundle
+from reco.features import prepare_X
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MODEL_DIR = BASE_DIR / "models" / "reco"
+DEMO_FEATURES_PATH = BASE_DIR / "data" / "demo" / "demo_user_features.parquet"
+BASELINE_DIR = BASE_DIR / "benchmarks" / "baselines"
+
+BASELINE_FORMAT = 1
+DEFAULT_THRESHOLD = 0.2
+
+
+def load_demo_frame(bundle: ModelBundle) -> pd.DataFrame:
+    features = pd.read_parquet(DEMO_FEATURES_PATH)
+    return prepare_X(features, bundle.feature_columns)
+
+
+def load_default_bundle() -> ModelBundle:
+    return load_bundle(current_bundle_dir(MODEL_DIR))
+
+
+def time_calls(fn: Callable[[], object], n_calls: int, warmup: int = 5) -> np.ndarray:
+    """Per-call wall time in seconds."""
+    for _ in range(warmup):
+        fn()
+
+    samples = np.empty(n_calls)
+    for i in range(n_calls):
+        t0 = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - t0
+    return samples
+
+
+def summarize(samples: np.ndarray, rows_per_call: int = 1) -> dict:
+    ms = np.asarray(samples) * 1000
+    total = float(np.sum(samples))
+    return {
+        "calls": int(len(ms)),
+        "rows_per_call": rows_per_call,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "rows_per_s": float(len(ms) * rows_per_call / total) if total else float("inf"),
+    }
+
+
+def print_summary(name: str, summary: dict) -> None:
+    print(
+        f"{name:<36} p50 {summary['p50_ms']:8.3f} ms | "
+        f"p95 {summary['p95_ms']:8.3f} ms | p99 {summary['p99_ms']:8.3f} ms | "
+        f"{summary['rows_per_s']:12,.0f} rows/s"
+    )
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# -------------------------------------------------
+# Baseline-gated runs
+# -------------------------------------------------
+def baseline_parser(description: str, baseline: Path) -> argparse.ArgumentParser:
+    """Arguments shared by the benchmarks compared with a stored baseline."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--baseline", type=Path, default=baseline)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument(
+        "--force", action="store_true", help="With --save-baseline, save even if this run regressed"
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Also write this run's results here")
+    return parser
+
+
+def run_record(results: dict, host: dict | None = None, **fields) -> dict:
+    """A run as stored in baselines: format, time, revision, host and results."""
+    return {
+        "format": BASELINE_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        **fields,
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            **(host or {}),
+        },
+        "results": results,
+    }
+
+
+def gate_on_baseline(
+    current: dict,
+    args: argparse.Namespace,
+    compare: Callable[[dict, dict, float], list[str]],
+    regressions: Iterable[str] = (),
+    same: Iterable[str] = (),
+) -> None:
+    """
+    Write `current` (--json), compare it with the baseline, save it
+    (--save-baseline; a regressed run only with --force) and exit 1 on
+    any regression. `regressions` are
+    failures found without a baseline; `same` names run fields that should
+    match the baseline's (a mismatch is reported, not failed).
+    """
+    if args.json:
+        args.json.write_text(json.dumps(current, indent=2))
+
+    regressions = list(regressions)
+    if not args.baseline.exists():
+        print(f"\nℹ️ No baseline at {args.baseline} (create one with --save-baseline)")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("format") != BASELINE_FORMAT:
+            print(f"⚠️ Baseline format {baseline.get('format')} != {BASELINE_FORMAT}, not compared")
+        else:
+            for field in same:
+                if baseline.get(field) != current.get(field):
+                    print(f"⚠️ Baseline was taken with {field} {baseline.get(field)}")
+            regressions += compare(current, baseline, args.threshold)
+            if not regressions:
+                print("\n✅ No regressions")
+
+    if args.save_baseline and regressions and not args.force:
+        print("⚠️ Baseline not saved: this run regressed (pass --force to save it anyway)")
+    elif args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"💾 Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) (threshold {args.threshold:.0%}):")
+        for r in regressions:
+            print(f"   - {r}")
+        sys.exit(1)
@@ -0,0 +1,116 @@
+"""
+Throughput vs number of concurrent sessions, before and after the
+concurrency policy in reco.concurrency.
+
+Every simulated session issues requests back to back, each one shaped
+like a page rerun: score a small batch of demo users with the booster
+and explain one of them with pred_contribs.
+
+  before  booster nthread = all cores, BLAS/OpenMP pools unlimited,
+          every session thread calls the model directly
+  after   fixed per-request thread budget, calls routed through the
+          BoundedExecutor
+
+Run:
+  python -m benchmarks.concurrency_bench
+  python -m benchmarks.concurrency_bench --sessions 1 4 16 --requests 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+from reco.concurrency import BoundedExecutor, ConcurrencyPolicy, configure_booster
+from reco.explain import EXACT, NativeExplainer
+
+from benchmarks.common import load_default_bundle, load_demo_frame, summarize
+
+
+DEFAULT_SESSIONS = [1, 2, 4, 8, 16]
+REQUESTS_PER_SESSION = 40
+SCORE_ROWS = 64
+
+
+def run_sessions(request, n_sessions: int, n_requests: int, rows) -> dict:
+    def session(_) -> list[float]:
+        latencies = []
+        for _ in range(n_requests):
+            batch = next(rows)
+            t0 = time.perf_counter()
+            request(batch)
+            latencies.append(time.perf_counter() - t0)
+        return latencies
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        samples = list(itertools.chain.from_iterable(pool.map(session, range(n_sessions))))
+    wall = time.perf_counter() - t0
+
+    summary = summarize(np.asarray(samples))
+    summary["throughput_rps"] = len(samples) / wall
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput vs concurrent sessions")
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS)
+    parser.add_argument("--requests", type=int, default=REQUESTS_PER_SESSION)
+    parser.add_argument("--threads-per-request", type=int, default=None)
+    args = parser.parse_args()
+
+    print("📥 Loading bundle and demo features...")
+    bundle = load_default_bundle()
+    X = load_demo_frame(bundle).to_numpy(dtype=np.float32)
+    explainer = NativeExplainer(bundle)
+
+    batches = [X[i:i + SCORE_ROWS] for i in range(0, len(X) - SCORE_ROWS + 1, SCORE_ROWS)]
+
+    def request(batch: np.ndarray) -> None:
+        bundle.xgb_predict_proba(batch)
+        explainer.contributions(batch[:1], EXACT)
+
+    policy = ConcurrencyPolicy.for_host(args.threads_per_request)
+    print(
+        f"🖥️ {os.cpu_count()} cores | policy: {policy.threads_per_request} threads/request, "
+        f"{policy.max_concurrent} concurrent requests"
+    )
+
+    results = {}
+
+    # Before: library defaults
+    bundle.booster.set_param({"nthread": 0})
+    request(batches[0])
+    for n in args.sessions:
+        rows = itertools.cycle(batches)
+        results[("before", n)] = run_sessions(request, n, args.requests, rows)
+
+    # After: pinned thread budgets + bounded executor
+    configure_booster(bundle.booster, policy)
+    executor = BoundedExecutor(policy, max_pending=max(args.sessions) + 1)
+    with threadpool_limits(limits=policy.threads_per_request):
+        for n in args.sessions:
+            rows = itertools.cycle(batches)
+            results[("after", n)] = run_sessions(
+                lambda b: executor.run(request, b), n, args.requests, rows
+            )
+    executor.shutdown()
+
+    print(f"\n{'sessions':>8} | {'before rps':>10} {'p95 ms':>9} | {'after rps':>10} {'p95 ms':>9} | speed-up")
+    for n in args.sessions:
+        before, after = results[("before", n)], results[("after", n)]
+        print(
+            f"{n:>8} | {before['throughput_rps']:10.1f} {before['p95_ms']:9.1f} | "
+            f"{after['throughput_rps']:10.1f} {after['p95_ms']:9.1f} | "
+            f"{after['throughput_rps'] / before['throughput_rps']:7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
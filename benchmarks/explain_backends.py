@@ -0,0 +1,117 @@
+"""
+Compare explanation backends on the demo users: shap.TreeExplainer vs
+XGBoost native pred_contribs (exact) and approx_contribs (approximate).
+
+Reports single-row and batch latency, plus agreement with the shap values:
+max |Δ|, mean top-10 feature overlap and sign agreement on those features.
+
+Run:
+  python -m benchmarks.explain_backends
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+
+import numpy as np
+import shap
+
+from reco.explain import APPROXIMATE, EXACT, NativeExplainer
+from reco.shap_store import shap_by_class
+
+from benchmarks.common import (
+    load_default_bundle,
+    load_demo_frame,
+    print_summary,
+    summarize,
+    time_calls,
+)
+
+
+N_CALLS = 300
+BATCH_ROWS = 1_000
+TOP_FEATURES = 10
+
+
+def agreement(reference: np.ndarray, other: np.ndarray, top: int = TOP_FEATURES) -> dict:
+    """Both (n_rows, n_features) for the same class."""
+    ref_top = np.argsort(-np.abs(reference), axis=1)[:, :top]
+    oth_top = np.argsort(-np.abs(other), axis=1)[:, :top]
+    overlap = np.mean([
+        len(set(a) & set(b)) / top for a, b in zip(ref_top, oth_top)
+    ])
+    ref_sign = np.sign(np.take_along_axis(reference, ref_top, axis=1))
+    oth_sign = np.sign(np.take_along_axis(other, ref_top, axis=1))
+    return {
+        "max_abs_diff": float(np.abs(reference - other).max()),
+        "top_overlap": float(overlap),
+        "sign_agreement": float((ref_sign == oth_sign).mean()),
+    }
+
+
+def main() -> None:
+    print("📥 Loading bundle and demo features...")
+    bundle = load_default_bundle()
+    X = load_demo_frame(bundle).to_numpy(dtype=np.float32)
+    batch = X[:BATCH_ROWS]
+
+    t0 = time.perf_counter()
+    tree_explainer = shap.TreeExplainer(bundle.booster)
+    print(f"⏱  shap.TreeExplainer construction: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    native = NativeExplainer(bundle)
+
+    # Explain each row's top-1 class, as page 6 does
+    top1 = bundle.xgb_predict_proba(batch).argmax(axis=1)
+    rows = np.arange(len(batch))
+
+    # -----------------------------
+    # Agreement
+    # -----------------------------
+    ref = shap_by_class(tree_explainer.shap_values(batch), bundle.n_classes)[rows, top1]
+    exact = native.contributions(batch, EXACT)[rows, top1, :-1]
+    approx = native.contributions(batch, APPROXIMATE)[rows, top1, :-1]
+
+    print(f"\n🔎 Agreement with shap on {len(batch):,} users (top-1 class)")
+    for name, values in (("native exact", exact), ("native approximate", approx)):
+        a = agreement(ref, values)
+        print(
+            f"{name:<20} max|Δ| {a['max_abs_diff']:.2e} | "
+            f"top-{TOP_FEATURES} overlap {a['top_overlap']:.2%} | "
+            f"sign agreement {a['sign_agreement']:.2%}"
+        )
+
+    # -----------------------------
+    # Single-row latency
+    # -----------------------------
+    print(f"\n⏱  Single-row latency ({N_CALLS} calls)")
+    idx = itertools.cycle(range(len(batch)))
+
+    def one_row():
+        i = next(idx)
+        return batch[i:i + 1], int(top1[i])
+
+    samples = time_calls(lambda: tree_explainer.shap_values(one_row()[0]), N_CALLS)
+    print_summary("shap TreeExplainer.shap_values", summarize(samples))
+
+    samples = time_calls(lambda: native.explain_class(*one_row(), mode=EXACT), N_CALLS)
+    print_summary("native pred_contribs (exact)", summarize(samples))
+
+    samples = time_calls(lambda: native.explain_class(*one_row(), mode=APPROXIMATE), N_CALLS)
+    print_summary("native approx_contribs", summarize(samples))
+
+    # -----------------------------
+    # Batch latency
+    # -----------------------------
+    print(f"\n⏱  Batch of {len(batch):,} rows")
+    samples = time_calls(lambda: tree_explainer.shap_values(batch), 5, warmup=1)
+    print_summary("shap TreeExplainer.shap_values", summarize(samples, len(batch)))
+    samples = time_calls(lambda: native.contributions(batch, EXACT), 5, warmup=1)
+    print_summary("native pred_contribs (exact)", summarize(samples, len(batch)))
+    samples = time_calls(lambda: native.contributions(batch, APPROXIMATE), 5, warmup=1)
+    print_summary("native approx_contribs", summarize(samples, len(batch)))
+
+
+if __name__ == "__main__":
+    main()
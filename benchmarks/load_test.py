@@ -0,0 +1,328 @@
+"""
+Headless load test of the recommendation pages.
+
+Every simulated participant opens its own Streamlit session per page
+(streamlit.testing.v1.AppTest, no browser or server) and replays random
+demo-user selections on 5_Black_Box_Reco.py and 6_Explainable_Reco.py.
+
+AppTest keeps process-global state (the Streamlit runtime singleton,
+config options, st.secrets), so concurrent AppTests in one process would
+race. Each participant therefore runs in its own spawned process with
+its own recommendation runtime, warmed up before the measured phase;
+participants compete for the host's cores but do not share the runtime's
+prediction cache or bounded executor as sessions of one server would.
+
+Reported per page:
+  - first render and rerun latency (p50/p95/p99/max),
+  - time spent in scoring (reco_runtime.recommend) and in explanations
+    (SHAP store / native contributions) per rerun,
+  - peak RSS per participant process, and peak traced Python allocations
+    with --tracemalloc.
+
+Runs offline against the demo artefacts: RECO_SERVICE_URL is ignored.
+
+Run:
+  python -m benchmarks.load_test
+  python -m benchmarks.load_test --concurrency 1 4 16 --reruns 20 --json load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import BASE_DIR, DEMO_FEATURES_PATH, summarize
+
+
+APP_DIR = BASE_DIR / "app"
+PAGES = {
+    "5_Black_Box_Reco": APP_DIR / "pages" / "5_Black_Box_Reco.py",
+    "6_Explainable_Reco": APP_DIR / "pages" / "6_Explainable_Reco.py",
+}
+USER_SELECT_LABEL = "Select a demo user"
+
+DEFAULT_CONCURRENCY = [1, 4, 8]
+RERUNS_PER_PARTICIPANT = 10
+RENDER_TIMEOUT_S = 120.0
+WARMUP_TIMEOUT_S = 600.0
+
+# Session-state key naming the participant that owns a session
+SESSION_KEY = "_load_test_session"
+
+SCORING = "scoring"
+EXPLAIN = "explain"
+
+
+# -------------------------------------------------
+# Stage timing inside the page scripts
+# -------------------------------------------------
+class StageTimer:
+    """
+    Wraps reco_runtime entry points and attributes their wall time to the
+    session that called them. AppTest runs each script on its own thread,
+    so calls are matched to participants through session state. Nested
+    calls (explain_class -> run_or_stop) are counted once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stages: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def wrap(self, module, name: str, stage: str) -> None:
+        fn = getattr(module, name)
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            if getattr(self._local, "active", False):
+                return fn(*args, **kwargs)
+            self._local.active = True
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.active = False
+                self._record(stage, time.perf_counter() - t0)
+
+        setattr(module, name, timed)
+
+    def _record(self, stage: str, elapsed: float) -> None:
+        import streamlit as st
+
+        session = st.session_state.get(SESSION_KEY)
+        if session is None:
+            return
+        with self._lock:
+            self._stages[session][stage] += elapsed
+
+    def pop(self, session: str) -> dict[str, float]:
+        with self._lock:
+            return dict(self._stages.pop(session, {}))
+
+
+def install_timer():
+    # Pages import the runtime as a top-level module from app/
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
+    import reco_runtime
+
+    timer = StageTimer()
+    timer.wrap(reco_runtime, "recommend", SCORING)
+    timer.wrap(reco_runtime, "explain_class", EXPLAIN)
+    # Page 6 routes the SHAP store through run_or_stop
+    timer.wrap(reco_runtime, "run_or_stop", EXPLAIN)
+    return reco_runtime, timer
+
+
+# -------------------------------------------------
+# Participants
+# -------------------------------------------------
+def participant(idx: int, pages: list[str], user_ids, n_reruns: int, timer: StageTimer, seed: int) -> list[dict]:
+    import reco_runtime as runtime
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng(seed + idx)
+    sessions = {}
+    records = []
+
+    def render(page: str, kind: str, user_id=None) -> None:
+        at = sessions[page]
+        t0 = time.perf_counter()
+        if user_id is None:
+            at.run(timeout=RENDER_TIMEOUT_S)
+        else:
+            # Search for the id, then pick it from the matches
+            at.text_input(key=runtime.USER_SEARCH_KEY).set_value(user_id)
+            select = next(s for s in at.selectbox if s.label == USER_SELECT_LABEL)
+            select.set_value(user_id).run(timeout=RENDER_TIMEOUT_S)
+        elapsed = time.perf_counter() - t0
+        stages = timer.pop(at.session_state[SESSION_KEY])
+        records.append({
+            "page": page,
+            "kind": kind,
+            "render_s": elapsed,
+            SCORING: stages.get(SCORING, 0.0),
+            EXPLAIN: stages.get(EXPLAIN, 0.0),
+            "error": str(at.exception[0].message) if len(at.exception) else None,
+        })
+
+    for page in pages:
+        at = AppTest.from_file(str(PAGES[page]), default_timeout=RENDER_TIMEOUT_S)
+        at.session_state[SESSION_KEY] = f"{idx}:{page}"
+        sessions[page] = at
+        render(page, "first")
+
+    for _ in range(n_reruns):
+        page = pages[rng.integers(len(pages))]
+        render(page, "rerun", user_id=user_ids[rng.integers(len(user_ids))])
+
+    return records
+
+
+def participant_process(idx: int, pages, user_ids, n_reruns: int, seed: int,
+                        trace_memory: bool, start, results) -> None:
+    """Entry point of one participant's process."""
+    try:
+        # Offline: in-process scoring against the demo artefacts only
+        os.environ.pop("RECO_SERVICE_URL", None)
+        runtime, timer = install_timer()
+        runtime.assets()
+        if trace_memory:
+            tracemalloc.start()
+        start.wait(WARMUP_TIMEOUT_S)
+
+        records = participant(idx, pages, user_ids, n_reruns, timer, seed)
+        results.put((idx, {"records": records, "memory": peak_memory(), "cache": runtime.cache_stats()}))
+    except BaseException as exc:
+        start.abort()
+        results.put((idx, {"error": f"{type(exc).__name__}: {exc}"}))
+
+
+def run_level(n_participants: int, pages, user_ids, n_reruns: int, seed: int, trace_memory: bool) -> dict:
+    ctx = mp.get_context("spawn")
+    start = ctx.Barrier(n_participants + 1)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=participant_process,
+            args=(i, pages, user_ids, n_reruns, seed, trace_memory, start, results),
+            name=f"load-test-{i}",
+        )
+        for i in range(n_participants)
+    ]
+    for proc in procs:
+        proc.start()
+
+    # Every participant has warmed its runtime: start the clock together
+    outputs = {}
+    try:
+        start.wait(WARMUP_TIMEOUT_S)
+        t0 = time.perf_counter()
+        while len(outputs) < n_participants:
+            idx, out = results.get(timeout=RENDER_TIMEOUT_S * (len(pages) + n_reruns))
+            outputs[idx] = out
+        wall = time.perf_counter() - t0
+    except (threading.BrokenBarrierError, queue.Empty):
+        while True:
+            try:
+                idx, out = results.get(timeout=1.0)
+            except queue.Empty:
+                break
+            outputs[idx] = out
+        errors = [out["error"] for out in outputs.values() if "error" in out]
+        raise RuntimeError(f"Participants failed or timed out: {errors or 'no result'}")
+    finally:
+        for proc in procs:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
+
+    errors = [out["error"] for out in outputs.values() if "error" in out]
+    if errors:
+        raise RuntimeError(f"{len(errors)} participant(s) failed: {errors}")
+    records = [r for out in outputs.values() for r in out["records"]]
+
+    report = {
+        "participants": n_participants,
+        "wall_s": wall,
+        "pages": {},
+        # Worst participant process
+        "memory": {
+            key: max(out["memory"][key] for out in outputs.values())
+            for key in outputs[0]["memory"]
+        },
+        "cache": {
+            key: sum(out["cache"][key] for out in outputs.values())
+            for key in ("hits", "misses", "evictions")
+        },
+    }
+    for page in pages:
+        page_records = [r for r in records if r["page"] == page]
+        reruns = [r for r in page_records if r["kind"] == "rerun"]
+        report["pages"][page] = {
+            "first_render": summarize([r["render_s"] for r in page_records if r["kind"] == "first"]),
+            "rerun": summarize([r["render_s"] for r in reruns]) if reruns else None,
+            "renders_per_s": len(page_records) / wall,
+            "mean_scoring_ms": 1000 * float(np.mean([r[SCORING] for r in page_records])),
+            "mean_explain_ms": 1000 * float(np.mean([r[EXPLAIN] for r in page_records])),
+            "errors": sorted({r["error"] for r in page_records if r["error"]}),
+        }
+    return report
+
+
+def peak_memory() -> dict:
+    # This process only; ru_maxrss is KiB on Linux
+    out = {"peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+    if tracemalloc.is_tracing():
+        out["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+    return out
+
+
+def print_level(report: dict) -> None:
+    print(f"\n👥 {report['participants']} participants | {report['wall_s']:.1f} s wall")
+    print(
+        f"{'page':<20} {'kind':<6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} | "
+        f"{'score ms':>8} {'explain ms':>10} | {'renders/s':>9}"
+    )
+    for page, stats in report["pages"].items():
+        for kind in ("first_render", "rerun"):
+            s = stats[kind]
+            if s is None:
+                continue
+            print(
+                f"{page:<20} {kind.split('_')[0]:<6} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} "
+                f"{s['p99_ms']:9.1f} {s['max_ms']:9.1f} | {stats['mean_scoring_ms']:8.1f} "
+                f"{stats['mean_explain_ms']:10.1f} | {stats['renders_per_s']:9.2f}"
+            )
+        for error in stats["errors"]:
+            print(f"   ⚠️ {page}: {error}")
+    memory = report["memory"]
+    line = f"🧠 peak RSS per participant {memory['peak_rss_mb']:,.0f} MB"
+    if "peak_traced_mb" in memory:
+        line += f" | peak traced {memory['peak_traced_mb']:,.0f} MB"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless load test of the recommendation pages")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--reruns", type=int, default=RERUNS_PER_PARTICIPANT)
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="Trace Python allocations (slow)")
+    parser.add_argument("--json", type=str, default=None, help="Write the report to this file")
+    args = parser.parse_args()
+
+    user_ids = sorted(
+        pd.read_parquet(DEMO_FEATURES_PATH, columns=["user_id"])["user_id"].astype(str).unique()
+    )
+    print(f"✅ {len(user_ids):,} demo users | pages: {', '.join(args.pages)}")
+
+    reports = []
+    for n in args.concurrency:
+        print(f"\n📥 Starting {n} participant process(es), each warming its own runtime...")
+        report = run_level(n, args.pages, user_ids, args.reruns, args.seed, args.tracemalloc)
+        print_level(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"reruns": args.reruns, "seed": args.seed, "levels": reports}, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
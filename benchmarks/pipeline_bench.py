@@ -0,0 +1,203 @@
+"""
+End-to-end scale benchmark of the pipeline scripts 03 → 10.
+
+For every size, a synthetic raw event stream (reco.synthetic) is written
+into a fresh working directory and the scripts run there one after the
+other, each in its own process. Per script it records:
+
+  - wall time and peak RSS of the child process (os.wait4),
+  - rows of every Parquet file the script writes,
+  - the script's own stage report (reco.profiling), when it has one.
+
+Results are compared with a stored baseline; a script whose wall time or
+peak memory grew by more than the threshold at the same size is flagged
+as a regression (exit code 1). A script that fails, or that the baseline
+ran but this run did not reach, always counts as a regression.
+
+Run:
+  python -m benchmarks.pipeline_bench --sizes 1e5 1e6
+  python -m benchmarks.pipeline_bench --sizes 1e5 1e6 1e7 --save-baseline
+  python -m benchmarks.pipeline_bench --baseline benchmarks/baselines/pipeline.json --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from reco.synthetic import generate
+
+from benchmarks.common import BASE_DIR, BASELINE_DIR, baseline_parser, gate_on_baseline, run_record
+
+
+DEFAULT_BASELINE = BASELINE_DIR / "pipeline.json"
+DEFAULT_SIZES = [100_000, 1_000_000]
+
+# Differences below these are noise at small sizes
+MIN_DELTA_S = 0.5
+MIN_DELTA_MB = 50.0
+
+# Script -> Parquet files it writes (relative to the working directory)
+SCRIPTS = {
+    "03_fix_schema.py": ["data/full_data.parquet"],
+    "04_data_cleanup.py": ["data/full_data.parquet"],
+    "05_data_prepare.py": ["data/processed/all_features.parquet"],
+    "07_data_split.py": [
+        "data/processed/all_features_train.parquet",
+        "data/processed/all_features_val.parquet",
+        "data/processed/all_features_test.parquet",
+    ],
+    "08_data_normalization_split.py": [
+        "data/processed/all_features_n.parquet",
+        "data/processed/all_features_train_n.parquet",
+        "data/processed/all_features_val_n.parquet",
+        "data/processed/all_features_test_n.parquet",
+    ],
+    "09_demo_build.py": [
+        "data/demo/demo_user_events.parquet",
+        "data/demo/demo_user_features.parquet",
+    ],
+    "10_reco_engine.py": [],
+}
+
+
+def run_script(script: str, workdir: Path, env: dict) -> dict:
+    log = workdir / "logs" / f"{Path(script).stem}.log"
+    log.parent.mkdir(exist_ok=True)
+    t0 = time.perf_counter()
+    with open(log, "w") as out:
+        proc = subprocess.Popen(
+            [sys.executable, str(BASE_DIR / script)],
+            cwd=workdir, env=env, stdout=out, stderr=subprocess.STDOUT,
+        )
+        # wait4 gives the child's own resource usage (peak RSS in KiB on Linux)
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - t0
+
+    result = {
+        "status": "ok" if proc.returncode == 0 else f"exit {proc.returncode}",
+        "wall_s": round(wall, 3),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "outputs": {
+            path: pq.ParquetFile(workdir / path).metadata.num_rows
+            for path in SCRIPTS[script]
+            if (workdir / path).exists()
+        },
+    }
+
+    report = workdir / "reports" / "pipeline" / f"{Path(script).stem}_latest.json"
+    if report.exists():
+        with open(report) as f:
+            result["stages"] = [
+                {k: s[k] for k in ("name", "wall_s", "peak_rss_mb", "rows_in", "rows_out")}
+                for s in json.load(f)["stages"]
+            ]
+    return result
+
+
+def run_size(n_rows: int, seed: int, keep: bool) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix=f"reco_bench_{n_rows}_"))
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(BASE_DIR), os.environ.get("PYTHONPATH")])),
+        "RECO_PROFILE_DIR": str(workdir / "reports" / "pipeline"),
+        "MPLBACKEND": "Agg",
+    }
+    try:
+        t0 = time.perf_counter()
+        counts = generate(workdir / "data" / "full_data.parquet", n_rows, seed=seed)
+        result = {
+            "events": sum(counts.values()),
+            "generate_s": round(time.perf_counter() - t0, 3),
+            "scripts": {},
+        }
+        print(f"\n🧪 {result['events']:,} events ({result['generate_s']:.1f}s) in {workdir}")
+
+        for script in SCRIPTS:
+            r = run_script(script, workdir, env)
+            result["scripts"][script] = r
+            rows = sum(r["outputs"].values())
+            print(
+                f"   {script:<32} {r['wall_s']:9.2f}s {r['peak_rss_mb']:9,.0f} MB "
+                f"{rows:>14,} rows  {r['status']}"
+            )
+            if r["status"] != "ok":
+                print(f"   ⚠️ see {workdir / 'logs' / (Path(script).stem + '.log')}")
+                break
+        return result
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def failures(current: dict) -> list[str]:
+    """Scripts that did not finish with exit code 0."""
+    return [
+        f"{script} @ {int(size):,} rows: {r['status']}"
+        for size, result in current["results"].items()
+        for script, r in result["scripts"].items()
+        if r["status"] != "ok"
+    ]
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions of `current` against `baseline` (sizes present in both)."""
+    regressions = []
+    print(f"\n📊 Against baseline {baseline.get('revision')} ({baseline.get('created_at')})")
+    print(f"{'size':>12} {'script':<32} {'wall s':>17} {'Δ':>7} {'peak MB':>17} {'Δ':>7}")
+    for size, result in current["results"].items():
+        base_size = baseline["results"].get(size)
+        if base_size is None:
+            continue
+        # Scripts after a failure never ran
+        for script in base_size["scripts"]:
+            if script not in result["scripts"]:
+                print(f"{int(size):>12,} {script:<32} {'not run':>17} 🔺")
+                regressions.append(f"{script} @ {int(size):,} rows: not run")
+        for script, r in result["scripts"].items():
+            b = base_size["scripts"].get(script)
+            if b is None or r["status"] != "ok" or b["status"] != "ok":
+                continue
+            d_wall = r["wall_s"] / b["wall_s"] - 1 if b["wall_s"] else 0.0
+            d_rss = r["peak_rss_mb"] / b["peak_rss_mb"] - 1 if b["peak_rss_mb"] else 0.0
+            flags = []
+            if d_wall > threshold and r["wall_s"] - b["wall_s"] > MIN_DELTA_S:
+                flags.append("wall")
+            if d_rss > threshold and r["peak_rss_mb"] - b["peak_rss_mb"] > MIN_DELTA_MB:
+                flags.append("memory")
+            print(
+                f"{int(size):>12,} {script:<32} {b['wall_s']:8.2f}→{r['wall_s']:<8.2f} {d_wall:+7.0%} "
+                f"{b['peak_rss_mb']:8,.0f}→{r['peak_rss_mb']:<8,.0f} {d_rss:+7.0%} "
+                + ("🔺 " + ", ".join(flags) if flags else "")
+            )
+            if flags:
+                regressions.append(f"{script} @ {int(size):,} rows: {', '.join(flags)}")
+    return regressions
+
+
+def main() -> None:
+    parser = baseline_parser("Pipeline 03→10 scale benchmark", DEFAULT_BASELINE)
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Keep the working directories")
+    args = parser.parse_args()
+
+    current = run_record(
+        {str(int(size)): run_size(int(size), args.seed, args.keep) for size in args.sizes},
+        seed=args.seed,
+    )
+    gate_on_baseline(current, args, compare, regressions=failures(current), same=["seed"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Latency and throughput of the serving paths, compared with a stored
+baseline.
+
+Cases, each as a single row and as a batch of demo users:
+
+  prepare_X            feature alignment of raw demo feature rows
+  xgb_predict_proba    booster inplace_predict + softmax
+  flat_trees           numba FlatTreeEnsemble (the in-app XGBoost tier)
+  lr_predict_proba     closed-form logistic regression (fallback tier)
+  shap_tree_explainer  shap.TreeExplainer.shap_values
+  native_contribs      XGBoost pred_contribs (exact)
+
+Uses the current models/reco bundle and data/demo features. A case whose
+p50 or p95 grew by more than the threshold, or whose throughput dropped
+by more than it, is flagged as a regression (exit code 1).
+
+Run:
+  python -m benchmarks.serving_bench
+  python -m benchmarks.serving_bench --save-baseline
+  python -m benchmarks.serving_bench --save-baseline --force   # accept a slower run
+  python -m benchmarks.serving_bench --threshold 0.1 --calls 2000
+"""
+
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import shap
+
+from reco.explain import EXACT, NativeExplainer
+from reco.features import prepare_X
+from reco.tree_predictor import FlatTreeEnsemble
+
+from benchmarks.common import (
+    BASELINE_DIR,
+    DEMO_FEATURES_PATH,
+    baseline_parser,
+    gate_on_baseline,
+    load_default_bundle,
+    print_summary,
+    run_record,
+    summarize,
+    time_calls,
+)
+
+
+DEFAULT_BASELINE = BASELINE_DIR / "serving.json"
+
+N_CALLS = 500
+BATCH_ROWS = 1_000
+BATCH_CALLS = 20
+
+# Differences below this are timer noise
+MIN_DELTA_MS = 0.02
+
+
+def build_cases(bundle, features: pd.DataFrame) -> dict:
+    """name -> (row -> call, batch call, rows per batch)."""
+    X = bundle.as_matrix(prepare_X(features, bundle.feature_columns))
+    batch = X[:BATCH_ROWS]
+    raw_batch = features.iloc[:BATCH_ROWS]
+    raw_rows = [features.iloc[i:i + 1] for i in range(min(len(features), BATCH_ROWS))]
+
+    ensemble = FlatTreeEnsemble.from_booster(bundle.booster)
+    tree_explainer = shap.TreeExplainer(bundle.booster)
+    native = NativeExplainer(bundle)
+
+    matrix_cases = {
+        "xgb_predict_proba": bundle.xgb_predict_proba,
+        "flat_trees": ensemble.predict_proba,
+        "lr_predict_proba": bundle.lr_predict_proba,
+        "shap_tree_explainer": tree_explainer.shap_values,
+        "native_contribs": lambda x: native.contributions(x, EXACT),
+    }
+    cases = {
+        "prepare_X": (
+            lambda i: prepare_X(raw_rows[i % len(raw_rows)], bundle.feature_columns),
+            lambda: prepare_X(raw_batch, bundle.feature_columns),
+            len(raw_batch),
+        ),
+    }
+    for name, fn in matrix_cases.items():
+        cases[name] = (
+            lambda i, fn=fn: fn(batch[i % len(batch)][None, :]),
+            lambda fn=fn: fn(batch),
+            len(batch),
+        )
+    return cases
+
+
+def run_cases(cases: dict, n_calls: int, batch_calls: int) -> dict:
+    results = {}
+    print(f"\n⏱  Single row ({n_calls} calls) | batch ({batch_calls} calls)")
+    for name, (one_row, one_batch, rows) in cases.items():
+        idx = itertools.count()
+        single = summarize(time_calls(lambda: one_row(next(idx)), n_calls))
+        batched = summarize(time_calls(one_batch, batch_calls, warmup=2), rows)
+        print_summary(f"{name} [1]", single)
+        print_summary(f"{name} [{rows:,}]", batched)
+        results[name] = {"single": single, "batch": batched}
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions of `current` against `baseline` (cases present in both)."""
+    regressions = []
+    print(f"\n📊 Against baseline {baseline.get('revision')} ({baseline.get('created_at')})")
+    print(f"{'case':<28} {'p50 ms':>19} {'Δ':>7} {'p95 ms':>19} {'Δ':>7} {'rows/s Δ':>9}")
+    for name, modes in current["results"].items():
+        for mode, cur in modes.items():
+            base = baseline["results"].get(name, {}).get(mode)
+            if base is None:
+                continue
+            d50 = cur["p50_ms"] / base["p50_ms"] - 1
+            d95 = cur["p95_ms"] / base["p95_ms"] - 1
+            d_rate = cur["rows_per_s"] / base["rows_per_s"] - 1
+            flags = []
+            if d50 > threshold and cur["p50_ms"] - base["p50_ms"] > MIN_DELTA_MS:
+                flags.append("p50")
+            if d95 > threshold and cur["p95_ms"] - base["p95_ms"] > MIN_DELTA_MS:
+                flags.append("p95")
+            if d_rate < -threshold and "p50" not in flags:
+                flags.append("throughput")
+            label = f"{name} [{mode}]"
+            print(
+                f"{label:<28} {base['p50_ms']:9.3f}→{cur['p50_ms']:<9.3f} {d50:+7.0%} "
+                f"{base['p95_ms']:9.3f}→{cur['p95_ms']:<9.3f} {d95:+7.0%} {d_rate:+9.0%} "
+                + ("🔺 " + ", ".join(flags) if flags else "")
+            )
+            if flags:
+                regressions.append(f"{label}: {', '.join(flags)}")
+    return regressions
+
+
+def main() -> None:
+    parser = baseline_parser("Serving-path latency benchmark", DEFAULT_BASELINE)
+    parser.add_argument("--calls", type=int, default=N_CALLS)
+    parser.add_argument("--batch-calls", type=int, default=BATCH_CALLS)
+    args = parser.parse_args()
+
+    print("📥 Loading bundle and demo features...")
+    bundle = load_default_bundle()
+    features = pd.read_parquet(DEMO_FEATURES_PATH)
+    cases = build_cases(bundle, features)
+
+    current = run_record(
+        run_cases(cases, args.calls, args.batch_calls),
+        host={"numpy": np.__version__, "shap": shap.__version__},
+        model_version=bundle.version,
+    )
+    gate_on_baseline(current, args, compare, same=["model_version"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Validate the numba tree predictor against XGBoost and measure single-row
+latency against the page's previous predict path.
+
+Run:
+  python -m benchmarks.tree_predictor_check
+"""
+
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+
+from reco.tree_predictor import FlatTreeEnsemble, max_abs_diff_vs_booster
+
+from benchmarks.common import (
+    load_default_bundle,
+    load_demo_frame,
+    print_summary,
+    summarize,
+    time_calls,
+)
+
+
+ATOL = 1e-5
+N_CALLS = 2000
+
+
+def main() -> None:
+    print("📥 Loading bundle and demo features...")
+    bundle = load_default_bundle()
+    X_df = load_demo_frame(bundle)
+    X = X_df.to_numpy(dtype=np.float32)
+
+    print(f"🌲 Flattening {bundle.booster.num_boosted_rounds()} rounds × {bundle.n_classes} classes...")
+    ensemble = FlatTreeEnsemble.from_booster(bundle.booster)
+    print(f"✅ {ensemble.n_trees} trees, {len(ensemble.feature):,} nodes")
+
+    # -----------------------------
+    # Agreement with XGBoost
+    # -----------------------------
+    diff = max_abs_diff_vs_booster(ensemble, bundle.booster, X)
+    agree = (ensemble.predict_proba(X).argmax(1) == bundle.xgb_predict_proba(X).argmax(1)).mean()
+    print(f"\n🔎 Max |Δprob| over {len(X):,} users: {diff:.2e}  (top-1 agreement {agree:.2%})")
+    if diff > ATOL:
+        raise SystemExit(f"❌ Tree predictor disagrees with XGBoost (>{ATOL})")
+
+    # -----------------------------
+    # Single-row latency
+    # -----------------------------
+    rng = np.random.default_rng(42)
+    rows = itertools.cycle(rng.integers(0, len(X), size=N_CALLS).tolist())
+
+    print(f"\n⏱  Single-row latency ({N_CALLS} calls)")
+
+    samples = time_calls(lambda: bundle.xgb_predict_proba(X_df.iloc[[next(rows)]]), N_CALLS)
+    print_summary("xgboost inplace_predict (1 row)", summarize(samples))
+
+    samples = time_calls(lambda: ensemble.predict_proba(X[next(rows)]), N_CALLS)
+    print_summary("numba tree predictor (1 row)", summarize(samples))
+
+    # -----------------------------
+    # Batch throughput
+    # -----------------------------
+    print(f"\n⏱  Batch of {len(X):,} rows")
+    samples = time_calls(lambda: bundle.xgb_predict_proba(X), 20, warmup=2)
+    print_summary("xgboost inplace_predict (batch)", summarize(samples, len(X)))
+    samples = time_calls(lambda: ensemble.predict_proba(X), 20, warmup=2)
+    print_summary("numba tree predictor (batch)", summarize(samples, len(X)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Shared recommendation runtime used by the pipeline scripts and the Streamlit app.
+"""
@@ -0,0 +1,113 @@
+"""
+Serving assets shared by both recommendation pages.
+
+One loader assembles the current bundle, tree predictor, tiered scorer,
+native explainer, top-k table and user store, preferring the
+memory-mapped data plane and falling back to the bundle / Parquet files
+when it has not been exported (or was exported for another model).
+`load_serving_assets` memoises per process; the app runtime calls
+`build_serving_assets` directly so it can build a newly published model
+next to the one being served. The feature order always comes from the
+bundle's own manifest, so a model trained on other features can be
+swapped in as well.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from reco.bundle import ModelBundle, current_bundle_dir, load_bundle
+from reco.data_plane import DataPlane
+from reco.explain import NativeExplainer
+from reco.reco_table import RecoTable
+from reco.scoring import TieredScorer
+from reco.tree_predictor import FlatTreeEnsemble
+from reco.user_store import UserStore
+
+
+@dataclass
+class ServingAssets:
+    feature_cols: list[str]
+    bundle: ModelBundle
+    ensemble: FlatTreeEnsemble
+    scorer: TieredScorer
+    explainer: NativeExplainer
+    reco_table: RecoTable | None
+    user_store: UserStore
+    plane: DataPlane | None
+
+
+_assets: dict[Path, ServingAssets] = {}
+_assets_lock = threading.Lock()
+
+
+def load_serving_assets(base_dir: Path) -> ServingAssets:
+    base_dir = Path(base_dir).resolve()
+    with _assets_lock:
+        if base_dir not in _assets:
+            _assets[base_dir] = build_serving_assets(base_dir)
+        return _assets[base_dir]
+
+
+def build_serving_assets(
+    base_dir: Path,
+    bundle_dir: Path | None = None,
+    user_store: UserStore | None = None,
+) -> ServingAssets:
+    """
+    Fresh assets for `bundle_dir` (default: the CURRENT bundle). The user
+    store does not depend on the model and can be carried over.
+    """
+    base_dir = Path(base_dir).resolve()
+    data_dir = base_dir / "data" / "demo"
+    model_dir = base_dir / "models" / "reco"
+
+    # Native bundle (no pickles); its manifest defines the feature order
+    # the demo features are aligned to
+    bundle = load_bundle(bundle_dir or current_bundle_dir(model_dir))
+    feature_cols = bundle.feature_columns
+
+    # Read-only mapped tables and tree arrays (17_export_data_plane.py)
+    plane = DataPlane.open(data_dir / "plane")
+
+    # Flattened trees scored by numba: no DMatrix conversion per request
+    ensemble = plane.ensemble(bundle.version) if plane is not None else None
+    if ensemble is None:
+        ensemble = FlatTreeEnsemble.from_booster(bundle.booster)
+    ensemble.predict_proba(np.zeros(ensemble.n_features))  # JIT warm-up
+
+    # XGBoost within the latency budget, closed-form LR fallback otherwise
+    scorer = TieredScorer(bundle, ensemble)
+
+    # Offline top-k table (13_demo_reco_table.py); ignored if stale
+    reco_table = RecoTable.load(
+        data_dir / "reco_topk.npz", expected_version=bundle.version
+    )
+
+    # User-clustered events + features: mapped plane, then the exported
+    # store (16_demo_user_store.py), then the raw demo files
+    if user_store is None and plane is not None:
+        user_store = plane.user_store()
+    if user_store is None:
+        user_store = UserStore.open(data_dir / "user_store")
+    if user_store is None:
+        user_store = UserStore.from_frames(
+            pd.read_parquet(data_dir / "demo_user_events.parquet"),
+            pd.read_parquet(data_dir / "demo_user_features.parquet"),
+        )
+
+    return ServingAssets(
+        feature_cols=feature_cols,
+        bundle=bundle,
+        ensemble=ensemble,
+        scorer=scorer,
+        explainer=NativeExplainer(bundle),
+        reco_table=reco_table,
+        user_store=user_store,
+        plane=plane,
+    )
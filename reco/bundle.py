@@ -0,0 +1,367 @@
+"""
+Versioned, pickle-free model bundle for the recommendation engine.
+
+A bundle is a directory written by 10_reco_engine.py (11 and 12 publish
+new versions of it):
+
+  manifest.json            classes, feature order, version and file checksums
+  xgboost.ubj              XGBoost booster in native UBJSON format
+  logistic_regression.npz  LR coef (n_classes, n_features) and intercept
+  feature_scaler.npz       StandardScaler mean / scale in feature order
+
+Bundles live in models/reco/bundles/<version>/; the CURRENT file next to
+that directory names the served version and is replaced atomically, so
+a running app can pick up a new model without a restart.
+
+Loading a bundle needs no joblib/pickle, is independent of the scikit-learn
+version, and rejects bundles whose feature order does not match.
+xgboost itself is only imported when a bundle is loaded or written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+
+BUNDLE_FORMAT = 1
+
+MANIFEST_FILE = "manifest.json"
+XGB_FILE = "xgboost.ubj"
+LR_FILE = "logistic_regression.npz"
+SCALER_FILE = "feature_scaler.npz"
+
+BUNDLES_DIR = "bundles"
+CURRENT_FILE = "CURRENT"
+LEGACY_BUNDLE_DIR = "bundle"
+
+
+class BundleError(ValueError):
+    """Raised when a bundle is incomplete, corrupted or incompatible."""
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def softmax(margin: np.ndarray) -> np.ndarray:
+    z = margin - margin.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    z /= z.sum(axis=1, keepdims=True)
+    return z
+
+
+def new_version() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+@dataclass
+class ModelBundle:
+    path: Path
+    version: str
+    classes: np.ndarray
+    feature_columns: list[str]
+    unknown_class_label: str
+    booster: xgb.Booster
+    lr_coef: np.ndarray
+    lr_intercept: np.ndarray
+    scaler_mean: np.ndarray
+    scaler_scale: np.ndarray
+    manifest: dict = field(repr=False)
+
+    @property
+    def n_classes(self) -> int:
+        return len(self.classes)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_columns)
+
+    def class_index(self, label: str) -> int:
+        idx = np.flatnonzero(self.classes == label)
+        if len(idx) == 0:
+            raise KeyError(label)
+        return int(idx[0])
+
+    def as_matrix(self, X) -> np.ndarray:
+        """
+        Contiguous float32 matrix in bundle feature order.
+        DataFrames must already be aligned (see prepare_X in the app pages).
+        """
+        if hasattr(X, "columns"):
+            if list(X.columns) != self.feature_columns:
+                raise BundleError("Input columns do not match the bundle feature order")
+            X = X.to_numpy()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise BundleError(
+                f"Expected {self.n_features} features, got {X.shape[1]}"
+            )
+        return X
+
+    def standardize(self, X) -> np.ndarray:
+        return (self.as_matrix(X) - self.scaler_mean) / self.scaler_scale
+
+    def xgb_margin(self, X) -> np.ndarray:
+        return self.booster.inplace_predict(self.as_matrix(X), predict_type="margin")
+
+    def xgb_predict_proba(self, X) -> np.ndarray:
+        # multi:softmax boosters return labels; probabilities are the
+        # softmax of the raw margins, exactly as XGBClassifier.predict_proba
+        return softmax(np.asarray(self.xgb_margin(X), dtype=np.float64))
+
+    def lr_predict_proba(self, X) -> np.ndarray:
+        margin = self.standardize(X) @ self.lr_coef.T + self.lr_intercept
+        return softmax(margin.astype(np.float64))
+
+
+def write_bundle(
+    out_dir: Path,
+    *,
+    booster: xgb.Booster,
+    lr_coef: np.ndarray,
+    lr_intercept: np.ndarray,
+    classes: list[str],
+    feature_columns: list[str],
+    target: str,
+    unknown_class_label: str,
+    scaler_mean: np.ndarray | None = None,
+    scaler_scale: np.ndarray | None = None,
+    version: str | None = None,
+) -> Path:
+    """
+    Write a bundle directory. The manifest is written last (atomically), so
+    a reader never sees a manifest pointing at half-written files.
+    """
+    import xgboost as xgb
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    n_features = len(feature_columns)
+    if booster.feature_names is not None and list(booster.feature_names) != list(feature_columns):
+        raise BundleError("Booster feature names do not match feature_columns")
+
+    if scaler_mean is None:
+        scaler_mean = np.zeros(n_features)
+    if scaler_scale is None:
+        scaler_scale = np.ones(n_features)
+
+    booster.save_model(out_dir / XGB_FILE)
+    np.savez(
+        out_dir / LR_FILE,
+        coef=np.asarray(lr_coef, dtype=np.float64),
+        intercept=np.asarray(lr_intercept, dtype=np.float64),
+    )
+    np.savez(
+        out_dir / SCALER_FILE,
+        mean=np.asarray(scaler_mean, dtype=np.float64),
+        scale=np.asarray(scaler_scale, dtype=np.float64),
+    )
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version or new_version(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": target,
+        "classes": [str(c) for c in classes],
+        "unknown_class_label": unknown_class_label,
+        "feature_columns": list(feature_columns),
+        "xgboost_version": xgb.__version__,
+        "files": {
+            name: {
+                "sha256": file_sha256(out_dir / name),
+                "bytes": (out_dir / name).stat().st_size,
+            }
+            for name in (XGB_FILE, LR_FILE, SCALER_FILE)
+        },
+    }
+
+    tmp = out_dir / (MANIFEST_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, out_dir / MANIFEST_FILE)
+
+    return out_dir
+
+
+def read_manifest(bundle_dir: Path) -> dict:
+    path = Path(bundle_dir) / MANIFEST_FILE
+    if not path.exists():
+        raise BundleError(f"No bundle manifest at {path}")
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format: {manifest.get('format')}")
+    return manifest
+
+
+def load_bundle(
+    bundle_dir: Path,
+    expected_features: list[str] | None = None,
+    verify: bool = True,
+) -> ModelBundle:
+    import xgboost as xgb
+
+    bundle_dir = Path(bundle_dir)
+    manifest = read_manifest(bundle_dir)
+    feature_columns = manifest["feature_columns"]
+
+    if expected_features is not None and list(expected_features) != feature_columns:
+        raise BundleError("Bundle feature order does not match the expected feature order")
+
+    if verify:
+        for name, info in manifest["files"].items():
+            if file_sha256(bundle_dir / name) != info["sha256"]:
+                raise BundleError(f"Checksum mismatch for {bundle_dir / name}")
+
+    booster = xgb.Booster()
+    booster.load_model(bundle_dir / XGB_FILE)
+
+    if booster.feature_names is not None and list(booster.feature_names) != feature_columns:
+        raise BundleError("Booster feature names do not match the manifest feature order")
+
+    with np.load(bundle_dir / LR_FILE) as lr, np.load(bundle_dir / SCALER_FILE) as sc:
+        lr_coef, lr_intercept = lr["coef"], lr["intercept"]
+        scaler_mean, scaler_scale = sc["mean"], sc["scale"]
+
+    n_classes, n_features = len(manifest["classes"]), len(feature_columns)
+    if lr_coef.shape != (n_classes, n_features) or scaler_mean.shape != (n_features,):
+        raise BundleError("Array shapes do not match the manifest")
+
+    return ModelBundle(
+        path=bundle_dir,
+        version=manifest["version"],
+        classes=np.asarray(manifest["classes"]),
+        feature_columns=feature_columns,
+        unknown_class_label=manifest["unknown_class_label"],
+        booster=booster,
+        lr_coef=lr_coef,
+        lr_intercept=lr_intercept,
+        scaler_mean=scaler_mean,
+        scaler_scale=scaler_scale,
+        manifest=manifest,
+    )
+
+
+# -------------------------------------------------
+# Versioned bundles + CURRENT pointer (hot swap)
+# -------------------------------------------------
+def versioned_bundle_dir(model_dir: Path, version: str) -> Path:
+    return Path(model_dir) / BUNDLES_DIR / version
+
+
+def current_version(model_dir: Path) -> str | None:
+    path = Path(model_dir) / CURRENT_FILE
+    if not path.exists():
+        return None
+    return path.read_text().strip() or None
+
+
+def current_bundle_dir(model_dir: Path) -> Path:
+    """Bundle named by CURRENT, or the unversioned bundle/ if there is none."""
+    version = current_version(model_dir)
+    if version is None:
+        return Path(model_dir) / LEGACY_BUNDLE_DIR
+    return versioned_bundle_dir(model_dir, version)
+
+
+def set_current(model_dir: Path, version: str) -> None:
+    """Atomically point CURRENT at a complete versioned bundle."""
+    read_manifest(versioned_bundle_dir(model_dir, version))
+    tmp = Path(model_dir) / (CURRENT_FILE + ".tmp")
+    tmp.write_text(version + "\n")
+    os.replace(tmp, Path(model_dir) / CURRENT_FILE)
+
+
+def publish_bundle(model_dir: Path, *, version: str | None = None, **bundle) -> Path:
+    """Write bundles/<version>/ (see write_bundle) and make it current."""
+    version = version or new_version()
+    out_dir = write_bundle(versioned_bundle_dir(model_dir, version), version=version, **bundle)
+    set_current(model_dir, version)
+    return out_dir
+
+
+def publish_booster(
+    model_dir: Path,
+    booster: xgb.Booster,
+    version: str | None = None,
+    classes: list[str] | None = None,
+    feature_columns: list[str] | None = None,
+) -> Path:
+    """
+    Publish the current bundle again with a new booster (refresh / retrain).
+    The LR tier and scaler are carried over, so the booster must have been
+    trained on the same classes and feature order (checked when given).
+    """
+    bundle = load_bundle(current_bundle_dir(model_dir))
+    if classes is not None and [str(c) for c in classes] != [str(c) for c in bundle.classes]:
+        raise BundleError("Booster classes do not match the current bundle (rerun 10_reco_engine.py)")
+    if feature_columns is not None and list(feature_columns) != bundle.feature_columns:
+        raise BundleError("Booster feature order does not match the current bundle (rerun 10_reco_engine.py)")
+    return publish_bundle(
+        model_dir,
+        version=version,
+        booster=booster,
+        lr_coef=bundle.lr_coef,
+        lr_intercept=bundle.lr_intercept,
+        classes=list(bundle.classes),
+        feature_columns=bundle.feature_columns,
+        target=bundle.manifest["target"],
+        unknown_class_label=bundle.unknown_class_label,
+        scaler_mean=bundle.scaler_mean,
+        scaler_scale=bundle.scaler_scale,
+    )
+
+
+def scaler_stats_for(feature_columns: list[str], scaler_path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mean / scale from 08's feature_scaler.npz, re-ordered to the model's
+    feature order. Falls back to the fitted StandardScaler pickled next to
+    it (feature_scaler.pkl, written by older runs of 08). Features the
+    scaler never saw are left unscaled; a missing scaler is an error, as
+    the LR model was trained on standardized features.
+    """
+    scaler_path = Path(scaler_path)
+    pkl_path = scaler_path.with_suffix(".pkl")
+
+    if scaler_path.exists():
+        with np.load(scaler_path) as sc:
+            names, scaler_mean, scaler_scale = sc["feature_names"], sc["mean"], sc["scale"]
+    elif pkl_path.exists():
+        import joblib
+
+        scaler = joblib.load(pkl_path)
+        if not hasattr(scaler, "feature_names_in_"):
+            raise BundleError(f"{pkl_path} has no feature names – rerun 08_data_normalization_split.py")
+        names, scaler_mean, scaler_scale = scaler.feature_names_in_, scaler.mean_, scaler.scale_
+    else:
+        raise BundleError(
+            f"No feature scaler at {scaler_path} or {pkl_path} – rerun 08_data_normalization_split.py"
+        )
+
+    mean = np.zeros(len(feature_columns))
+    scale = np.ones(len(feature_columns))
+    index = {str(n): i for i, n in enumerate(names)}
+    for j, col in enumerate(feature_columns):
+        if col in index:
+            mean[j] = scaler_mean[index[col]]
+            scale[j] = scaler_scale[index[col]]
+
+    return mean, scale
@@ -0,0 +1,108 @@
+"""
+Process-wide LRU cache for predictions and explanation payloads.
+
+Entries are keyed by (model version, kind, hash of the aligned feature
+vector, extra key parts). A new model version or any change to a user's
+features produces a different key, so stale entries are never served;
+`retain_version()` drops the old model's entries after a swap. The cache
+is bounded by the estimated memory of its values rather than by the
+number of entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+TIER_CACHE = "cache"
+
+
+def feature_digest(x) -> str:
+    """Stable hash of a feature vector / matrix (float32, C order)."""
+    x = np.ascontiguousarray(x, dtype=np.float32)
+    return hashlib.blake2b(x.tobytes(), digest_size=16).hexdigest()
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(k) + _nbytes(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class PredictionCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple, tuple[object, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_version: str, kind: str, x, extra: tuple = ()) -> tuple:
+        return (model_version, kind, feature_digest(x), *extra)
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, value) -> None:
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], object]):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def retain_version(self, model_version: str) -> int:
+        """Drop entries of every other model version; returns how many."""
+        with self._lock:
+            stale = [k for k in self._entries if k[0] != model_version]
+            for k in stale:
+                self.bytes -= self._entries.pop(k)[1]
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
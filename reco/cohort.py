@@ -0,0 +1,213 @@
+"""
+Cohort explanations: aggregated SHAP over a segment of demo users.
+
+A segment is defined by customer type (`is_new_customer`), a recency
+bucket on `p_purchase_recency` and the predicted category. Masks are
+built from the raw demo features, before nulls are filled for the model:
+users without a prior purchase have their own recency bucket and count
+as new customers. Every user in
+the segment is explained towards their own top-1 category in one batch:
+small segments in-process, large ones chunked over a persistent process
+pool. Results are cached in memory and on disk, keyed by the segment
+definition, the model version and a fingerprint of the demo data. The
+disk cache is an LRU capped at `max_disk_bytes` (file mtime marks use).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from reco.bundle import ModelBundle, load_bundle
+from reco.explain import EXACT, NativeExplainer
+
+
+ALL = "all"
+
+CUSTOMER_TYPES = [ALL, "new", "returning"]
+
+NO_PURCHASE = "no purchase yet"
+
+RECENCY_BUCKETS = {
+    "0–7 days": (0, 7),
+    "8–30 days": (7, 30),
+    "31–90 days": (30, 90),
+    "90+ days": (90, np.inf),
+    NO_PURCHASE: None,
+}
+
+CHUNK_ROWS = 1_000
+POOL_MIN_ROWS = 5_000
+MEMORY_CACHE_SIZE = 32
+MAX_DISK_CACHE_BYTES = 512 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Segment:
+    customer_type: str = ALL
+    recency_bucket: str = ALL
+    predicted_category: str = ALL
+
+    def cache_key(self, model_version: str, data_fingerprint: str) -> str:
+        payload = json.dumps(
+            {"segment": asdict(self), "model": model_version, "data": data_fingerprint},
+            sort_keys=True,
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def segment_mask(segment: Segment, features, predicted_labels: np.ndarray) -> np.ndarray:
+    """
+    Boolean row mask over the raw demo feature frame (nulls not filled;
+    same row order as the aligned matrix).
+    """
+    mask = np.ones(len(features), dtype=bool)
+    # NaN: no prior purchase
+    recency = features["p_purchase_recency"].astype("float64").to_numpy()
+    never_purchased = np.isnan(recency)
+
+    if segment.customer_type != ALL:
+        is_new = (features["is_new_customer"].astype("float64").to_numpy() == 1) | never_purchased
+        mask &= is_new if segment.customer_type == "new" else ~is_new
+
+    if segment.recency_bucket != ALL:
+        bounds = RECENCY_BUCKETS[segment.recency_bucket]
+        if bounds is None:
+            mask &= never_purchased
+        else:
+            # NaN compares False: never-purchased users fall in no bucket
+            lo, hi = bounds
+            lower = recency >= lo if lo == 0 else recency > lo
+            mask &= lower & (recency <= hi)
+
+    if segment.predicted_category != ALL:
+        mask &= predicted_labels == segment.predicted_category
+
+    return mask
+
+
+def top1_contributions(explainer: NativeExplainer, bundle: ModelBundle, X: np.ndarray) -> np.ndarray:
+    """(n_rows, n_features) SHAP of each row towards its own top-1 class."""
+    top1 = bundle.xgb_predict_proba(X).argmax(axis=1)
+    contribs = explainer.contributions(X, EXACT)[:, :, :-1]
+    return contribs[np.arange(len(X)), top1].astype(np.float32)
+
+
+# -------------------------------------------------
+# Persistent process pool
+# -------------------------------------------------
+_worker_bundle: ModelBundle | None = None
+_worker_explainer: NativeExplainer | None = None
+
+
+def _init_worker(bundle_dir: str) -> None:
+    global _worker_bundle, _worker_explainer
+    _worker_bundle = load_bundle(Path(bundle_dir), verify=False)
+    _worker_explainer = NativeExplainer(_worker_bundle)
+
+
+def _explain_chunk(X_chunk: np.ndarray) -> np.ndarray:
+    return top1_contributions(_worker_explainer, _worker_bundle, X_chunk)
+
+
+class CohortExplainer:
+    def __init__(
+        self,
+        bundle: ModelBundle,
+        cache_dir: Path,
+        max_workers: int | None = None,
+        max_disk_bytes: int = MAX_DISK_CACHE_BYTES,
+    ):
+        self.bundle = bundle
+        self.explainer = NativeExplainer(bundle)
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_disk_bytes = max_disk_bytes
+
+        self._pool: ProcessPoolExecutor | None = None
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Started once and reused, so only the first large cohort pays for it
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=mp.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(str(self.bundle.path),),
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def compute(self, X: np.ndarray) -> np.ndarray:
+        X = self.bundle.as_matrix(X)
+        if len(X) < POOL_MIN_ROWS:
+            return top1_contributions(self.explainer, self.bundle, X)
+
+        chunks = [X[i:i + CHUNK_ROWS] for i in range(0, len(X), CHUNK_ROWS)]
+        return np.concatenate(list(self._get_pool().map(_explain_chunk, chunks)))
+
+    def explain(self, segment: Segment, X: np.ndarray, data_fingerprint: str) -> np.ndarray:
+        """Cached (n_users_in_segment, n_features) SHAP values for a segment."""
+        key = segment.cache_key(self.bundle.version, data_fingerprint)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self.cache_dir / f"{key}.npy"
+        try:
+            values = np.load(path)
+            os.utime(path)
+        except FileNotFoundError:
+            values = self.compute(X) if len(X) else np.zeros((0, self.bundle.n_features), np.float32)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, values)
+            os.replace(tmp, path)
+            self.prune_disk_cache()
+
+        with self._lock:
+            self._memory[key] = values
+            while len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+
+        return values
+
+    def prune_disk_cache(self) -> int:
+        """Delete least recently used cache files above `max_disk_bytes`; returns how many."""
+        files = []
+        for path in self.cache_dir.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
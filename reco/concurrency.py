@@ -0,0 +1,123 @@
+"""
+Process-wide concurrency policy for serving.
+
+Concurrent app sessions each call into XGBoost (OpenMP, all cores by
+default), numba's parallel kernels, NumPy/BLAS and Polars, and every one
+of those libraries sizes its own thread pool to the whole machine. On a
+shared host this oversubscribes the cores many times over.
+
+The policy gives every request a small, fixed thread budget and admits
+only as many requests at once as the cores can run:
+
+  - BLAS / OpenMP pools are capped through threadpoolctl on every
+    executor worker (OpenMP limits are per thread, and threadpoolctl only
+    sees libraries that are already loaded),
+  - the booster's `nthread` and numba's thread count are pinned,
+  - POLARS_MAX_THREADS is set (it must be set before polars is imported),
+  - heavy calls go through a bounded executor of `max_concurrent` workers.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+
+T = TypeVar("T")
+
+THREADS_PER_REQUEST_ENV = "RECO_THREADS_PER_REQUEST"
+DEFAULT_THREADS_PER_REQUEST = 2
+MAX_PENDING_PER_WORKER = 8
+
+
+class Overloaded(RuntimeError):
+    """Raised when the executor's queue is full."""
+
+
+@dataclass(frozen=True)
+class ConcurrencyPolicy:
+    threads_per_request: int
+    max_concurrent: int
+
+    @classmethod
+    def for_host(cls, threads_per_request: int | None = None) -> "ConcurrencyPolicy":
+        cpus = os.cpu_count() or 1
+        if threads_per_request is None:
+            threads_per_request = int(
+                os.environ.get(THREADS_PER_REQUEST_ENV, DEFAULT_THREADS_PER_REQUEST)
+            )
+        threads = max(1, min(threads_per_request, cpus))
+        return cls(threads_per_request=threads, max_concurrent=max(1, cpus // threads))
+
+
+def apply_process_limits(policy: ConcurrencyPolicy):
+    """
+    Set POLARS_MAX_THREADS and cap the thread pools of the libraries
+    already loaded, for the calling thread (OpenMP) or process (BLAS).
+    Executor workers apply their own caps. Returns the threadpoolctl
+    limiter (call `.restore_original_limits()` to undo).
+    """
+    from threadpoolctl import threadpool_limits
+
+    os.environ.setdefault("POLARS_MAX_THREADS", str(policy.threads_per_request))
+    return threadpool_limits(limits=policy.threads_per_request)
+
+
+def configure_booster(booster: "xgb.Booster", policy: ConcurrencyPolicy) -> None:
+    booster.set_param({"nthread": policy.threads_per_request})
+
+
+def _init_worker(threads: int) -> None:
+    # numba's and OpenMP's thread counts are per calling thread, so set
+    # them in each worker, after the libraries are loaded
+    import numba
+    import numpy  # noqa: F401  (loads BLAS for threadpoolctl)
+    from threadpoolctl import threadpool_limits
+
+    numba.set_num_threads(min(threads, numba.config.NUMBA_NUM_THREADS))
+    threadpool_limits(limits=threads)
+
+
+class BoundedExecutor:
+    """
+    Runs heavy calls on `max_concurrent` workers. Callers block for the
+    result; once `max_pending` calls are queued or running, new calls
+    raise Overloaded instead of piling up (`run_within` waits a while for
+    a slot first).
+    """
+
+    def __init__(self, policy: ConcurrencyPolicy, max_pending: int | None = None):
+        self.policy = policy
+        self.max_pending = max_pending or policy.max_concurrent * MAX_PENDING_PER_WORKER
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=policy.max_concurrent,
+            thread_name_prefix="reco-request",
+            initializer=_init_worker,
+            initargs=(policy.threads_per_request,),
+        )
+
+    def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return self.run_within(0, fn, *args, **kwargs)
+
+    def run_within(self, wait_s: float, fn: Callable[..., T], *args, **kwargs) -> T:
+        """As `run()`, but waits up to `wait_s` for a free slot."""
+        if wait_s > 0:
+            acquired = self._slots.acquire(timeout=wait_s)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            raise Overloaded(f"More than {self.max_pending} requests in flight")
+        try:
+            return self._executor.submit(fn, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,168 @@
+"""
+Read-only, memory-mapped data plane shared by every app process on a host.
+
+17_export_data_plane.py writes one export per run into exports/<name>/:
+
+  manifest.json            format, model version, row counts
+  events_by_user.arrow     user-clustered demo events (Arrow IPC, uncompressed)
+  features_by_user.arrow   one feature row per user, same user order
+  index/<name>.npy         user ids and per-user event offsets
+  model/<name>.npy         flattened tree ensemble arrays
+
+An export is written to a temporary directory, renamed into exports/ and
+then named by the CURRENT file (replaced atomically). Readers resolve
+CURRENT, so they never pair one export's manifest with another's arrays.
+
+Readers map these files instead of parsing them, so Streamlit replicas
+share one physical copy through the page cache and a cold page does no
+Parquet decoding or booster JSON flattening. The tree arrays are tied to
+the model version in the manifest and ignored for any other model.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from reco.tree_predictor import FlatTreeEnsemble
+from reco.user_store import UserStore
+
+
+PLANE_FORMAT = 1
+
+MANIFEST_FILE = "manifest.json"
+EXPORTS_DIR = "exports"
+CURRENT_FILE = "CURRENT"
+EVENTS_FILE = "events_by_user.arrow"
+FEATURES_FILE = "features_by_user.arrow"
+INDEX_DIR = "index"
+MODEL_DIR = "model"
+
+INDEX_ARRAYS = ("user_ids", "event_start", "event_end")
+TREE_ARRAYS = tuple(f.name for f in fields(FlatTreeEnsemble) if f.name != "n_features")
+
+
+def _write_arrow(path: Path, table: pa.Table) -> None:
+    tmp = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _write_npy(path: Path, array: np.ndarray) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, np.ascontiguousarray(array))
+    os.replace(tmp, path)
+
+
+def current_export_dir(plane_dir: Path) -> Path:
+    """Export named by CURRENT, or the plane directory itself (older layout)."""
+    path = Path(plane_dir) / CURRENT_FILE
+    name = path.read_text().strip() if path.exists() else ""
+    return Path(plane_dir) / EXPORTS_DIR / name if name else Path(plane_dir)
+
+
+def export_data_plane(
+    out_dir: Path,
+    *,
+    model_version: str,
+    ensemble: FlatTreeEnsemble,
+    events: pa.Table,
+    features: pa.Table,
+    index: dict[str, np.ndarray],
+) -> Path:
+    """Write a complete export and make it current; returns its directory."""
+    out_dir = Path(out_dir)
+    exports = out_dir / EXPORTS_DIR
+    exports.mkdir(parents=True, exist_ok=True)
+    previous = current_export_dir(out_dir)
+
+    name = f"{model_version}_{time.time_ns()}"
+    tmp_dir = exports / f".{name}.tmp"
+    tmp_dir.mkdir()
+
+    _write_arrow(tmp_dir / EVENTS_FILE, events)
+    _write_arrow(tmp_dir / FEATURES_FILE, features)
+
+    for array_name in INDEX_ARRAYS:
+        _write_npy(tmp_dir / INDEX_DIR / f"{array_name}.npy", index[array_name])
+    for array_name in TREE_ARRAYS:
+        _write_npy(tmp_dir / MODEL_DIR / f"{array_name}.npy", getattr(ensemble, array_name))
+
+    manifest = {
+        "format": PLANE_FORMAT,
+        "model_version": model_version,
+        "n_features": ensemble.n_features,
+        "n_events": events.num_rows,
+        "n_users": features.num_rows,
+    }
+    with open(tmp_dir / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    export_dir = exports / name
+    os.replace(tmp_dir, export_dir)
+    tmp = out_dir / (CURRENT_FILE + ".tmp")
+    tmp.write_text(name + "\n")
+    os.replace(tmp, out_dir / CURRENT_FILE)
+
+    # Keep the previous export for readers that resolved CURRENT just
+    # before the swap; skip other writers' temporary directories
+    for old in exports.iterdir():
+        if old.name.startswith(".") or old in (export_dir, previous):
+            continue
+        shutil.rmtree(old, ignore_errors=True)
+
+    return export_dir
+
+
+class DataPlane:
+    def __init__(self, path: Path, manifest: dict):
+        self.path = Path(path)
+        self.manifest = manifest
+
+    @classmethod
+    def open(cls, path: Path) -> "DataPlane | None":
+        """Current export of the plane at `path`, or None if it has not been exported."""
+        path = current_export_dir(path)
+        if not (path / MANIFEST_FILE).exists():
+            return None
+        with open(path / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != PLANE_FORMAT:
+            return None
+        return cls(path, manifest)
+
+    @property
+    def model_version(self) -> str:
+        return self.manifest["model_version"]
+
+    def array(self, subdir: str, name: str) -> np.ndarray:
+        # np.asarray drops the memmap subclass (numba wants a plain ndarray)
+        # but keeps the read-only mapping
+        return np.asarray(np.load(self.path / subdir / f"{name}.npy", mmap_mode="r"))
+
+    def table(self, name: str) -> pa.Table:
+        # Zero-copy: record batches reference the mapped file directly
+        return pa.ipc.open_file(pa.memory_map(str(self.path / name), "r")).read_all()
+
+    def user_store(self) -> UserStore:
+        index = {name: self.array(INDEX_DIR, name) for name in INDEX_ARRAYS}
+        index["n_events"] = np.array(self.manifest["n_events"])
+        # Features are small and feed pandas code (prepare_X, cohorts)
+        features = self.table(FEATURES_FILE).to_pandas()
+        return UserStore(self.table(EVENTS_FILE), features, index)
+
+    def ensemble(self, model_version: str) -> FlatTreeEnsemble | None:
+        """Mapped tree arrays, or None if they belong to another model."""
+        if model_version != self.model_version:
+            return None
+        arrays = {name: self.array(MODEL_DIR, name) for name in TREE_ARRAYS}
+        return FlatTreeEnsemble(n_features=self.manifest["n_features"], **arrays)
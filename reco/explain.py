@@ -0,0 +1,95 @@
+"""
+Explanation backends: XGBoost native contributions and closed-form LR.
+
+`pred_contribs` computes exact TreeSHAP inside libxgboost, and
+`approx_contribs` the much cheaper path-attribution approximation; both
+skip the setup cost and Python overhead of `shap.TreeExplainer`.
+Results are returned for the requested class only.
+
+LinearExplainer covers the logistic regression in closed form.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from reco.bundle import ModelBundle
+
+
+EXACT = "exact"
+APPROXIMATE = "approximate"
+
+
+class NativeExplainer:
+    def __init__(self, bundle: ModelBundle):
+        self.bundle = bundle
+        self.booster = bundle.booster
+        self.feature_names = bundle.feature_columns
+        self._expected_value: np.ndarray | None = None
+
+    def contributions(self, X, mode: str = EXACT) -> np.ndarray:
+        """All classes: (n_rows, n_classes, n_features + 1); last column is the bias."""
+        if mode not in (EXACT, APPROXIMATE):
+            raise ValueError(f"Unknown explanation mode: {mode}")
+        import xgboost as xgb
+
+        dm = xgb.DMatrix(self.bundle.as_matrix(X), feature_names=self.feature_names)
+        return self.booster.predict(
+            dm,
+            pred_contribs=True,
+            approx_contribs=(mode == APPROXIMATE),
+            strict_shape=True,
+        )
+
+    def explain_class(self, X, class_idx: int, mode: str = EXACT) -> tuple[np.ndarray, np.ndarray]:
+        """(contributions (n_rows, n_features), base values (n_rows,)) for one class."""
+        out = self.contributions(X, mode)[:, class_idx, :]
+        return out[:, :-1], out[:, -1]
+
+    # -------------------------------------------------
+    # shap.TreeExplainer-compatible surface, so the SHAP
+    # store can use this backend interchangeably
+    # -------------------------------------------------
+    def shap_values(self, X) -> np.ndarray:
+        """(n_rows, n_features, n_classes), like shap>=0.45 for multiclass."""
+        return self.contributions(X, EXACT)[:, :, :-1].transpose(0, 2, 1)
+
+    @property
+    def expected_value(self) -> np.ndarray:
+        # The bias column is the same for every row
+        if self._expected_value is None:
+            probe = np.zeros((1, self.bundle.n_features), dtype=np.float32)
+            self._expected_value = self.contributions(probe, EXACT)[0, :, -1]
+        return self._expected_value
+
+
+class LinearExplainer:
+    """
+    Closed-form explanations for the logistic regression.
+
+    With standardized inputs z = (x - mean) / scale, the training
+    population's average user sits at z = 0, so the class logit splits
+    exactly into a baseline and per-feature terms:
+
+        logit_c(x) = intercept_c + sum_j coef_cj * z_j
+
+    Contrasting two classes is the same sum over the difference of their
+    coefficient vectors, which explains the logit gap between them.
+    """
+
+    def __init__(self, bundle: ModelBundle):
+        self.bundle = bundle
+        self.coef = bundle.lr_coef
+        self.intercept = bundle.lr_intercept
+
+    def explain_class(self, X, class_idx: int) -> tuple[np.ndarray, np.ndarray]:
+        """(contributions (n_rows, n_features), base values (n_rows,))."""
+        z = self.bundle.standardize(X)
+        contribs = z * self.coef[class_idx]
+        return contribs, np.full(len(z), self.intercept[class_idx])
+
+    def contrast(self, X, class_a: int, class_b: int) -> tuple[np.ndarray, np.ndarray]:
+        """Per-feature share of logit_a - logit_b, plus the baseline gap."""
+        z = self.bundle.standardize(X)
+        contribs = z * (self.coef[class_a] - self.coef[class_b])
+        return contribs, np.full(len(z), self.intercept[class_a] - self.intercept[class_b])
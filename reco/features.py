@@ -0,0 +1,25 @@
+"""
+Feature alignment shared by the app pages, batch jobs and benchmarks.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def prepare_X(df: pd.DataFrame, feature_cols: list) -> pd.DataFrame:
+    """
+    Align demo features with model-required features.
+    Missing features (e.g. is_new_customer) are injected as 0.
+    """
+    X = df.copy()
+
+    for col in feature_cols:
+        if col not in X.columns:
+            X[col] = 0
+
+    X = X[feature_cols]
+    X = X.replace([np.inf, -np.inf], np.nan).fillna(0.0)
+
+    return X
@@ -0,0 +1,144 @@
+"""
+Population-level global importance: per-class mean |SHAP| over the demo
+users, computed with the same TreeSHAP values as the local explanations.
+
+The file keeps running sums rather than means, together with the users
+already covered, so adding users only explains the new ones. It is keyed
+to the model version; a different model triggers a full recompute.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from reco.bundle import ModelBundle
+from reco.explain import EXACT, NativeExplainer
+
+
+CHUNK_ROWS = 2_000
+
+
+class GlobalImportance:
+    def __init__(
+        self,
+        model_version: str,
+        feature_columns: list[str],
+        classes,
+        abs_sum: np.ndarray,
+        counts: np.ndarray,
+        user_ids: np.ndarray,
+    ):
+        self.model_version = model_version
+        self.feature_columns = list(feature_columns)
+        self.classes = np.asarray(classes).astype(str)
+        self.abs_sum = abs_sum          # (n_classes, n_features) sum of |SHAP|
+        self.counts = counts            # (n_classes,) users that contributed
+        self.user_ids = user_ids        # users already covered
+
+    @classmethod
+    def empty(cls, bundle: ModelBundle) -> "GlobalImportance":
+        return cls(
+            bundle.version,
+            bundle.feature_columns,
+            bundle.classes,
+            np.zeros((bundle.n_classes, bundle.n_features)),
+            np.zeros(bundle.n_classes, dtype=np.int64),
+            np.array([], dtype=str),
+        )
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    def mean_abs(self, class_idx: int | None = None) -> np.ndarray:
+        """Mean |SHAP| per feature for one class, or averaged over all classes."""
+        if class_idx is None:
+            return self.abs_sum.sum(axis=0) / max(1, self.counts.sum())
+        return self.abs_sum[class_idx] / max(1, self.counts[class_idx])
+
+    def update(self, bundle: ModelBundle, user_ids, X: np.ndarray, max_workers: int | None = None) -> int:
+        """Fold in users not seen before; returns how many were added."""
+        if bundle.version != self.model_version:
+            raise ValueError("Importance file belongs to another model version")
+
+        user_ids = np.asarray(user_ids).astype(str)
+        new = ~np.isin(user_ids, self.user_ids)
+        if not new.any():
+            return 0
+
+        abs_sum, counts = population_abs_shap(bundle, X[new], max_workers=max_workers)
+        self.abs_sum += abs_sum
+        self.counts += counts
+        self.user_ids = np.concatenate([self.user_ids, user_ids[new]])
+        return int(new.sum())
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            model_version=np.array(self.model_version),
+            feature_columns=np.asarray(self.feature_columns),
+            classes=self.classes,
+            abs_sum=self.abs_sum,
+            counts=self.counts,
+            user_ids=self.user_ids,
+        )
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, expected_version: str | None = None) -> "GlobalImportance | None":
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            version = str(data["model_version"])
+            if expected_version is not None and version != expected_version:
+                return None
+            return cls(
+                version,
+                data["feature_columns"].tolist(),
+                data["classes"],
+                data["abs_sum"],
+                data["counts"],
+                data["user_ids"],
+            )
+
+
+def importance_path(out_dir: Path, model_version: str) -> Path:
+    return Path(out_dir) / f"global_importance_{model_version}.npz"
+
+
+def _chunk_abs_shap(explainer: NativeExplainer, X_chunk: np.ndarray) -> np.ndarray:
+    # (n, C, F) exact contributions without the bias column
+    return np.abs(explainer.contributions(X_chunk, EXACT)[:, :, :-1]).sum(axis=0)
+
+
+def population_abs_shap(
+    bundle: ModelBundle,
+    X: np.ndarray,
+    chunk_rows: int = CHUNK_ROWS,
+    max_workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sum of |SHAP| per (class, feature) over all rows, plus row counts per
+    class. Every row contributes to every class, as in shap's multiclass
+    summary plot.
+    """
+    explainer = NativeExplainer(bundle)
+    chunks = [X[i:i + chunk_rows] for i in range(0, len(X), chunk_rows)]
+    workers = max_workers or min(len(chunks), os.cpu_count() or 1)
+
+    # pred_contribs runs in libxgboost with the GIL released
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(lambda c: _chunk_abs_shap(explainer, c), chunks))
+
+    abs_sum = np.sum(parts, axis=0) if parts else np.zeros((bundle.n_classes, bundle.n_features))
+    counts = np.full(bundle.n_classes, len(X), dtype=np.int64)
+    return abs_sum, counts
@@ -0,0 +1,323 @@
+"""
+Stage instrumentation for the pipeline scripts (01–10).
+
+A script creates one RunProfiler and marks where each stage begins;
+starting a stage closes the previous one:
+
+    prof = RunProfiler("05_data_prepare")
+    prof.stage("load")
+    ...
+    prof.stage("cart features")
+    cart_aggs = prof.collect(cart_aggs_lf)    # instead of cart_aggs_lf.collect()
+    prof.rows(out=cart_aggs)
+    ...
+    prof.finish()
+
+Each stage records wall time, CPU time of the whole process (Polars and
+BLAS threads included), RSS at start and peak RSS during the stage
+(sampled from /proc; process peak elsewhere) and rows in/out. For Polars
+queries, `collect()` / `explain()` attach the optimized plan and, with
+RECO_PROFILE_PLANS=1, the per-node timings of `LazyFrame.profile()`.
+`profile()` only runs the in-memory engine, so queries collected with
+engine / streaming arguments are not plan-profiled (a warning says so)
+and keep their own engine.
+
+The run report is written as JSON to reports/pipeline/ (RECO_PROFILE_DIR
+overrides) when the script finishes or fails, next to a `<script>_latest`
+copy. Compare runs with:
+
+    python -m reco.profiling reports/pipeline/05_data_prepare_*.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+PROFILE_DIR_ENV = "RECO_PROFILE_DIR"
+PROFILE_PLANS_ENV = "RECO_PROFILE_PLANS"
+DEFAULT_PROFILE_DIR = Path("reports") / "pipeline"
+REPORT_FORMAT = 1
+
+RSS_SAMPLE_S = 0.02
+TOP_PLAN_NODES = 15
+
+_STATM = Path("/proc/self/statm")
+
+
+def _current_rss_mb() -> float | None:
+    try:
+        pages = int(_STATM.read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _process_peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _count_rows(obj) -> int | None:
+    if obj is None or isinstance(obj, int):
+        return obj
+    if hasattr(obj, "height"):
+        return int(obj.height)
+    if hasattr(obj, "collect_schema"):
+        # LazyFrame: counting would run the query
+        return None
+    return len(obj)
+
+
+class _Stage:
+    def __init__(self, name: str, rows_in):
+        self.name = name
+        self.rows_in = _count_rows(rows_in)
+        self.rows_out: int | None = None
+        self.queries: list[dict] = []
+        self.status = "ok"
+        self.error: str | None = None
+        self.rss_start_mb = _current_rss_mb()
+        self.peak_rss_mb = self.rss_start_mb or 0.0
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+
+    def close(self) -> None:
+        self.wall_s = time.perf_counter() - self._wall0
+        self.cpu_s = time.process_time() - self._cpu0
+        if self.rss_start_mb is None:
+            self.peak_rss_mb = _process_peak_rss_mb()
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "error": self.error,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            # > 1 means the stage ran on several cores
+            "parallelism": round(self.cpu_s / self.wall_s, 2) if self.wall_s else None,
+            "rss_start_mb": round(self.rss_start_mb, 1) if self.rss_start_mb is not None else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "queries": self.queries,
+        }
+
+
+class RunProfiler:
+    def __init__(self, script: str, out_dir: Path | None = None, profile_plans: bool | None = None):
+        self.script = script
+        self.out_dir = Path(out_dir or os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR)
+        if profile_plans is None:
+            profile_plans = os.environ.get(PROFILE_PLANS_ENV) == "1"
+        self.profile_plans = profile_plans
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: list[_Stage] = []
+        self.report_path: Path | None = None
+        self._current: _Stage | None = None
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+        threading.Thread(target=self._sample_rss, name="reco-profiler-rss", daemon=True).start()
+
+        # Failed runs are reported too
+        self._excepthook = sys.excepthook
+        sys.excepthook = self._on_exception
+        atexit.register(self._on_exit)
+
+    # ---------------------------------------------
+    # Stages
+    # ---------------------------------------------
+    def stage(self, name: str, rows_in=None) -> None:
+        """Close the current stage (if any) and start `name`."""
+        with self._lock:
+            self._close_current()
+            self._current = _Stage(name, rows_in)
+            self.stages.append(self._current)
+
+    def rows(self, out=None, rows_in=None) -> None:
+        """Row counts of the current stage (ints, DataFrames or tables)."""
+        if self._current is None:
+            return
+        if out is not None:
+            self._current.rows_out = _count_rows(out)
+        if rows_in is not None:
+            self._current.rows_in = _count_rows(rows_in)
+
+    def _close_current(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+    def _sample_rss(self) -> None:
+        while not self._done.wait(RSS_SAMPLE_S):
+            rss = _current_rss_mb()
+            if rss is None:
+                return
+            stage = self._current
+            if stage is not None and rss > stage.peak_rss_mb:
+                stage.peak_rss_mb = rss
+
+    # ---------------------------------------------
+    # Polars queries
+    # ---------------------------------------------
+    def explain(self, lf, label: str | None = None) -> None:
+        """Attach the optimized plan of `lf` to the current stage without running it."""
+        self._add_query(label, lf.explain())
+
+    def collect(self, lf, label: str | None = None, **collect_kwargs):
+        """
+        `lf.collect(**collect_kwargs)` with its optimized plan recorded;
+        with plan profiling on, runs `lf.profile()` and records node timings
+        (only for plain collects: `profile()` takes no engine arguments).
+        """
+        plan = lf.explain()
+        if self.profile_plans and collect_kwargs:
+            print(
+                f"⚠️ {self.script}: not plan-profiling {label or 'query'} – "
+                f"collected with {collect_kwargs}, which profile() cannot honour",
+                file=sys.stderr,
+            )
+        if not self.profile_plans or collect_kwargs:
+            df = lf.collect(**collect_kwargs)
+            self._add_query(label, plan, rows=df.height)
+            return df
+
+        df, timings = lf.profile()
+        timings = timings.with_columns((timings["end"] - timings["start"]).alias("us"))
+        nodes = timings.sort("us", descending=True).head(TOP_PLAN_NODES)
+        self._add_query(label, plan, rows=df.height, nodes=[
+            {"node": row["node"], "start_us": int(row["start"]), "end_us": int(row["end"])}
+            for row in nodes.iter_rows(named=True)
+        ])
+        return df
+
+    def _add_query(self, label, plan: str, rows: int | None = None, nodes: list | None = None) -> None:
+        if self._current is None:
+            self.stage(label or "query")
+        query = {"label": label or f"query_{len(self._current.queries)}", "plan": plan}
+        if rows is not None:
+            query["rows"] = rows
+        if nodes is not None:
+            query["nodes"] = nodes
+        self._current.queries.append(query)
+
+    # ---------------------------------------------
+    # Report
+    # ---------------------------------------------
+    def report(self, status: str) -> dict:
+        try:
+            import polars as pl
+            polars_version = pl.__version__
+        except ImportError:
+            polars_version = None
+
+        return {
+            "format": REPORT_FORMAT,
+            "script": self.script,
+            "status": status,
+            "started_at": self.started_at.isoformat(),
+            "wall_s": round(time.perf_counter() - self._wall0, 4),
+            "cpu_s": round(time.process_time() - self._cpu0, 4),
+            "peak_rss_mb": round(_process_peak_rss_mb(), 1),
+            "host": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "polars": polars_version,
+                "polars_max_threads": os.environ.get("POLARS_MAX_THREADS"),
+            },
+            "stages": [s.as_dict() for s in self.stages],
+        }
+
+    def finish(self, status: str = "ok") -> Path:
+        """Close the last stage and write the run report; returns its path."""
+        with self._lock:
+            if self.report_path is not None:
+                return self.report_path
+            self._close_current()
+            self._done.set()
+            if sys.excepthook == self._on_exception:
+                sys.excepthook = self._excepthook
+
+            report = self.report(status)
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            stamp = self.started_at.strftime("%Y%m%dT%H%M%SZ")
+            path = self.out_dir / f"{self.script}_{stamp}.json"
+            text = json.dumps(report, indent=2)
+            path.write_text(text)
+            (self.out_dir / f"{self.script}_latest.json").write_text(text)
+            self.report_path = path
+
+        print(f"⏱  {self.script}: {report['wall_s']:.1f}s wall | "
+              f"peak RSS {report['peak_rss_mb']:,.0f} MB | report: {path}")
+        return path
+
+    def _on_exception(self, exc_type, exc, tb) -> None:
+        if self._current is not None:
+            self._current.status = "failed"
+            self._current.error = f"{exc_type.__name__}: {exc}"
+        self.finish("failed")
+        self._excepthook(exc_type, exc, tb)
+
+    def _on_exit(self) -> None:
+        # Script exited without finish() (sys.exit, early return)
+        if self.report_path is None:
+            self.finish("incomplete")
+
+
+# -------------------------------------------------
+# Comparing runs
+# -------------------------------------------------
+def load_report(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare pipeline run reports stage by stage")
+    parser.add_argument("reports", type=Path, nargs="+")
+    parser.add_argument("--plans", action="store_true", help="Print the slowest plan nodes")
+    args = parser.parse_args()
+
+    reports = [load_report(p) for p in args.reports]
+    for report in reports:
+        print(
+            f"\n📄 {report['script']} @ {report['started_at']} [{report['status']}] "
+            f"{report['wall_s']:.2f}s wall | {report['cpu_s']:.2f}s CPU | "
+            f"peak RSS {report['peak_rss_mb']:,.0f} MB"
+        )
+        print(f"{'stage':<32} {'wall s':>9} {'cpu s':>9} {'par':>5} {'peak MB':>9} {'rows in':>13} {'rows out':>13}")
+        for s in report["stages"]:
+            print(
+                f"{s['name'][:32]:<32} {s['wall_s']:9.2f} {s['cpu_s']:9.2f} "
+                f"{s['parallelism'] or 0:5.1f} {s['peak_rss_mb']:9,.0f} "
+                f"{s['rows_in'] if s['rows_in'] is not None else '-':>13} "
+                f"{s['rows_out'] if s['rows_out'] is not None else '-':>13}"
+            )
+            if not args.plans:
+                continue
+            for query in s["queries"]:
+                for node in query.get("nodes", [])[:5]:
+                    ms = (node["end_us"] - node["start_us"]) / 1000
+                    print(f"    {query['label'][:20]:<20} {ms:10.1f} ms  {node['node'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
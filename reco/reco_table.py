@@ -0,0 +1,119 @@
+"""
+Precomputed top-k recommendation table for the demo population.
+
+Built offline by 13_demo_reco_table.py: every user is scored in one
+vectorized call (chunked and threaded for large populations) and only
+the top-k class indices (uint8) and probabilities (float16) are kept.
+The pages serve from it with a dict lookup and fall back to live
+scoring for users that are not in the table.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from reco.bundle import ModelBundle
+
+
+TOP_K = 5
+CHUNK_ROWS = 100_000
+
+TIER_TABLE = "precomputed"
+
+
+def score_in_chunks(
+    bundle: ModelBundle,
+    X: np.ndarray,
+    chunk_rows: int = CHUNK_ROWS,
+    max_workers: int | None = None,
+) -> np.ndarray:
+    """XGBoost probabilities for all rows; chunks are scored concurrently."""
+    X = bundle.as_matrix(X)
+    if len(X) <= chunk_rows:
+        return bundle.xgb_predict_proba(X).astype(np.float32)
+
+    chunks = [X[i:i + chunk_rows] for i in range(0, len(X), chunk_rows)]
+    workers = max_workers or min(len(chunks), os.cpu_count() or 1)
+
+    # inplace_predict is thread-safe and releases the GIL
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(bundle.xgb_predict_proba, chunks))
+
+    return np.concatenate(parts).astype(np.float32)
+
+
+def top_k(probs: np.ndarray, k: int = TOP_K) -> tuple[np.ndarray, np.ndarray]:
+    """(class_idx uint8, probs float16), both (n_rows, k), best first."""
+    k = min(k, probs.shape[1])
+    part = np.argpartition(-probs, k - 1, axis=1)[:, :k]
+    part_probs = np.take_along_axis(probs, part, axis=1)
+    order = np.argsort(-part_probs, axis=1)
+    idx = np.take_along_axis(part, order, axis=1)
+    return idx.astype(np.uint8), np.take_along_axis(part_probs, order, axis=1).astype(np.float16)
+
+
+def write_table(
+    path: Path,
+    user_ids,
+    class_idx: np.ndarray,
+    probs: np.ndarray,
+    classes,
+    model_version: str,
+) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(
+        tmp,
+        user_ids=np.asarray(user_ids).astype(str),
+        class_idx=class_idx,
+        probs=probs,
+        classes=np.asarray(classes).astype(str),
+        model_version=np.array(model_version),
+    )
+    os.replace(tmp, path)
+    return path
+
+
+class RecoTable:
+    def __init__(self, user_ids, class_idx, probs, classes, model_version: str):
+        self.class_idx = class_idx
+        self.probs = probs
+        self.classes = classes
+        self.model_version = model_version
+        self._row = {u: i for i, u in enumerate(user_ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, user_id) -> bool:
+        return str(user_id) in self._row
+
+    @classmethod
+    def load(cls, path: Path, expected_version: str | None = None) -> "RecoTable | None":
+        """None when the table is missing or was built for another model."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            version = str(data["model_version"])
+            if expected_version is not None and version != expected_version:
+                return None
+            return cls(
+                data["user_ids"],
+                data["class_idx"],
+                data["probs"],
+                data["classes"],
+                version,
+            )
+
+    def lookup(self, user_id, k: int = 3) -> list[tuple[str, float]] | None:
+        row = self._row.get(str(user_id))
+        if row is None:
+            return None
+        idx = self.class_idx[row, :k]
+        return [(self.classes[i], float(p)) for i, p in zip(idx, self.probs[row, :k])]
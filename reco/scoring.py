@@ -0,0 +1,158 @@
+"""
+Latency-budgeted tiered scoring.
+
+Tier 1 is the XGBoost ensemble (numba tree predictor). Tier 2 is the
+logistic regression evaluated as a pure-NumPy dot product over the
+standardized features, which costs microseconds and needs no warm-up.
+
+Each request carries a latency budget. XGBoost answers when its expected
+latency fits the budget; otherwise (model still cold, or the process is
+overloaded with in-flight requests) the LR tier answers. A budget of 0
+always selects the LR tier. Every result records which tier produced it.
+
+While the estimate is over budget, every `probe_every`-th request is
+still sent to XGBoost and its latency replaces the estimate, so one slow
+call (GC pause, load burst) does not pin the process to the LR tier.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+from reco.bundle import ModelBundle, softmax
+from reco.tree_predictor import FlatTreeEnsemble
+
+
+TIER_XGB = "xgboost"
+TIER_LR = "logistic_regression"
+
+DEFAULT_BUDGET_MS = 100.0
+DEFAULT_PROBE_EVERY = 50
+
+
+@dataclass
+class ScoreResult:
+    probs: np.ndarray       # (n_rows, n_classes)
+    tier: str
+    elapsed_ms: float
+
+
+class TieredScorer:
+    def __init__(
+        self,
+        bundle: ModelBundle,
+        ensemble: FlatTreeEnsemble | None = None,
+        default_budget_ms: float = DEFAULT_BUDGET_MS,
+        ewma_alpha: float = 0.2,
+        probe_every: int = DEFAULT_PROBE_EVERY,
+    ):
+        self.bundle = bundle
+        self.default_budget_ms = default_budget_ms
+
+        # LR tier: fold standardization into the weights once,
+        #   coef · ((x - mean) / scale) + b  ==  (coef / scale) · x + b'
+        coef = bundle.lr_coef / bundle.scaler_scale
+        self._lr_weights = np.ascontiguousarray(coef.T, dtype=np.float64)
+        self._lr_bias = bundle.lr_intercept - coef @ bundle.scaler_mean
+
+        self._ensemble = ensemble
+        self._alpha = ewma_alpha
+        self._xgb_ms: float | None = None
+        self._probe_every = probe_every
+        self._skipped = 0
+        self._in_flight = 0
+        self._cpus = os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self.tier_counts: Counter = Counter()
+
+    # -------------------------------------------------
+    # Warm-up
+    # -------------------------------------------------
+    @property
+    def is_warm(self) -> bool:
+        return self._ensemble is not None
+
+    @property
+    def ensemble(self) -> FlatTreeEnsemble | None:
+        return self._ensemble
+
+    def attach_ensemble(self, ensemble: FlatTreeEnsemble) -> None:
+        ensemble.predict_proba(np.zeros(ensemble.n_features))  # JIT compile
+        self._ensemble = ensemble
+
+    def warm_in_background(self) -> threading.Thread:
+        """Flatten + compile the tree ensemble; LR answers until it is ready."""
+        def _warm():
+            self.attach_ensemble(FlatTreeEnsemble.from_booster(self.bundle.booster))
+
+        thread = threading.Thread(target=_warm, name="reco-xgb-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    # -------------------------------------------------
+    # Scoring
+    # -------------------------------------------------
+    def expected_xgb_ms(self) -> float | None:
+        """EWMA latency scaled by how many requests already compete for cores."""
+        if self._xgb_ms is None:
+            return None
+        return self._xgb_ms * max(1.0, (self._in_flight + 1) / self._cpus)
+
+    def score_lr(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return softmax(X @ self._lr_weights + self._lr_bias)
+
+    def score(self, X, budget_ms: float | None = None) -> ScoreResult:
+        budget = self.default_budget_ms if budget_ms is None else budget_ms
+        start = time.perf_counter()
+
+        with self._lock:
+            expected = self.expected_xgb_ms()
+            use_xgb = self._ensemble is not None and budget > 0 and (
+                expected is None or expected <= budget
+            )
+            probe = False
+            if not use_xgb and self._ensemble is not None and budget > 0:
+                # Over budget: re-measure XGBoost now and then
+                self._skipped += 1
+                probe = use_xgb = self._skipped >= self._probe_every
+            if use_xgb:
+                self._skipped = 0
+                self._in_flight += 1
+
+        if use_xgb:
+            try:
+                probs = self._ensemble.predict_proba(X)
+            finally:
+                took = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    self._in_flight -= 1
+                    # A probe's fresh sample replaces the stale estimate
+                    self._xgb_ms = took if self._xgb_ms is None or probe else (
+                        self._alpha * took + (1 - self._alpha) * self._xgb_ms
+                    )
+            tier = TIER_XGB
+        else:
+            probs = self.score_lr(X)
+            tier = TIER_LR
+
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.tier_counts[tier] += 1
+
+        return ScoreResult(probs=probs, tier=tier, elapsed_ms=elapsed)
+
+    def top_k(self, X, k: int = 3, budget_ms: float | None = None) -> tuple[list[tuple[str, float]], ScoreResult]:
+        """(label, prob) pairs for the first row plus the full result."""
+        result = self.score(X, budget_ms)
+        probs = result.probs[0]
+        idx = np.argsort(probs)[::-1][:k]
+        return [(self.bundle.classes[i], float(probs[i])) for i in idx], result
@@ -0,0 +1,275 @@
+"""
+Local HTTP inference service with dynamic micro-batching.
+
+    python -m reco.service --port 8601
+
+Endpoints (JSON):
+
+  GET /recommend?user_id=<id>&k=3       top-k categories for a demo user
+  GET /explain?user_id=<id>&class=<c>   exact contributions towards class c
+  GET /stats                            throughput, p50/p99 latency, batch sizes
+  GET /health
+
+Backed by the same serving assets as the app (model bundle, flattened
+trees, demo user store). Requests that arrive within a few milliseconds
+of each other are merged by an asyncio micro-batcher into one
+`predict_proba` / `pred_contribs` call, run off the event loop. The app
+pages call the service through reco.service_client when RECO_SERVICE_URL
+is set.
+
+The bundle is loaded once, at start: unlike the app, the service does not
+watch models/reco/CURRENT. Restart it after publishing a new model; until
+then every response carries the old `model_version` and the app scores
+in-process instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import tornado.web
+
+from reco.assets import ServingAssets, load_serving_assets
+from reco.explain import EXACT
+from reco.features import prepare_X
+
+
+DEFAULT_PORT = 8601
+MAX_BATCH = 256
+MAX_WAIT_MS = 2.0
+STATS_WINDOW_S = 60.0
+
+
+class MicroBatcher:
+    """Merge concurrent single-row calls into one batched call of `fn`."""
+
+    def __init__(self, fn, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes: deque[int] = deque(maxlen=10_000)
+        # One batch in flight at a time; requests queue up behind it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reco-batch")
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, row: np.ndarray) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(items) < self.max_batch:
+            if not self._queue.empty():
+                items.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            X = np.stack([row for row, _ in items])
+            self.batch_sizes.append(len(items))
+            try:
+                out = await loop.run_in_executor(self._executor, self.fn, X)
+            except Exception as exc:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for i, (_, future) in enumerate(items):
+                if not future.done():
+                    future.set_result(out[i])
+
+
+class LatencyStats:
+    """Rolling per-endpoint latency samples and request throughput."""
+
+    def __init__(self, window_s: float = STATS_WINDOW_S):
+        self.window_s = window_s
+        self.started = time.monotonic()
+        self.totals: Counter = Counter()
+        self._samples: dict[str, deque] = defaultdict(lambda: deque(maxlen=100_000))
+
+    def record(self, endpoint: str, elapsed_ms: float) -> None:
+        self.totals[endpoint] += 1
+        self._samples[endpoint].append((time.monotonic(), elapsed_ms))
+
+    def summary(self) -> dict:
+        now = time.monotonic()
+        span = min(self.window_s, max(now - self.started, 1e-9))
+        out = {}
+        for endpoint, samples in self._samples.items():
+            recent = np.array([ms for t, ms in samples if now - t <= self.window_s])
+            out[endpoint] = {
+                "requests": self.totals[endpoint],
+                "throughput_rps": round(len(recent) / span, 2),
+                "p50_ms": round(float(np.percentile(recent, 50)), 3) if len(recent) else None,
+                "p99_ms": round(float(np.percentile(recent, 99)), 3) if len(recent) else None,
+            }
+        return out
+
+
+class InferenceService:
+    def __init__(self, assets: ServingAssets):
+        self.assets = assets
+        self.bundle = assets.bundle
+        self.user_store = assets.user_store
+        self.explainer = assets.explainer
+        self.stats = LatencyStats()
+
+        # Aligned feature matrix in user-store order: a lookup is one
+        # binary search for the row
+        self.X = self.bundle.as_matrix(
+            prepare_X(self.user_store.features_df, self.bundle.feature_columns)
+        )
+
+        self.scoring = MicroBatcher(assets.ensemble.predict_proba)
+        self.contribs = MicroBatcher(lambda X: self.explainer.contributions(X, EXACT))
+
+    def start(self) -> None:
+        self.scoring.start()
+        self.contribs.start()
+
+    def _row(self, user_id: str) -> np.ndarray:
+        return self.X[self.user_store.position(user_id)]
+
+    async def recommend(self, user_id: str, k: int) -> dict:
+        probs = await self.scoring.submit(self._row(user_id))
+        top = np.argsort(probs)[::-1][:k]
+        return {
+            "user_id": user_id,
+            "model_version": self.bundle.version,
+            "recommendations": [
+                {"category": str(self.bundle.classes[i]), "probability": float(probs[i])}
+                for i in top
+            ],
+        }
+
+    async def explain(self, user_id: str, label: str) -> dict:
+        class_idx = self.bundle.class_index(label)
+        out = await self.contribs.submit(self._row(user_id))
+        return {
+            "user_id": user_id,
+            "model_version": self.bundle.version,
+            "class": label,
+            "base_value": float(out[class_idx, -1]),
+            "feature_columns": self.bundle.feature_columns,
+            "contributions": out[class_idx, :-1].astype(float).tolist(),
+        }
+
+    def batch_summary(self) -> dict:
+        return {
+            name: {
+                "batches": len(b.batch_sizes),
+                "mean_batch_size": round(float(np.mean(b.batch_sizes)), 2) if b.batch_sizes else None,
+            }
+            for name, b in (("scoring", self.scoring), ("contributions", self.contribs))
+        }
+
+
+# -------------------------------------------------
+# HTTP handlers
+# -------------------------------------------------
+class _Handler(tornado.web.RequestHandler):
+    def initialize(self, service: InferenceService):
+        self.service = service
+
+    def write_error(self, status_code: int, **kwargs) -> None:
+        self.finish({"error": self._reason, "status": status_code})
+
+    async def _timed(self, endpoint: str, call):
+        start = time.perf_counter()
+        try:
+            result = await call
+        except KeyError as exc:
+            raise tornado.web.HTTPError(404, reason=f"Unknown {exc.args[0]!r}")
+        self.service.stats.record(endpoint, (time.perf_counter() - start) * 1000)
+        self.write(result)
+
+
+class RecommendHandler(_Handler):
+    async def get(self):
+        user_id = self.get_query_argument("user_id")
+        try:
+            k = int(self.get_query_argument("k", "3"))
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="k must be an integer")
+        await self._timed("recommend", self.service.recommend(user_id, max(1, k)))
+
+
+class ExplainHandler(_Handler):
+    async def get(self):
+        user_id = self.get_query_argument("user_id")
+        label = self.get_query_argument("class")
+        await self._timed("explain", self.service.explain(user_id, label))
+
+
+class StatsHandler(_Handler):
+    def get(self):
+        self.write({
+            "model_version": self.service.bundle.version,
+            "uptime_s": round(time.monotonic() - self.service.stats.started, 1),
+            "endpoints": self.service.stats.summary(),
+            "batching": self.service.batch_summary(),
+        })
+
+
+class HealthHandler(_Handler):
+    def get(self):
+        self.write({"status": "ok", "model_version": self.service.bundle.version})
+
+
+def make_app(service: InferenceService) -> tornado.web.Application:
+    args = {"service": service}
+    return tornado.web.Application([
+        (r"/recommend", RecommendHandler, args),
+        (r"/explain", ExplainHandler, args),
+        (r"/stats", StatsHandler, args),
+        (r"/health", HealthHandler, args),
+    ])
+
+
+async def serve(base_dir: Path, port: int, address: str) -> None:
+    print("📥 Loading serving assets...")
+    service = InferenceService(load_serving_assets(base_dir))
+    service.start()
+
+    make_app(service).listen(port, address=address)
+    print(f"✅ Model {service.bundle.version} | {service.user_store.n_users:,} users")
+    print(f"🚀 Serving on http://{address}:{port}")
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recommendation inference service")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--base-dir", type=Path, default=Path(__file__).resolve().parent.parent)
+    args = parser.parse_args()
+    asyncio.run(serve(args.base_dir, args.port, args.address))
+
+
+if __name__ == "__main__":
+    main()
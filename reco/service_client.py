@@ -0,0 +1,70 @@
+"""
+Client for the local inference service (reco.service).
+
+The app pages use it when RECO_SERVICE_URL is set, e.g.
+
+    RECO_SERVICE_URL=http://127.0.0.1:8601 streamlit run app/app.py
+
+and fall back to in-process scoring when the service is unreachable or
+serves another model version than the app.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+
+import numpy as np
+import requests
+
+
+SERVICE_URL_ENV = "RECO_SERVICE_URL"
+TIER_SERVICE = "service"
+DEFAULT_TIMEOUT_S = 2.0
+
+
+class ServiceError(RuntimeError):
+    """Raised when the service is unreachable or rejects a request."""
+
+
+class ServiceClient:
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT_S):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # requests.Session is not thread-safe: one per calling thread
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "ServiceClient | None":
+        url = os.environ.get(SERVICE_URL_ENV)
+        return cls(url) if url else None
+
+    @property
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _get(self, path: str, **params) -> dict:
+        try:
+            response = self._session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise ServiceError(f"{path} failed: {exc}") from exc
+        return response.json()
+
+    def recommend(self, user_id, k: int = 3) -> tuple[list[tuple[str, float]], str]:
+        """(top-k (category, probability) pairs, model version that scored them)."""
+        payload = self._get("/recommend", user_id=str(user_id), k=k)
+        top = [(r["category"], r["probability"]) for r in payload["recommendations"]]
+        return top, payload["model_version"]
+
+    def explain(self, user_id, label: str) -> tuple[np.ndarray, float, str]:
+        """(contributions in the service's feature order, base value, model version)."""
+        payload = self._get("/explain", user_id=str(user_id), **{"class": label})
+        contribs = np.asarray(payload["contributions"], dtype=np.float32)
+        return contribs, payload["base_value"], payload["model_version"]
+
+    def stats(self) -> dict:
+        return self._get("/stats")
@@ -0,0 +1,281 @@
+"""
+Precomputed, compact SHAP explanation store for the demo population.
+
+Built offline by 14_demo_shap_store.py in a process pool. For every user
+only the explanations of their top-2 predicted classes are kept, and of
+those only the top-N features by |SHAP|:
+
+  batches/<batch>/  one complete batch run:
+    explanations.npy  structured records, opened memory-mapped (read-only)
+    user_ids.npy      user id of each record
+    meta.json         model version, top_n, feature order, classes
+  CURRENT           name of the served batch (replaced atomically)
+  overflow_<version>.jsonl
+                    explanations filled lazily by the app for users that
+                    were not precomputed (append-only)
+
+A batch is written to a temporary directory, renamed into batches/ and
+only then named by CURRENT, so readers (and a crash mid-write) never see
+records, ids and meta from different runs.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from reco.bundle import ModelBundle, load_bundle
+
+
+TOP_N = 16
+N_CLASSES_KEPT = 2
+CHUNK_ROWS = 2_000
+
+RECORDS_FILE = "explanations.npy"
+USER_IDS_FILE = "user_ids.npy"
+META_FILE = "meta.json"
+BATCHES_DIR = "batches"
+CURRENT_FILE = "CURRENT"
+
+
+def record_dtype(top_n: int = TOP_N) -> np.dtype:
+    return np.dtype([
+        ("classes", np.uint8, (N_CLASSES_KEPT,)),
+        ("feature_idx", np.uint16, (N_CLASSES_KEPT, top_n)),
+        ("shap", np.float16, (N_CLASSES_KEPT, top_n)),
+        ("base", np.float32, (N_CLASSES_KEPT,)),
+    ])
+
+
+def shap_by_class(values, n_classes: int) -> np.ndarray:
+    """
+    Normalise TreeExplainer output to (n_rows, n_classes, n_features).
+    Older shap returns list[class] -> (n, F); newer (n, F, C).
+    """
+    if isinstance(values, list):
+        return np.stack(values, axis=1)
+    values = np.asarray(values)
+    if values.ndim == 3 and values.shape[2] == n_classes:
+        return values.transpose(0, 2, 1)
+    raise RuntimeError("Unsupported SHAP output format")
+
+
+def compact_records(
+    contribs: np.ndarray,
+    base_values: np.ndarray,
+    probs: np.ndarray,
+    top_n: int = TOP_N,
+) -> np.ndarray:
+    """
+    contribs (n, C, F), base_values (C,), probs (n, C) -> structured records
+    holding the top-N features of the top-2 classes per row.
+    """
+    n = contribs.shape[0]
+    top_n = min(top_n, contribs.shape[2])
+    records = np.zeros(n, dtype=record_dtype(top_n))
+
+    classes = np.argsort(-probs, axis=1)[:, :N_CLASSES_KEPT]
+    rows = np.arange(n)[:, None]
+    picked = contribs[rows, classes]                       # (n, 2, F)
+
+    feat = np.argsort(-np.abs(picked), axis=2)[:, :, :top_n]
+    records["classes"] = classes
+    records["feature_idx"] = feat
+    records["shap"] = np.take_along_axis(picked, feat, axis=2)
+    records["base"] = np.asarray(base_values)[classes]
+    return records
+
+
+def explain_records(bundle: ModelBundle, explainer, X: np.ndarray, top_n: int = TOP_N) -> np.ndarray:
+    X = bundle.as_matrix(X)
+    contribs = shap_by_class(explainer.shap_values(X), bundle.n_classes)
+    base = np.broadcast_to(np.asarray(explainer.expected_value, dtype=np.float32), (bundle.n_classes,))
+    return compact_records(contribs, base, bundle.xgb_predict_proba(X), top_n)
+
+
+# -------------------------------------------------
+# Process-pool batch job
+# -------------------------------------------------
+_worker_bundle: ModelBundle | None = None
+_worker_explainer = None
+
+
+def _init_worker(bundle_dir: str) -> None:
+    import shap
+
+    global _worker_bundle, _worker_explainer
+    _worker_bundle = load_bundle(Path(bundle_dir), verify=False)
+    _worker_explainer = shap.TreeExplainer(_worker_bundle.booster)
+
+
+def _explain_chunk(args) -> np.ndarray:
+    X_chunk, top_n = args
+    return explain_records(_worker_bundle, _worker_explainer, X_chunk, top_n)
+
+
+def build_records(
+    bundle_dir: Path,
+    X: np.ndarray,
+    top_n: int = TOP_N,
+    chunk_rows: int = CHUNK_ROWS,
+    max_workers: int | None = None,
+) -> np.ndarray:
+    chunks = [(X[i:i + chunk_rows], top_n) for i in range(0, len(X), chunk_rows)]
+    workers = max_workers or min(len(chunks), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(bundle_dir),),
+    ) as pool:
+        parts = list(pool.map(_explain_chunk, chunks))
+
+    return np.concatenate(parts)
+
+
+def current_batch_dir(store_dir: Path) -> Path:
+    """Batch named by CURRENT, or the store directory itself (older layout)."""
+    path = Path(store_dir) / CURRENT_FILE
+    name = path.read_text().strip() if path.exists() else ""
+    return Path(store_dir) / BATCHES_DIR / name if name else Path(store_dir)
+
+
+def write_store(store_dir: Path, user_ids, records: np.ndarray, bundle: ModelBundle) -> Path:
+    """Write a new batch and make it current; returns the batch directory."""
+    store_dir = Path(store_dir)
+    batches = store_dir / BATCHES_DIR
+    batches.mkdir(parents=True, exist_ok=True)
+    previous = current_batch_dir(store_dir)
+
+    name = f"{bundle.version}_{time.time_ns()}"
+    tmp_dir = batches / f".{name}.tmp"
+    tmp_dir.mkdir()
+
+    np.save(tmp_dir / RECORDS_FILE, records)
+    np.save(tmp_dir / USER_IDS_FILE, np.asarray(user_ids).astype(str))
+
+    meta = {
+        "model_version": bundle.version,
+        "top_n": int(records.dtype["feature_idx"].shape[1]),
+        "n_users": int(len(records)),
+        "feature_columns": bundle.feature_columns,
+        "classes": [str(c) for c in bundle.classes],
+    }
+    with open(tmp_dir / META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
+
+    batch_dir = batches / name
+    os.replace(tmp_dir, batch_dir)
+    tmp = store_dir / (CURRENT_FILE + ".tmp")
+    tmp.write_text(name + "\n")
+    os.replace(tmp, store_dir / CURRENT_FILE)
+
+    # Older batches (readers that mapped them keep their open files). Keep
+    # the previous batch for readers that resolved CURRENT just before the
+    # swap; skip other writers' temporary directories
+    for old in batches.iterdir():
+        if old.name.startswith(".") or old in (batch_dir, previous):
+            continue
+        shutil.rmtree(old, ignore_errors=True)
+
+    # Lazily filled entries from older runs are now covered by the batch
+    overflow = store_dir / f"overflow_{bundle.version}.jsonl"
+    if overflow.exists():
+        overflow.unlink()
+
+    return batch_dir
+
+
+# -------------------------------------------------
+# Reader used by the app
+# -------------------------------------------------
+class ShapStore:
+    def __init__(self, store_dir: Path, model_version: str, top_n: int = TOP_N):
+        self.store_dir = Path(store_dir)
+        self.model_version = model_version
+        self.top_n = top_n
+        self.dtype = record_dtype(top_n)
+
+        self._records = None
+        self._row: dict[str, int] = {}
+        self._overflow: dict[str, np.void] = {}
+        self._lock = threading.Lock()
+        self._overflow_path = self.store_dir / f"overflow_{model_version}.jsonl"
+
+    @classmethod
+    def open(cls, store_dir: Path, model_version: str) -> "ShapStore":
+        """
+        Open the store for `model_version`. A missing or stale batch file
+        yields an empty store that is still filled lazily.
+        """
+        store_dir = Path(store_dir)
+        batch_dir = current_batch_dir(store_dir)
+        meta_path = batch_dir / META_FILE
+
+        meta = None
+        if meta_path.exists():
+            with open(meta_path) as f:
+                meta = json.load(f)
+
+        if meta is None or meta["model_version"] != model_version:
+            store = cls(store_dir, model_version)
+        else:
+            store = cls(store_dir, model_version, top_n=meta["top_n"])
+            store._records = np.load(batch_dir / RECORDS_FILE, mmap_mode="r")
+            user_ids = np.load(batch_dir / USER_IDS_FILE)
+            store._row = {u: i for i, u in enumerate(user_ids.tolist())}
+
+        store._load_overflow()
+        return store
+
+    def __contains__(self, user_id) -> bool:
+        key = str(user_id)
+        return key in self._row or key in self._overflow
+
+    def _load_overflow(self) -> None:
+        if not self._overflow_path.exists():
+            return
+        with open(self._overflow_path) as f:
+            for line in f:
+                entry = json.loads(line)
+                if len(entry["feature_idx"][0]) != self.top_n:
+                    continue
+                rec = np.zeros(1, dtype=self.dtype)[0]
+                for name in self.dtype.names:
+                    rec[name] = entry[name]
+                self._overflow[entry["user_id"]] = rec
+
+    def get(self, user_id) -> np.void | None:
+        key = str(user_id)
+        row = self._row.get(key)
+        if row is not None:
+            return self._records[row]
+        return self._overflow.get(key)
+
+    def put(self, user_id, record: np.void) -> None:
+        """Keep a lazily computed explanation and append it to disk."""
+        key = str(user_id)
+        entry = {"user_id": key}
+        entry.update({name: record[name].tolist() for name in self.dtype.names})
+
+        with self._lock:
+            self._overflow[key] = record
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._overflow_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def get_or_compute(self, user_id, bundle: ModelBundle, explainer, X) -> np.void:
+        record = self.get(user_id)
+        if record is None:
+            record = explain_records(bundle, explainer, X, self.top_n)[0]
+            self.put(user_id, record)
+        return record
@@ -0,0 +1,303 @@
+"""
+Seeded synthetic event stream in the raw schema, for offline benchmarks.
+
+    python -m reco.synthetic --rows 1e6 --out data/full_data.parquet
+    python -m reco.synthetic --rows 1e8 --layout splits --out data
+
+`full` writes one file with a `source` column, as produced by
+01_data_combine.py. `splits` writes train/val/test.parquet without it,
+so 01_data_combine.py combines them instead of downloading.
+
+Columns match the hosted dataset before 03_fix_schema.py: `event_time`
+and `price` are strings, missing brand / category values are the
+literal "NA", `timestamp` is a naive datetime. The skew is modelled on it:
+
+  - user activity is power-law (Pareto): most users view a handful of
+    products, a few view thousands;
+  - every user has a primary category and draws most views from it,
+    the rest from a fixed category mix; product popularity is Zipf;
+  - views lead to carts and carts to purchases (funnel), seconds to
+    an hour later in the same session;
+  - `source` follows time: train before March 2020, val in March,
+    test in April.
+
+Users are generated in batches and every batch is written as one Parquet
+row group, so memory stays flat from 10^5 to 10^9 rows. The output
+depends only on the seed and the row count.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+SCHEMA = pa.schema([
+    ("event_time", pa.string()),
+    ("event_type", pa.string()),
+    ("product_id", pa.string()),
+    ("brand", pa.string()),
+    ("price", pa.string()),
+    ("user_id", pa.string()),
+    ("user_session", pa.string()),
+    ("cat_0", pa.string()),
+    ("cat_1", pa.string()),
+    ("cat_2", pa.string()),
+    ("cat_3", pa.string()),
+    ("timestamp", pa.timestamp("us")),
+    ("source", pa.string()),
+])
+
+SPLITS = ("train", "val", "test")
+START = datetime(2019, 10, 1)
+END = datetime(2020, 5, 1)
+VAL_FROM = datetime(2020, 3, 1)
+TEST_FROM = datetime(2020, 4, 1)
+
+# cat_0 mix (share of views) and median price
+CATEGORIES = {
+    "electronics": (0.22, 180.0),
+    "appliances": (0.14, 120.0),
+    "computers": (0.12, 250.0),
+    "apparel": (0.10, 35.0),
+    "furniture": (0.07, 90.0),
+    "construction": (0.07, 60.0),
+    "kids": (0.06, 25.0),
+    "auto": (0.05, 70.0),
+    "sport": (0.05, 45.0),
+    "accessories": (0.04, 20.0),
+    "country_yard": (0.03, 55.0),
+    "medicine": (0.03, 12.0),
+    "stationery": (0.02, 5.0),
+}
+NA = "NA"
+NA_CATEGORY_SHARE = 0.08
+NA_BRAND_SHARE = 0.10
+SUBCATEGORIES = 4
+BRANDS = 2_000
+
+ACTIVITY_ALPHA = 1.3      # Pareto tail of views per user
+ACTIVITY_SCALE = 6.0
+MAX_VIEWS_PER_USER = 20_000
+PRIMARY_CATEGORY_SHARE = 0.6
+PRODUCT_ZIPF = 1.4
+SESSION_VIEWS = (2, 12)   # views per session
+P_CART = 0.07
+P_PURCHASE = 0.3
+
+ROWS_PER_USER = (ACTIVITY_SCALE / (ACTIVITY_ALPHA - 1) + 1) * (1 + P_CART * (1 + P_PURCHASE))
+MAX_USERS_PER_BATCH = 200_000
+USER_ID_OFFSET = 500_000_000
+
+
+class Catalog:
+    """Products with a fixed category path, brand and price."""
+
+    def __init__(self, rng: np.random.Generator, n_products: int):
+        names = list(CATEGORIES)
+        shares = np.array([CATEGORIES[c][0] for c in names])
+        counts = np.maximum((shares * n_products).astype(np.int64), 10)
+
+        self.category_names = names
+        self.category_weights = shares / shares.sum()
+        # Product indices of each category, most popular first
+        self.by_category = np.split(np.arange(counts.sum()), np.cumsum(counts)[:-1])
+        n = int(counts.sum())
+
+        category = np.repeat(np.arange(len(names)), counts)
+        sub = rng.integers(SUBCATEGORIES, size=n)
+        has_cat2 = rng.random(n) < 0.5
+        has_cat3 = rng.random(n) < 0.1
+        missing = rng.random(n) < NA_CATEGORY_SHARE
+
+        cat_0 = np.array(names, dtype=object)[category]
+        cat_1 = np.char.add(np.char.add(cat_0.astype(str), "_"), sub.astype(str)).astype(object)
+        cat_2 = np.where(has_cat2, np.char.add(cat_1.astype(str), "_x").astype(object), NA)
+        cat_3 = np.where(has_cat2 & has_cat3, np.char.add(cat_1.astype(str), "_y").astype(object), NA)
+        for col in (cat_0, cat_1, cat_2, cat_3):
+            col[missing] = NA
+
+        brand_rank = np.minimum(rng.zipf(1.2, n), BRANDS) - 1
+        brand = np.char.add("brand_", brand_rank.astype(str)).astype(object)
+        brand[rng.random(n) < NA_BRAND_SHARE] = NA
+
+        median = np.array([CATEGORIES[c][1] for c in names])[category]
+        price = np.round(median * rng.lognormal(0.0, 0.6, n), 2)
+
+        self.product_id = pa.array(np.arange(1_000_000, 1_000_000 + n)).cast(pa.string())
+        self.cat = [pa.array(c, pa.string()) for c in (cat_0, cat_1, cat_2, cat_3)]
+        self.brand = pa.array(brand, pa.string())
+        self.price = pc.cast(pa.array(price), pa.string())
+
+    def sample(self, rng: np.random.Generator, category: np.ndarray) -> np.ndarray:
+        """Zipf-popular product index for each view's category."""
+        out = np.empty(len(category), dtype=np.int64)
+        for c, products in enumerate(self.by_category):
+            idx = np.flatnonzero(category == c)
+            rank = np.minimum(rng.zipf(PRODUCT_ZIPF, len(idx)), len(products)) - 1
+            out[idx] = products[rank]
+        return out
+
+
+def _seconds(dt: datetime) -> int:
+    return int((dt - datetime(1970, 1, 1)).total_seconds())
+
+
+def generate_batch(
+    rng: np.random.Generator,
+    catalog: Catalog,
+    first_user: int,
+    n_users: int,
+) -> tuple[pa.Table, np.ndarray]:
+    """
+    Events of users first_user .. first_user + n_users; also returns each
+    row's user offset.
+    """
+    # Power-law activity: views per user
+    views = np.minimum(
+        np.floor(rng.pareto(ACTIVITY_ALPHA, n_users) * ACTIVITY_SCALE) + 1, MAX_VIEWS_PER_USER
+    ).astype(np.int64)
+    n_views = int(views.sum())
+    user = np.repeat(np.arange(n_users), views)
+    pos = np.arange(n_views) - np.repeat(np.cumsum(views) - views, views)
+
+    # Sessions of a few views; each starts at a random time in the
+    # user's active window
+    session_len = rng.integers(*SESSION_VIEWS, size=n_users)
+    session = pos // session_len[user]
+    n_sessions = -(-views // session_len)
+    session_key = np.repeat(np.cumsum(n_sessions) - n_sessions, views) + session
+
+    start, end = _seconds(START), _seconds(END)
+    user_start = rng.integers(start, end - 86_400, size=n_users)
+    user_span = (end - user_start) * rng.random(n_users)
+    session_start = (
+        np.repeat(user_start, n_sessions)
+        + np.repeat(user_span, n_sessions) * rng.random(int(n_sessions.sum()))
+    ).astype(np.int64)
+    t_view = session_start[session_key] + (pos % session_len[user]) * rng.integers(10, 180, size=n_views)
+
+    # Primary category for most views, the overall mix for the rest
+    n_cat = len(catalog.category_names)
+    primary = rng.choice(n_cat, size=n_users, p=catalog.category_weights)
+    category = np.where(
+        rng.random(n_views) < PRIMARY_CATEGORY_SHARE,
+        primary[user],
+        rng.choice(n_cat, size=n_views, p=catalog.category_weights),
+    )
+    product = catalog.sample(rng, category)
+
+    # Funnel: view -> cart -> purchase of the same product, same session
+    cart = np.flatnonzero(rng.random(n_views) < P_CART)
+    purchase = cart[rng.random(len(cart)) < P_PURCHASE]
+    t_cart = t_view[cart] + rng.integers(5, 600, size=len(cart))
+    t_purchase = t_view[purchase] + rng.integers(600, 3_600, size=len(purchase))
+
+    rows = np.concatenate([np.arange(n_views), cart, purchase])
+    event_type = np.repeat(np.array([0, 1, 2], dtype=np.int8), [n_views, len(cart), len(purchase)])
+    ts = np.concatenate([t_view, t_cart, t_purchase])
+
+    # User-grouped, in time order
+    order = np.lexsort((ts, user[rows]))
+    rows, event_type, ts = rows[order], event_type[order], ts[order]
+    row_user = user[rows]
+    row_product = pa.array(product[rows])
+
+    timestamp = pa.array(ts, pa.timestamp("s"))
+    user_id = pa.array(row_user + first_user + USER_ID_OFFSET).cast(pa.string())
+    source = np.where(
+        ts < _seconds(VAL_FROM), 0, np.where(ts < _seconds(TEST_FROM), 1, 2)
+    ).astype(np.int8)
+
+    table = pa.table({
+        "event_time": pc.binary_join_element_wise(
+            pc.strftime(timestamp, format="%Y-%m-%d %H:%M:%S"), "UTC", " "
+        ),
+        "event_type": pa.array(["view", "cart", "purchase"]).take(pa.array(event_type)),
+        "product_id": catalog.product_id.take(row_product),
+        "brand": catalog.brand.take(row_product),
+        "price": catalog.price.take(row_product),
+        "user_id": user_id,
+        "user_session": pc.binary_join_element_wise(
+            user_id, pa.array(session[rows]).cast(pa.string()), "-"
+        ),
+        "cat_0": catalog.cat[0].take(row_product),
+        "cat_1": catalog.cat[1].take(row_product),
+        "cat_2": catalog.cat[2].take(row_product),
+        "cat_3": catalog.cat[3].take(row_product),
+        "timestamp": timestamp.cast(pa.timestamp("us")),
+        "source": pa.array(SPLITS).take(pa.array(source)),
+    }, schema=SCHEMA)
+    return table, row_user
+
+
+def generate(out: Path, n_rows: int, seed: int = 0, layout: str = "full") -> dict[str, int]:
+    """Write about `n_rows` events (whole users only); returns rows per split."""
+    rng = np.random.default_rng(seed)
+    catalog = Catalog(rng, n_products=int(np.clip(n_rows / 200, 5_000, 2_000_000)))
+
+    if layout == "full":
+        out.parent.mkdir(parents=True, exist_ok=True)
+        writers = {None: pq.ParquetWriter(out, SCHEMA)}
+    else:
+        out.mkdir(parents=True, exist_ok=True)
+        split_schema = SCHEMA.remove(SCHEMA.get_field_index("source"))
+        writers = {s: pq.ParquetWriter(out / f"{s}.parquet", split_schema) for s in SPLITS}
+
+    counts = dict.fromkeys(SPLITS, 0)
+    written, first_user, batch = 0, 0, 0
+    try:
+        while written < n_rows:
+            remaining = n_rows - written
+            n_users = int(np.clip(remaining / ROWS_PER_USER, 1, MAX_USERS_PER_BATCH))
+            table, row_user = generate_batch(
+                np.random.default_rng([seed, batch]), catalog, first_user, n_users
+            )
+            if table.num_rows > remaining:
+                # Keep whole users up to the requested size
+                per_user = np.bincount(row_user, minlength=n_users)
+                keep = max(1, int(np.searchsorted(np.cumsum(per_user), remaining, side="right")))
+                table = table.slice(0, int(per_user[:keep].sum()))
+
+            for split in SPLITS:
+                part = table.filter(pc.equal(table["source"], split))
+                counts[split] += part.num_rows
+                if layout != "full":
+                    writers[split].write_table(part.drop_columns(["source"]))
+            if layout == "full":
+                writers[None].write_table(table)
+
+            written += table.num_rows
+            first_user += n_users
+            batch += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic raw events for offline benchmarks")
+    parser.add_argument("--rows", type=float, default=1e6, help="Approximate number of events")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--layout", choices=["full", "splits"], default="full")
+    parser.add_argument("--out", type=Path, default=Path("data/full_data.parquet"))
+    args = parser.parse_args()
+
+    print(f"🧪 Generating ~{int(args.rows):,} events (seed {args.seed})...")
+    t0 = time.perf_counter()
+    counts = generate(args.out, int(args.rows), seed=args.seed, layout=args.layout)
+    total = sum(counts.values())
+    print(f"✅ {total:,} events written to {args.out} in {time.perf_counter() - t0:.1f}s")
+    print("   " + " | ".join(f"{s}: {n:,}" for s, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Lightweight span timing for page reruns.
+
+A trace covers one rerun of a page; spans inside it time the steps
+(data load, feature alignment, predict, SHAP, plotting). Per-rerun span
+totals feed in-process rolling histograms, and every finished trace is
+appended as one JSON line to a local trace file, so slow sessions can be
+diagnosed after the fact without attaching a profiler.
+
+Only the standard library is imported at module level; numpy is used
+when summaries are requested.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+
+HISTOGRAM_SAMPLES = 2_000
+RECENT_TRACES = 50
+MAX_TRACE_FILE_BYTES = 50 * 1024 * 1024
+
+# Span name for the whole rerun
+TOTAL = "total"
+
+
+class RollingHistogram:
+    """The last `size` samples (ms) of one span."""
+
+    def __init__(self, size: int = HISTOGRAM_SAMPLES):
+        self.count = 0
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self._samples.append(ms)
+
+    def samples(self) -> list[float]:
+        return list(self._samples)
+
+    def summary(self) -> dict:
+        import numpy as np
+
+        ms = np.asarray(self._samples)
+        if not len(ms):
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "mean_ms": float(ms.mean()),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+        }
+
+
+class _Trace:
+    def __init__(self, session: str | None):
+        self.session = session
+        self.started_at = time.time()
+        self.t0 = time.perf_counter()
+        self.spans: list[tuple[str, float, float]] = []
+
+
+class Tracer:
+    """
+    Per-thread current trace (one script thread per rerun) plus
+    process-wide histograms keyed by page and span name.
+    """
+
+    def __init__(self, trace_path: Path | None = None, histogram_size: int = HISTOGRAM_SAMPLES):
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.histogram_size = histogram_size
+        self.recent: deque[dict] = deque(maxlen=RECENT_TRACES)
+        self._histograms: dict[str, dict[str, RollingHistogram]] = defaultdict(dict)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+
+    def begin(self, session: str | None = None) -> None:
+        """Start the current thread's trace, dropping an unfinished one."""
+        self._local.trace = _Trace(session)
+
+    @contextmanager
+    def span(self, name: str):
+        trace = getattr(self._local, "trace", None)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            if trace is not None:
+                trace.spans.append((name, (t0 - trace.t0) * 1000, (time.perf_counter() - t0) * 1000))
+
+    def finish(self, page: str) -> dict | None:
+        """Close the current trace, update the histograms and append it to the trace file."""
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return None
+        self._local.trace = None
+
+        total_ms = (time.perf_counter() - trace.t0) * 1000
+        totals: dict[str, float] = defaultdict(float)
+        for name, _, ms in trace.spans:
+            totals[name] += ms
+        totals[TOTAL] = total_ms
+
+        record = {
+            "ts": trace.started_at,
+            "page": page,
+            "session": trace.session,
+            "total_ms": round(total_ms, 3),
+            "spans": [
+                {"name": name, "start_ms": round(start, 3), "ms": round(ms, 3)}
+                for name, start, ms in trace.spans
+            ],
+        }
+        with self._lock:
+            page_histograms = self._histograms[page]
+            for name, ms in totals.items():
+                if name not in page_histograms:
+                    page_histograms[name] = RollingHistogram(self.histogram_size)
+                page_histograms[name].add(ms)
+            self.recent.append(record)
+
+        if self.trace_path is not None:
+            self._append(record)
+        return record
+
+    def _append(self, record: dict) -> None:
+        line = json.dumps(record) + "\n"
+        with self._file_lock:
+            try:
+                self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+                if self.trace_path.exists() and self.trace_path.stat().st_size > MAX_TRACE_FILE_BYTES:
+                    os.replace(self.trace_path, self.trace_path.with_name(self.trace_path.name + ".1"))
+                with open(self.trace_path, "a") as f:
+                    f.write(line)
+            except OSError:
+                # Tracing must never break a rerun (read-only disk, quota, ...)
+                pass
+
+    def samples(self, page: str, name: str) -> list[float]:
+        with self._lock:
+            histogram = self._histograms.get(page, {}).get(name)
+            return histogram.samples() if histogram is not None else []
+
+    def summary(self) -> dict[str, dict[str, dict]]:
+        with self._lock:
+            return {
+                page: {name: h.summary() for name, h in spans.items()}
+                for page, spans in self._histograms.items()
+            }
+
+    def recent_traces(self, session: str | None = None) -> list[dict]:
+        with self._lock:
+            return [t for t in self.recent if session is None or t["session"] == session]
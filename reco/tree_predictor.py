@@ -0,0 +1,246 @@
+"""
+Numba-compiled predictor for the XGBoost tree ensemble.
+
+The booster is flattened into contiguous node arrays (one slice per tree)
+and scored by a jitted traversal. For a single user this skips the
+DataFrame -> DMatrix conversion and validation that dominate
+`predict_proba` latency; batches are scored in parallel over rows.
+
+Thresholds and inputs are float32, matching XGBoost's split comparison,
+so outputs agree with the booster to float32 rounding.
+
+WhatIfSession keeps the per-tree leaf outputs of one row, so editing a
+few features only re-traverses the trees that split on them.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numba import njit, prange
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+
+PARALLEL_MIN_ROWS = 256
+
+
+@njit(cache=True, nogil=True)
+def _leaf_index(x, start, feature, threshold, left, right, default_left):
+    node = start
+    while left[node] != -1:
+        v = x[feature[node]]
+        if np.isnan(v):
+            node = left[node] if default_left[node] else right[node]
+        elif v < threshold[node]:
+            node = left[node]
+        else:
+            node = right[node]
+    return node
+
+
+@njit(cache=True, nogil=True)
+def _margin_serial(X, tree_start, tree_class, feature, threshold,
+                   left, right, default_left, value, bias, out):
+    for i in range(X.shape[0]):
+        out[i, :] = bias
+        for t in range(tree_start.shape[0]):
+            leaf = _leaf_index(X[i], tree_start[t], feature, threshold,
+                               left, right, default_left)
+            out[i, tree_class[t]] += value[leaf]
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def _margin_parallel(X, tree_start, tree_class, feature, threshold,
+                     left, right, default_left, value, bias, out):
+    for i in prange(X.shape[0]):
+        out[i, :] = bias
+        for t in range(tree_start.shape[0]):
+            leaf = _leaf_index(X[i], tree_start[t], feature, threshold,
+                               left, right, default_left)
+            out[i, tree_class[t]] += value[leaf]
+
+
+@njit(cache=True, nogil=True)
+def _leaf_values(x, trees, tree_start, feature, threshold,
+                 left, right, default_left, value):
+    out = np.empty(trees.shape[0], dtype=np.float32)
+    for k in range(trees.shape[0]):
+        leaf = _leaf_index(x, tree_start[trees[k]], feature, threshold,
+                           left, right, default_left)
+        out[k] = value[leaf]
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _softmax_rows(margin):
+    out = np.empty_like(margin)
+    for i in range(margin.shape[0]):
+        m = margin[i].max()
+        s = 0.0
+        for c in range(margin.shape[1]):
+            out[i, c] = np.exp(margin[i, c] - m)
+            s += out[i, c]
+        for c in range(margin.shape[1]):
+            out[i, c] /= s
+    return out
+
+
+@dataclass
+class FlatTreeEnsemble:
+    """Multiclass tree ensemble as flat node arrays (global node indices)."""
+
+    tree_start: np.ndarray     # int32 (n_trees,)  root node of each tree
+    tree_class: np.ndarray     # int32 (n_trees,)  output class of each tree
+    feature: np.ndarray        # int32 (n_nodes,)
+    threshold: np.ndarray      # float32 (n_nodes,)
+    left: np.ndarray           # int32 (n_nodes,)  -1 for leaves
+    right: np.ndarray          # int32 (n_nodes,)
+    default_left: np.ndarray   # bool (n_nodes,)   branch taken for NaN
+    value: np.ndarray          # float32 (n_nodes,) leaf output
+    bias: np.ndarray           # float32 (n_classes,) base margin
+    n_features: int
+    tree_uses: np.ndarray | None = None   # bool (n_trees, n_features)
+
+    @property
+    def n_classes(self) -> int:
+        return len(self.bias)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.tree_start)
+
+    @classmethod
+    def from_booster(cls, booster: xgb.Booster) -> "FlatTreeEnsemble":
+        model = json.loads(booster.save_raw("json"))
+        gbtree = model["learner"]["gradient_booster"]
+        if gbtree.get("name") != "gbtree":
+            raise ValueError(f"Unsupported booster type: {gbtree.get('name')}")
+
+        trees = gbtree["model"]["trees"]
+        tree_info = gbtree["model"]["tree_info"]
+        n_classes = max(1, int(model["learner"]["learner_model_param"]["num_class"]))
+
+        sizes = [len(t["left_children"]) for t in trees]
+        tree_start = np.zeros(len(trees), dtype=np.int32)
+        tree_start[1:] = np.cumsum(sizes)[:-1]
+
+        def concat(key, dtype, shift=False):
+            parts = []
+            for start, t in zip(tree_start, trees):
+                arr = np.asarray(t[key], dtype=np.int64 if shift else dtype)
+                if shift:
+                    # local child ids -> global node ids, keep -1 leaf marker
+                    arr = np.where(arr == -1, -1, arr + start)
+                parts.append(arr.astype(dtype))
+            return np.ascontiguousarray(np.concatenate(parts))
+
+        left = concat("left_children", np.int32, shift=True)
+        split_conditions = concat("split_conditions", np.float32)
+
+        ensemble = cls(
+            tree_start=tree_start,
+            tree_class=np.asarray(tree_info, dtype=np.int32),
+            feature=concat("split_indices", np.int32),
+            threshold=split_conditions,
+            left=left,
+            right=concat("right_children", np.int32, shift=True),
+            default_left=concat("default_left", np.bool_),
+            # leaf outputs are stored in split_conditions for leaf nodes
+            value=np.where(left == -1, split_conditions, 0).astype(np.float32),
+            bias=np.zeros(n_classes, dtype=np.float32),
+            n_features=booster.num_features(),
+        )
+
+        # Which features each tree splits on (for incremental rescoring)
+        internal = ensemble.left != -1
+        tree_of_node = np.repeat(np.arange(len(trees)), sizes)
+        ensemble.tree_uses = np.zeros((len(trees), ensemble.n_features), dtype=bool)
+        ensemble.tree_uses[tree_of_node[internal], ensemble.feature[internal]] = True
+
+        # Recover the base margin from the booster itself rather than
+        # parsing base_score, whose encoding differs across versions.
+        probe = np.zeros((1, ensemble.n_features), dtype=np.float32)
+        booster_margin = np.asarray(
+            booster.inplace_predict(probe, predict_type="margin"), dtype=np.float32
+        ).reshape(1, -1)
+        ensemble.bias = (booster_margin[0] - ensemble.predict_margin(probe)[0]).astype(np.float32)
+
+        return ensemble
+
+    def _as_matrix(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return X
+
+    def predict_margin(self, X) -> np.ndarray:
+        X = self._as_matrix(X)
+        out = np.empty((X.shape[0], self.n_classes), dtype=np.float32)
+        kernel = _margin_parallel if X.shape[0] >= PARALLEL_MIN_ROWS else _margin_serial
+        kernel(X, self.tree_start, self.tree_class, self.feature, self.threshold,
+               self.left, self.right, self.default_left, self.value, self.bias, out)
+        return out
+
+    def predict_proba(self, X) -> np.ndarray:
+        return _softmax_rows(self.predict_margin(X).astype(np.float64))
+
+    def leaf_values(self, x: np.ndarray, trees: np.ndarray | None = None) -> np.ndarray:
+        """Leaf output of each tree (or of `trees` only) for one row."""
+        if trees is None:
+            trees = np.arange(self.n_trees, dtype=np.int64)
+        return _leaf_values(x, trees, self.tree_start, self.feature, self.threshold,
+                            self.left, self.right, self.default_left, self.value)
+
+    def margin_from_leaves(self, leaves: np.ndarray) -> np.ndarray:
+        return self.bias + np.bincount(
+            self.tree_class, weights=leaves, minlength=self.n_classes
+        ).astype(np.float32)
+
+
+class WhatIfSession:
+    """
+    Rescore one row after editing some of its features. Per-tree leaf
+    outputs of the current row are cached; an edit re-traverses only the
+    trees whose splits use an edited feature.
+    """
+
+    def __init__(self, ensemble: FlatTreeEnsemble, x: np.ndarray):
+        if ensemble.tree_uses is None:
+            raise ValueError("Ensemble has no tree/feature usage index")
+        self.ensemble = ensemble
+        self.x = ensemble._as_matrix(x)[0].copy()
+        self.leaves = ensemble.leaf_values(self.x)
+        self.last_retraversed = ensemble.n_trees
+
+    def set_values(self, changes: dict[int, float]) -> np.ndarray:
+        """Apply {feature_index: value}; returns the new class probabilities."""
+        changed = [j for j, v in changes.items() if np.float32(v) != self.x[j]]
+        if changed:
+            for j in changed:
+                self.x[j] = changes[j]
+            trees = np.flatnonzero(self.ensemble.tree_uses[:, changed].any(axis=1))
+            self.leaves[trees] = self.ensemble.leaf_values(self.x, trees)
+            self.last_retraversed = len(trees)
+        else:
+            self.last_retraversed = 0
+        return self.probs()
+
+    def probs(self) -> np.ndarray:
+        margin = self.ensemble.margin_from_leaves(self.leaves).reshape(1, -1)
+        return _softmax_rows(margin.astype(np.float64))[0]
+
+
+def max_abs_diff_vs_booster(ensemble: FlatTreeEnsemble, booster: xgb.Booster, X) -> float:
+    """Largest absolute probability difference against the booster itself."""
+    X = ensemble._as_matrix(X)
+    margin = np.asarray(booster.inplace_predict(X, predict_type="margin"), dtype=np.float64)
+    margin = margin.reshape(X.shape[0], -1)
+    expected = _softmax_rows(margin)
+    return float(np.abs(ensemble.predict_proba(X) - expected).max())
@@ -0,0 +1,133 @@
+"""
+User-clustered store for the demo events and features.
+
+Events are sorted by user (latest first within a user) and features hold
+one row per user in the same user order. A small index keeps the sorted
+user ids and each user's [start, end) event range, so selecting a user
+is a binary search plus two slices instead of a boolean scan per rerun.
+Events are held as an Arrow table and only the requested page is
+converted to pandas.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+EVENTS_FILE = "events_by_user.parquet"
+FEATURES_FILE = "features_by_user.parquet"
+INDEX_FILE = "user_index.npz"
+
+EVENT_PAGE_SIZE = 50
+SEARCH_LIMIT = 50
+
+
+def build_index(event_user_ids, feature_user_ids) -> dict[str, np.ndarray]:
+    """Offsets of each feature user's events; both inputs sorted by user."""
+    event_user_ids = np.asarray(event_user_ids).astype(str)
+    users = np.asarray(feature_user_ids).astype(str)
+    if len(users) > 1 and not (users[1:] > users[:-1]).all():
+        raise ValueError("Feature rows must be sorted by unique user_id")
+    return {
+        "user_ids": users,
+        "event_start": np.searchsorted(event_user_ids, users, side="left").astype(np.int64),
+        "event_end": np.searchsorted(event_user_ids, users, side="right").astype(np.int64),
+        "n_events": np.array(len(event_user_ids), dtype=np.int64),
+    }
+
+
+def write_index(out_dir: Path, index: dict[str, np.ndarray]) -> Path:
+    path = Path(out_dir) / INDEX_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(tmp, **index)
+    os.replace(tmp, path)
+    return path
+
+
+class UserStore:
+    def __init__(self, events: pa.Table, features: pd.DataFrame, index: dict[str, np.ndarray]):
+        if events.num_rows != int(index["n_events"]) or len(features) != len(index["user_ids"]):
+            raise ValueError("User index does not match the stored tables")
+        self.events_table = events
+        self.features_df = features
+        self.user_ids = index["user_ids"]
+        self._start = index["event_start"]
+        self._end = index["event_end"]
+
+    @classmethod
+    def open(cls, store_dir: Path) -> "UserStore | None":
+        """Store written by 16_demo_user_store.py, or None if not built."""
+        store_dir = Path(store_dir)
+        if not (store_dir / INDEX_FILE).exists():
+            return None
+        with np.load(store_dir / INDEX_FILE) as data:
+            index = {k: data[k] for k in data.files}
+        return cls(
+            pq.read_table(store_dir / EVENTS_FILE),
+            pd.read_parquet(store_dir / FEATURES_FILE),
+            index,
+        )
+
+    @classmethod
+    def from_frames(cls, events: pd.DataFrame, features: pd.DataFrame) -> "UserStore":
+        """Build in memory (one sort) when no prebuilt store exists."""
+        events = events.assign(user_id=events["user_id"].astype(str))
+        events = events.sort_values(
+            ["user_id", "timestamp"], ascending=[True, False], kind="stable"
+        ).reset_index(drop=True)
+        features = (
+            features.assign(user_id=features["user_id"].astype(str))
+            .drop_duplicates("user_id")
+            .sort_values("user_id", kind="stable")
+            .reset_index(drop=True)
+        )
+        index = build_index(events["user_id"], features["user_id"])
+        return cls(pa.Table.from_pandas(events, preserve_index=False), features, index)
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def index(self) -> dict[str, np.ndarray]:
+        return {
+            "user_ids": self.user_ids,
+            "event_start": self._start,
+            "event_end": self._end,
+            "n_events": np.array(self.events_table.num_rows, dtype=np.int64),
+        }
+
+    def position(self, user_id) -> int:
+        pos = int(np.searchsorted(self.user_ids, str(user_id)))
+        if pos == len(self.user_ids) or self.user_ids[pos] != str(user_id):
+            raise KeyError(user_id)
+        return pos
+
+    def search(self, prefix: str, limit: int = SEARCH_LIMIT) -> np.ndarray:
+        """Up to `limit` user ids starting with `prefix`, in sorted order."""
+        prefix = str(prefix)
+        lo = int(np.searchsorted(self.user_ids, prefix, side="left"))
+        hi = int(np.searchsorted(self.user_ids, prefix + "\U0010ffff", side="left"))
+        return self.user_ids[lo:min(hi, lo + limit)]
+
+    def features(self, user_id) -> pd.DataFrame:
+        pos = self.position(user_id)
+        return self.features_df.iloc[pos:pos + 1]
+
+    def n_events(self, user_id) -> int:
+        pos = self.position(user_id)
+        return int(self._end[pos] - self._start[pos])
+
+    def events(self, user_id, page: int = 0, page_size: int = EVENT_PAGE_SIZE) -> pd.DataFrame:
+        """One page of the user's events, latest first."""
+        pos = self.position(user_id)
+        start = int(self._start[pos]) + page * page_size
+        end = min(start + page_size, int(self._end[pos]))
+        return self.events_table.slice(start, max(0, end - start)).to_pandas()
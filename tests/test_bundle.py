@@ -0,0 +1,100 @@
+import joblib
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+from reco.bundle import BundleError, load_bundle, scaler_stats_for, write_bundle
+
+
+FEATURES = ["f0", "f1", "f2"]
+CLASSES = ["a", "b"]
+
+
+def train_booster():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, len(FEATURES)))
+    y = (X[:, 0] > 0).astype(int)
+    dtrain = xgb.DMatrix(X, label=y, feature_names=FEATURES)
+    params = {"objective": "multi:softprob", "num_class": len(CLASSES), "max_depth": 2}
+    return xgb.train(params, dtrain, num_boost_round=3), X
+
+
+def test_bundle_round_trip(tmp_path):
+    booster, X = train_booster()
+    mean = np.array([0.5, -1.0, 2.0])
+    scale = np.array([2.0, 0.5, 3.0])
+
+    write_bundle(
+        tmp_path / "bundle",
+        booster=booster,
+        lr_coef=np.arange(6, dtype=float).reshape(2, 3),
+        lr_intercept=np.array([0.1, -0.1]),
+        classes=CLASSES,
+        feature_columns=FEATURES,
+        target="category",
+        unknown_class_label="unknown",
+        scaler_mean=mean,
+        scaler_scale=scale,
+        version="v1",
+    )
+    bundle = load_bundle(tmp_path / "bundle", expected_features=FEATURES)
+
+    assert bundle.version == "v1"
+    assert list(bundle.classes) == CLASSES
+    assert bundle.feature_columns == FEATURES
+    np.testing.assert_array_equal(bundle.scaler_mean, mean)
+    np.testing.assert_array_equal(bundle.scaler_scale, scale)
+    np.testing.assert_array_equal(bundle.lr_intercept, [0.1, -0.1])
+    np.testing.assert_allclose(
+        bundle.xgb_predict_proba(X[:5]),
+        booster.predict(xgb.DMatrix(X[:5], feature_names=FEATURES)),
+        atol=1e-6,
+    )
+
+
+def test_bundle_rejects_tampered_file(tmp_path):
+    booster, _ = train_booster()
+    out = write_bundle(
+        tmp_path / "bundle",
+        booster=booster,
+        lr_coef=np.zeros((2, 3)),
+        lr_intercept=np.zeros(2),
+        classes=CLASSES,
+        feature_columns=FEATURES,
+        target="category",
+        unknown_class_label="unknown",
+    )
+    np.savez(out / "feature_scaler.npz", mean=np.ones(3), scale=np.ones(3))
+
+    with pytest.raises(BundleError):
+        load_bundle(out)
+
+
+def test_scaler_stats_from_npz_in_model_order(tmp_path):
+    path = tmp_path / "feature_scaler.npz"
+    np.savez(path, feature_names=np.array(["f2", "f0"]), mean=np.array([3.0, 1.0]), scale=np.array([4.0, 2.0]))
+
+    mean, scale = scaler_stats_for(FEATURES, path)
+
+    # f1 was never scaled: left as identity
+    np.testing.assert_array_equal(mean, [1.0, 0.0, 3.0])
+    np.testing.assert_array_equal(scale, [2.0, 1.0, 4.0])
+
+
+def test_scaler_stats_fall_back_to_pickle(tmp_path):
+    import pandas as pd
+
+    X = pd.DataFrame({"f0": [1.0, 3.0], "f1": [0.0, 10.0], "f2": [5.0, 5.0]})
+    scaler = StandardScaler().fit(X)
+    joblib.dump(scaler, tmp_path / "feature_scaler.pkl")
+
+    mean, scale = scaler_stats_for(FEATURES, tmp_path / "feature_scaler.npz")
+
+    np.testing.assert_array_equal(mean, scaler.mean_)
+    np.testing.assert_array_equal(scale, scaler.scale_)
+
+
+def test_scaler_stats_missing_scaler_raises(tmp_path):
+    with pytest.raises(BundleError):
+        scaler_stats_for(FEATURES, tmp_path / "feature_scaler.npz")
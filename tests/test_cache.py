@@ -0,0 +1,59 @@
+import numpy as np
+
+from reco.cache import PredictionCache
+
+
+def value(n_floats):
+    return np.zeros(n_floats, dtype=np.float64)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = PredictionCache(max_bytes=3 * 80)
+    for name in "abc":
+        cache.put((name,), value(10))
+    assert cache.bytes == 240
+
+    # Touch "a" so "b" is now the oldest
+    assert cache.get(("a",)) is not None
+    cache.put(("d",), value(10))
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+    assert cache.get(("c",)) is not None
+    assert cache.get(("d",)) is not None
+    assert cache.evictions == 1
+    assert cache.bytes == 240
+
+
+def test_large_entry_evicts_several():
+    cache = PredictionCache(max_bytes=3 * 80)
+    for name in "abc":
+        cache.put((name,), value(10))
+
+    cache.put(("big",), value(20))
+
+    assert cache.get(("a",)) is None
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) is not None
+    assert cache.evictions == 2
+    assert cache.bytes == 240
+
+
+def test_oversized_value_is_not_cached():
+    cache = PredictionCache(max_bytes=80)
+    cache.put(("a",), value(10))
+
+    cache.put(("huge",), value(100))
+
+    assert cache.get(("huge",)) is None
+    assert cache.get(("a",)) is not None
+    assert cache.evictions == 0
+
+
+def test_replacing_a_key_keeps_byte_count():
+    cache = PredictionCache(max_bytes=1_000)
+    cache.put(("a",), value(10))
+    cache.put(("a",), value(20))
+
+    assert cache.bytes == 160
+    assert len(cache.get(("a",))) == 20
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from reco.cohort import ALL, NO_PURCHASE, Segment, segment_mask
+
+
+def make_features():
+    return pd.DataFrame({
+        "p_purchase_recency": [0.0, 7.0, 8.0, 30.0, 45.0, 200.0, np.nan],
+        "is_new_customer": [0, 0, 0, 1, 0, 0, 0],
+    })
+
+
+PREDICTED = np.array(["a", "b", "a", "b", "a", "b", "a"])
+
+
+def mask(**segment):
+    return list(np.flatnonzero(segment_mask(Segment(**segment), make_features(), PREDICTED)))
+
+
+def test_all_selects_everyone():
+    assert mask() == list(range(7))
+
+
+def test_recency_buckets_are_disjoint():
+    assert mask(recency_bucket="0–7 days") == [0, 1]
+    assert mask(recency_bucket="8–30 days") == [2, 3]
+    assert mask(recency_bucket="31–90 days") == [4]
+    assert mask(recency_bucket="90+ days") == [5]
+    assert mask(recency_bucket=NO_PURCHASE) == [6]
+
+
+def test_never_purchased_counts_as_new():
+    assert mask(customer_type="new") == [3, 6]
+    assert mask(customer_type="returning") == [0, 1, 2, 4, 5]
+
+
+def test_filters_combine():
+    assert mask(customer_type="returning", predicted_category="a") == [0, 2, 4]
+    assert mask(customer_type="new", recency_bucket=NO_PURCHASE, predicted_category=ALL) == [6]
@@ -0,0 +1,59 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from reco.scoring import TIER_LR, TIER_XGB, TieredScorer
+
+
+N_FEATURES = 4
+CLASSES = ["a", "b", "c"]
+
+
+class SlowEnsemble:
+    """Stands in for FlatTreeEnsemble; sleeps `delay_s` per call."""
+
+    n_features = N_FEATURES
+
+    def __init__(self):
+        self.delay_s = 0.0
+
+    def predict_proba(self, X):
+        time.sleep(self.delay_s)
+        X = np.atleast_2d(X)
+        return np.full((len(X), len(CLASSES)), 1 / len(CLASSES))
+
+
+def make_bundle():
+    return SimpleNamespace(
+        classes=CLASSES,
+        lr_coef=np.ones((len(CLASSES), N_FEATURES)),
+        lr_intercept=np.zeros(len(CLASSES)),
+        scaler_mean=np.zeros(N_FEATURES),
+        scaler_scale=np.ones(N_FEATURES),
+    )
+
+
+def test_xgb_tier_recovers_after_latency_spike():
+    ensemble = SlowEnsemble()
+    scorer = TieredScorer(make_bundle(), ensemble, default_budget_ms=20.0, probe_every=5)
+    X = np.zeros(N_FEATURES)
+
+    assert scorer.score(X).tier == TIER_XGB
+
+    # One slow call pushes the estimate over budget
+    ensemble.delay_s = 0.25
+    assert scorer.score(X).tier == TIER_XGB
+    ensemble.delay_s = 0.0
+    tiers = [scorer.score(X).tier for _ in range(4)]
+    assert tiers == [TIER_LR] * 4
+
+    # The 5th skipped request probes XGBoost, which is fast again
+    assert scorer.score(X).tier == TIER_XGB
+    assert [scorer.score(X).tier for _ in range(10)] == [TIER_XGB] * 10
+
+
+def test_zero_budget_never_probes():
+    scorer = TieredScorer(make_bundle(), SlowEnsemble(), probe_every=1)
+    X = np.zeros(N_FEATURES)
+    assert [scorer.score(X, budget_ms=0).tier for _ in range(5)] == [TIER_LR] * 5
@@ -0,0 +1,38 @@
+import numpy as np
+import xgboost as xgb
+
+from reco.tree_predictor import PARALLEL_MIN_ROWS, FlatTreeEnsemble
+
+
+N_FEATURES = 5
+N_CLASSES = 3
+
+
+def train_booster(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, N_FEATURES)).astype(np.float32)
+    # Some missing values so default-direction splits are exercised
+    X[rng.random(X.shape) < 0.1] = np.nan
+    y = (np.nan_to_num(X[:, 0]) > 0).astype(int) + (np.nan_to_num(X[:, 1]) > 0.5).astype(int)
+    params = {"objective": "multi:softprob", "num_class": N_CLASSES, "max_depth": 4, "seed": seed}
+    return xgb.train(params, xgb.DMatrix(X, label=y), num_boost_round=15), X
+
+
+def test_flat_ensemble_matches_booster_margin():
+    booster, X = train_booster()
+    ensemble = FlatTreeEnsemble.from_booster(booster)
+
+    expected = booster.predict(xgb.DMatrix(X), output_margin=True).reshape(len(X), N_CLASSES)
+    # Serial kernel (few rows) and parallel kernel (many rows)
+    np.testing.assert_allclose(ensemble.predict_margin(X[:10]), expected[:10], atol=1e-5)
+    assert len(X) >= PARALLEL_MIN_ROWS
+    np.testing.assert_allclose(ensemble.predict_margin(X), expected, atol=1e-5)
+
+
+def test_flat_ensemble_single_row_and_proba():
+    booster, X = train_booster(seed=1)
+    ensemble = FlatTreeEnsemble.from_booster(booster)
+
+    assert ensemble.n_features == N_FEATURES
+    expected = booster.predict(xgb.DMatrix(X[:1]))
+    np.testing.assert_allclose(ensemble.predict_proba(X[0]), expected, atol=1e-5)
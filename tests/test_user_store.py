@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from reco.user_store import UserStore
+
+
+def make_store():
+    events = pd.DataFrame({
+        "user_id": ["u10"] * 5 + ["u2"] * 2 + ["x1"],
+        "timestamp": pd.to_datetime([
+            "2024-01-01", "2024-01-05", "2024-01-03", "2024-01-02", "2024-01-04",
+            "2024-02-01", "2024-02-02",
+            "2024-03-01",
+        ]),
+    })
+    features = pd.DataFrame({"user_id": ["x1", "u2", "u10", "u3"], "value": [1, 2, 3, 4]})
+    return UserStore.from_frames(events, features)
+
+
+def test_search_by_prefix_sorted_and_limited():
+    store = make_store()
+
+    assert list(store.search("u")) == ["u10", "u2", "u3"]
+    assert list(store.search("u1")) == ["u10"]
+    assert list(store.search("u", limit=2)) == ["u10", "u2"]
+    assert list(store.search("z")) == []
+
+
+def test_events_are_paged_latest_first():
+    store = make_store()
+
+    assert store.n_events("u10") == 5
+    page0 = store.events("u10", page=0, page_size=2)
+    page1 = store.events("u10", page=1, page_size=2)
+    page2 = store.events("u10", page=2, page_size=2)
+    page3 = store.events("u10", page=3, page_size=2)
+
+    assert list(page0["timestamp"].dt.day) == [5, 4]
+    assert list(page1["timestamp"].dt.day) == [3, 2]
+    assert list(page2["timestamp"].dt.day) == [1]
+    assert page3.empty
+    assert set(page0["user_id"]) == {"u10"}
+
+
+def test_user_without_events_and_unknown_user():
+    store = make_store()
+
+    assert store.n_events("u3") == 0
+    assert store.events("u3").empty
+    assert store.features("u3")["value"].item() == 4
+    with pytest.raises(KeyError):
+        store.position("nobody")